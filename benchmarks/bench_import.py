@@ -0,0 +1,32 @@
+"""Benchmark of the import time of the swissdta package.
+
+Each measure runs in a fresh interpreter, the interpreter start up time
+(measured with an empty script) is subtracted from the results.
+
+Usage: ``python benchmarks/bench_import.py [repeat]``
+"""
+import subprocess
+import sys
+from statistics import median
+from time import perf_counter
+
+
+def _measure(script: str, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = perf_counter()
+        subprocess.run([sys.executable, '-c', script], check=True)
+        timings.append(perf_counter() - start)
+    return median(timings)
+
+
+def main(repeat: int = 20) -> None:
+    """Print the median import time of the package, with and without warm up."""
+    baseline = _measure('pass', repeat)
+    for name, script in (('import swissdta', 'import swissdta'),
+                         ('import swissdta + warmup()', 'import swissdta; swissdta.warmup()')):
+        print(f'{name:<30} {(_measure(script, repeat) - baseline) * 1000:8.1f} ms')
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -32,5 +32,6 @@ setup(
     ],
     license='MIT',
     test_suite='tests',
+    entry_points={'console_scripts': ['swissdta = swissdta.cli:main']},
     zip_safe=False, install_requires=['iso4217', 'schwifty']
 )
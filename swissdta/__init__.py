@@ -3,9 +3,12 @@
 For most use cases, only the ``DTAFile`` is needed.
 """
 
-from swissdta.constants import ChargesRule, IdentificationBankAddress, IdentificationPurpose
+from swissdta.constants import ChargesRule, ErrorCode, IdentificationBankAddress, IdentificationPurpose
 from swissdta.file import DTAFile
-from swissdta.records import DTARecord836
+from swissdta.records import DTARecord836, OrderingParty, validate_836
+from swissdta.util import warmup
+from swissdta.verifier import verify
 
 
-__all__ = ['ChargesRule', 'DTAFile', 'DTARecord836', 'IdentificationBankAddress', 'IdentificationPurpose']
+__all__ = ['ChargesRule', 'DTAFile', 'DTARecord836', 'ErrorCode', 'IdentificationBankAddress', 'IdentificationPurpose',
+           'OrderingParty', 'validate_836', 'verify', 'warmup']
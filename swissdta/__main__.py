@@ -0,0 +1,6 @@
+"""Run the ``swissdta`` command with ``python -m swissdta``."""
+import sys
+
+from swissdta.cli import main
+
+sys.exit(main())
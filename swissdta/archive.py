@@ -0,0 +1,202 @@
+"""Archive of generated DTA files with a searchable index of their payments.
+
+The files are stored as is in a directory, next to a SQLite database
+indexing the reference, recipient IBAN, value date, currency and amount
+of each payment. The index is updated incrementally when a file is
+archived, such that searches never read the archived files.
+"""
+import hashlib
+import os
+import sqlite3
+from datetime import date
+from decimal import Decimal
+from typing import Any, Iterable, List, NamedTuple, Tuple, Union
+
+from swissdta.util import parse_amount, parse_date, remove_whitespace
+from swissdta.view import DTAFileView
+
+# Amounts are stored as integers in thousandths (DTA amounts have at most 3 decimal places)
+_AMOUNT_SCALE = 1000
+
+
+class ArchivedPayment(NamedTuple):
+    """A payment of an archived file.
+
+    Attributes:
+        file_id: The identifier of the archived file.
+        sequence_nr: The sequence number of the record in the file.
+        reference: The full reference of the payment (sender id and reference).
+        recipient_iban: The IBAN of the recipient.
+        value_date: The value date of the payment.
+        currency: The currency of the payment.
+        amount: The amount of the payment.
+    """
+    file_id: str
+    sequence_nr: int
+    reference: str
+    recipient_iban: str
+    value_date: Union[date, None]
+    currency: str
+    amount: Decimal
+
+
+class DTAArchive(object):
+    """Directory of archived DTA files with an index of their payments.
+
+    Files are identified by the hash of their content, archiving the
+    same file twice is a no-op. Use the archive as a context manager
+    or close it after use to close the index database.
+    """
+
+    def __init__(self, directory: str):
+        """Open (or create) an archive.
+
+        Args:
+            directory: The directory of the archive, created if needed.
+        """
+        self.directory = directory
+        os.makedirs(os.path.join(directory, 'files'), exist_ok=True)
+        self._connection = sqlite3.connect(os.path.join(directory, 'index.db'))
+        self._connection.execute('PRAGMA journal_mode = WAL')
+        with self._connection:
+            self._connection.executescript('''
+                CREATE TABLE IF NOT EXISTS files (
+                    file_id TEXT PRIMARY KEY, record_count INTEGER NOT NULL, control_total TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS payments (
+                    file_id TEXT NOT NULL, sequence_nr INTEGER NOT NULL,
+                    sender_id TEXT NOT NULL, reference TEXT NOT NULL, recipient_iban TEXT NOT NULL,
+                    value_date INTEGER, currency TEXT NOT NULL, amount INTEGER NOT NULL,
+                    PRIMARY KEY (file_id, sequence_nr)
+                );
+                CREATE INDEX IF NOT EXISTS payments_reference ON payments (reference);
+                CREATE INDEX IF NOT EXISTS payments_recipient_iban ON payments (recipient_iban, value_date);
+                CREATE INDEX IF NOT EXISTS payments_value_date ON payments (value_date);
+                CREATE INDEX IF NOT EXISTS payments_amount ON payments (amount);
+            ''')
+
+    def __enter__(self) -> 'DTAArchive':
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._connection.execute('SELECT COUNT(*) FROM files').fetchone()[0]
+
+    def __contains__(self, file_id: str) -> bool:
+        return self._connection.execute('SELECT 1 FROM files WHERE file_id = ?', (file_id,)).fetchone() is not None
+
+    def close(self) -> None:
+        """Close the index database."""
+        self._connection.close()
+
+    def path(self, file_id: str) -> str:
+        """The path of an archived file.
+
+        Args:
+            file_id: The identifier of the archived file.
+        """
+        return os.path.join(self.directory, 'files', f'{file_id}.dta')
+
+    def add(self, content: bytes) -> str:
+        """Archive a generated DTA file and index its payments.
+
+        Args:
+            content: The content of the DTA file (as returned by ``DTAFile.generate``).
+
+        Returns: The identifier of the archived file.
+
+        Raises:
+            ValueError: When the content is not a valid DTA file of TA 836 records.
+        """
+        file_id = hashlib.sha256(content).hexdigest()[:32]
+        if file_id in self:
+            return file_id
+
+        path = self.path(file_id)
+        temporary_path = f'{path}.tmp'
+        with open(temporary_path, 'wb') as file:
+            file.write(content)
+        try:
+            with DTAFileView(temporary_path) as view:
+                with self._connection:
+                    self._connection.executemany(
+                        'INSERT INTO payments (file_id, sequence_nr, sender_id, reference, recipient_iban,'
+                        ' value_date, currency, amount) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                        ((file_id, sequence_nr, record.header.sender_id, record.reference,
+                          record.recipient_iban.strip(), _date_ordinal(parse_date(record.value_date)),
+                          record.currency, int(parse_amount(record.amount) * _AMOUNT_SCALE))
+                         for sequence_nr, record in enumerate(view, start=1))
+                    )
+                    self._connection.execute(
+                        'INSERT INTO files (file_id, record_count, control_total) VALUES (?, ?, ?)',
+                        (file_id, len(view), view.total_record.amount.strip())
+                    )
+            os.replace(temporary_path, path)
+        finally:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+        return file_id
+
+    def search(self,  # pylint: disable=too-many-arguments
+               reference: str = None,
+               recipient_iban: str = None,
+               value_date: date = None,
+               currency: str = None,
+               min_amount: Decimal = None,
+               max_amount: Decimal = None,
+               file_id: str = None,
+               limit: int = None) -> List[ArchivedPayment]:
+        """Search the payments of the archived files.
+
+        All the given criteria must match, omitted criteria match any payment.
+
+        Args:
+            reference: The full reference (sender id and reference) or the 11 characters reference.
+            recipient_iban: The IBAN of the recipient, compact or with spaces.
+            value_date: The value date.
+            currency: The currency code.
+            min_amount: The minimum amount (inclusive).
+            max_amount: The maximum amount (inclusive).
+            file_id: The identifier of the archived file.
+            limit: The maximum number of payments to return.
+
+        Returns: The matching payments, ordered by file and sequence number.
+        """
+        full_reference = reference is not None and len(reference) > 11
+        where, parameters = _where_clause((
+            ('sender_id = ?', reference[:-11] if full_reference else None),
+            ('reference = ?', reference[-11:].rjust(11, '0') if reference is not None else None),
+            ('recipient_iban = ?', remove_whitespace(recipient_iban).upper() if recipient_iban is not None else None),
+            ('value_date = ?', _date_ordinal(value_date)),
+            ('currency = ?', currency.upper() if currency is not None else None),
+            ('amount >= ?', int(Decimal(min_amount) * _AMOUNT_SCALE) if min_amount is not None else None),
+            ('amount <= ?', int(Decimal(max_amount) * _AMOUNT_SCALE) if max_amount is not None else None),
+            ('file_id = ?', file_id),
+        ))
+
+        query = ('SELECT file_id, sequence_nr, sender_id, reference, recipient_iban, value_date, currency, amount'
+                 f' FROM payments{where} ORDER BY file_id, sequence_nr')
+        if limit is not None:
+            query += ' LIMIT ?'
+            parameters.append(limit)
+
+        return [
+            ArchivedPayment(file_id=row[0], sequence_nr=row[1], reference=f'{row[2]}{row[3]}', recipient_iban=row[4],
+                            value_date=date.fromordinal(row[5]) if row[5] is not None else None,
+                            currency=row[6], amount=Decimal(row[7]) / _AMOUNT_SCALE)
+            for row in self._connection.execute(query, parameters)
+        ]
+
+
+def _date_ordinal(value: Union[date, None]) -> Union[int, None]:
+    return value.toordinal() if value is not None else None
+
+
+def _where_clause(criteria: Iterable[Tuple[str, Any]]) -> Tuple[str, List[Any]]:
+    """The WHERE clause and the parameters of the (condition, parameter) criteria whose parameter is not ``None``."""
+    given = [(condition, parameter) for condition, parameter in criteria if parameter is not None]
+    if not given:
+        return '', []
+    return f" WHERE {' AND '.join(condition for condition, _ in given)}", [parameter for _, parameter in given]
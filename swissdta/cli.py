@@ -0,0 +1,361 @@
+"""Command line interface to generate DTA files from payment exports.
+
+Payments are read from CSV or JSON Lines files (or the standard input)
+and added as TA 836 records. The columns (CSV) or keys (JSON Lines) are
+the arguments of ``DTAFile.add_836_record``. Multi-line values
+(``client_address``, ``recipient_address``, ``purpose`` and
+``bank_address``) are given either as numbered columns (e.g.
+``client_address1`` to ``client_address3``) or as JSON lists. Dates use
+the ISO format (``YYYY-MM-DD``), enum values are given by value (e.g.
+``U`` for ``identification_purpose``) and ``charges_rules`` also
+accepts the names ``OUR``, ``BEN`` and ``SHA``.
+
+The input is read lazily: with ``--split`` at most ``DTAFile.MAX_RECORDS``
+payments are held in memory at once, each part being written to its
+own file as soon as it is complete. Without ``--split``, the input is
+only read until there are more than ``DTAFile.MAX_RECORDS`` payments.
+An output file is only created once it has valid records.
+"""
+import csv
+import io
+import json
+import logging
+import os
+import sys
+from argparse import ArgumentParser, ArgumentTypeError, Namespace
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import date, datetime
+from decimal import Decimal
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Sequence, TextIO, Tuple, TypeVar, Union
+
+from swissdta.constants import ChargesRule, IdentificationBankAddress, IdentificationPurpose
+from swissdta.file import DTAFile
+
+
+log = logging.getLogger(__name__)
+
+T = TypeVar('T')  # pylint: disable=invalid-name
+Row = Tuple[str, Mapping[str, Any]]  # row identifier (source:line) and row values
+FORMATS = ('csv', 'jsonl')
+
+
+def _date(value: str) -> date:
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError as err:
+        raise ArgumentTypeError(f"invalid date: '{value}' (expected YYYY-MM-DD)") from err
+
+
+def _parser() -> ArgumentParser:
+    parser = ArgumentParser(prog='swissdta', description='Generate a DTA file of TA 836 records from payments.')
+    parser.add_argument('inputs', nargs='*', default=['-'], metavar='INPUT',
+                        help="CSV or JSON Lines files of payments ('-' for the standard input, the default)")
+    parser.add_argument('-f', '--format', choices=FORMATS,
+                        help='format of the inputs (default: guessed from the file extension)')
+    parser.add_argument('-o', '--output', help='output file (default: the standard output)')
+    parser.add_argument('--sender-id', required=True, help='data file sender identification (5 characters)')
+    parser.add_argument('--client-clearing', required=True, help="bank clearing no. of the ordering party's bank")
+    parser.add_argument('--creation-date', type=_date, help='creation date of the file (default: today)')
+    parser.add_argument('-j', '--workers', type=int, default=1, help='number of worker processes (default: 1)')
+    parser.add_argument('--chunk-size', type=int, default=1000,
+                        help='number of payments processed at once by a worker (default: 1000)')
+    parser.add_argument('--split', action='store_true',
+                        help=f'split the output in files of at most {DTAFile.MAX_RECORDS} records, '
+                             f'numbered after the output file name (e.g. payments.001.dta)')
+    parser.add_argument('--error-report', metavar='PATH', help='CSV file listing the rejected payments')
+    return parser
+
+
+def _input_format(path: str, input_format: str) -> str:
+    if input_format:
+        return input_format
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        return 'csv'
+    if extension in ('.jsonl', '.ndjson'):
+        return 'jsonl'
+    raise ValueError(f"Unknown format for input '{path}', use --format.")
+
+
+def _read_rows(stream: TextIO, name: str, input_format: str) -> Iterator[Row]:
+    if input_format == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield f'{name}:{reader.line_num}', row
+    else:
+        for line_num, line in enumerate(stream, start=1):
+            if line.strip():
+                yield f'{name}:{line_num}', json.loads(line, parse_float=Decimal)
+
+
+def read_payments(inputs: Sequence[str], input_format: str = None) -> Iterator[Row]:
+    """Lazily read the rows of payments from files.
+
+    Args:
+        inputs: The paths of the files to read, ``'-'`` for the standard input.
+        input_format: The format of the files (``'csv'`` or ``'jsonl'``),
+            guessed from the extension of each file if omitted.
+
+    Returns: An iterator of ``(row_id, row)`` tuples where ``row_id`` identifies the row (``file:line``).
+
+    Raises:
+        ValueError: When the format of a file cannot be guessed.
+    """
+    for path in inputs:
+        if path == '-':
+            if not input_format:
+                raise ValueError('The format of the standard input must be given with --format.')
+            yield from _read_rows(io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8', newline=''),
+                                  '<stdin>', input_format)
+        else:
+            with open(path, encoding='utf-8', newline='') as stream:
+                yield from _read_rows(stream, path, _input_format(path, input_format))
+
+
+def _lines(row: Mapping[str, Any], name: str, count: int) -> Tuple[str, ...]:
+    value = row.get(name)
+    if value is None:
+        value = [row.get(f'{name}{i}') for i in range(1, count + 1)]
+    elif isinstance(value, str):
+        value = [value]
+    value = [line if line is not None else '' for line in value]
+    return tuple(value + [''] * (count - len(value)))
+
+
+def _optional(row: Mapping[str, Any], name: str, default=None):
+    value = row.get(name)
+    return default if value is None or value == '' else value
+
+
+def _charges_rule(value) -> ChargesRule:
+    if isinstance(value, str) and value.upper() in ChargesRule.__members__:
+        return ChargesRule[value.upper()]
+    return ChargesRule(int(value))
+
+
+def payment_arguments(row: Mapping[str, Any]) -> Dict[str, Any]:
+    """Convert a row of an export into the arguments of ``DTAFile.add_836_record``.
+
+    Args:
+        row: The values of the payment, see the module's documentation for the format.
+
+    Returns: The keyword arguments for ``DTAFile.add_836_record``.
+
+    Raises:
+        KeyError: When a mandatory value is missing.
+        ValueError: When a value cannot be converted.
+        ArithmeticError: When an amount is not a valid decimal number.
+    """
+    processing_date = row['processing_date']
+    conversion_rate = _optional(row, 'conversion_rate')
+    return {
+        'reference': f"{row['reference']}",
+        'client_account': row['client_account'],
+        'processing_date': (processing_date if isinstance(processing_date, date)
+                            else datetime.strptime(processing_date, '%Y-%m-%d').date()),
+        'currency': row['currency'],
+        'amount': Decimal(f"{row['amount']}"),
+        'client_address': _lines(row, 'client_address', 3),
+        'recipient_iban': row['recipient_iban'],
+        'recipient_name': row['recipient_name'],
+        'recipient_address': _lines(row, 'recipient_address', 2),
+        'identification_purpose': IdentificationPurpose(_optional(row, 'identification_purpose', 'U')),
+        'purpose': _lines(row, 'purpose', 3),
+        'charges_rules': _charges_rule(row['charges_rules']),
+        'bank_address_type': IdentificationBankAddress(_optional(row, 'bank_address_type', 'D')),
+        'bank_address': _lines(row, 'bank_address', 2),
+        'conversion_rate': Decimal(f'{conversion_rate}') if conversion_rate is not None else None,
+    }
+
+
+def build_file(file_values: Tuple[str, str, date], rows: Iterable[Row]) -> Tuple[DTAFile, List[Tuple[str, str]]]:
+    """Build a DTA file from rows of payments.
+
+    Args:
+        file_values: The sender id, client clearing and creation date of the file.
+        rows: The rows of payments to add to the file.
+
+    Returns: The file and the rows which could not be converted into
+    a payment as a list of ``(row_id, reason)`` tuples.
+    """
+    dta_file = DTAFile(*file_values)
+    rejected_rows = []
+    for row_id, row in rows:
+        try:
+            dta_file.add_836_record(**payment_arguments(row))
+        except (KeyError, ValueError, TypeError, ArithmeticError) as err:
+            rejected_rows.append((row_id, f'{type(err).__name__}: {err}'))
+    return dta_file, rejected_rows
+
+
+def _chunks(iterable: Iterable[T], size: int) -> Iterator[List[T]]:
+    iterator = iter(iterable)
+    chunk = list(islice(iterator, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(iterator, size))
+
+
+def _ordered_map(executor: Executor, function: Callable[..., T], arguments: Iterable[tuple],
+                 max_pending: int) -> Iterator[T]:
+    # Unlike ``Executor.map``, only submit a bounded number of tasks to avoid consuming the whole input at once
+    pending = deque()
+    for args in arguments:
+        pending.append(executor.submit(function, *args))
+        if len(pending) >= max_pending:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def _part_path(output: str, part_number: int) -> str:
+    root, extension = os.path.splitext(output)
+    return f'{root}.{part_number:03}{extension}'
+
+
+class _LazyOutput(object):
+    """Binary output file only created when written to (a file without valid records writes nothing)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._stream = None
+
+    def __enter__(self) -> '_LazyOutput':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self._stream is not None:
+            self._stream.close()
+
+    def write(self, data: bytes) -> int:
+        """Write to the file, created by the first write.
+
+        Args:
+            data: The bytes to write.
+
+        Returns: The number of bytes written.
+        """
+        if self._stream is None:
+            # The file stays open until the output is exited (see ``__exit__``)
+            self._stream = open(self.path, 'wb')  # pylint: disable=consider-using-with
+        return self._stream.write(data)
+
+
+@contextmanager
+def _error_report(path: Union[str, None]) -> Iterator[Any]:
+    """Open the error report, yielding its CSV writer (``None`` without error report)."""
+    if not path:
+        yield None
+        return
+    with open(path, 'w', newline='', encoding='utf-8') as stream:
+        report_writer = csv.writer(stream)
+        report_writer.writerow(('part', 'row', 'reference', 'field', 'code', 'message'))
+        yield report_writer
+
+
+def _build_part(args: Namespace, file_values: Tuple[str, str, date], rows: Iterable[Row],
+                executor: Union[Executor, None]) -> Union[List[Tuple[DTAFile, List[Tuple[str, str]]]], None]:
+    """Build the files (and rejected rows) of a part, ``None`` if the part has too many payments."""
+    chunks = ((file_values, chunk) for chunk in _chunks(rows, args.chunk_size))
+    if executor is None:
+        built_shards = (build_file(*chunk) for chunk in chunks)
+    else:
+        built_shards = _ordered_map(executor, build_file, chunks, max_pending=2 * args.workers)
+
+    # Without --split, stop reading the input as soon as there are too many payments
+    shards = []
+    record_count = 0
+    for shard in built_shards:
+        shards.append(shard)
+        record_count += len(shard[0].records)
+        if record_count > DTAFile.MAX_RECORDS:
+            log.error('More than %d payments, use --split to generate multiple files.', DTAFile.MAX_RECORDS)
+            return None
+    return shards
+
+
+def _write_part(args: Namespace, dta_file: DTAFile, part_number: int) -> int:
+    if args.split:
+        with _LazyOutput(_part_path(args.output, part_number)) as stream:
+            return dta_file.write_to(stream)
+    if args.output:
+        with _LazyOutput(args.output) as stream:
+            return dta_file.write_to(stream)
+    written = dta_file.write_to(sys.stdout.buffer)
+    sys.stdout.buffer.flush()
+    return written
+
+
+def _write_reported_part(args: Namespace, file_values: Tuple[str, str, date],
+                         shards: List[Tuple[DTAFile, List[Tuple[str, str]]]], part_number: int,
+                         report_writer: Any) -> bool:
+    """Write a part and report its rejected rows and invalid records.
+
+    Returns: Whether all the payments of the part were written.
+    """
+    rejected_rows = [rejected_row for _, shard_rejected_rows in shards for rejected_row in shard_rejected_rows]
+    for row_id, reason in rejected_rows:
+        log.error('Payment at %s rejected: %s', row_id, reason)
+        if report_writer:
+            report_writer.writerow((part_number, row_id, '', '', 'INVALID_ROW', reason))
+
+    dta_file = DTAFile.merge(*(shard for shard, _ in shards)) if shards else DTAFile(*file_values)
+    written = _write_part(args, dta_file, part_number)
+    report = dta_file.report
+    if report is not None and report_writer:
+        report_writer.writerows((part_number, '', entry.reference, entry.field, entry.code.value, entry.message)
+                                for entry in report.errors)
+    return bool(written) and not rejected_rows and (report is None or bool(report) and not report.errors)
+
+
+def run(args: Namespace, executor: Executor = None) -> int:
+    """Generate the DTA file(s) for parsed command line arguments.
+
+    Args:
+        args: The parsed command line arguments.
+        executor: The executor building the records (default: build them in the current process).
+
+    Returns: The exit status, ``0`` if all the payments were written, ``1`` otherwise.
+    """
+    file_values = (args.sender_id, args.client_clearing, args.creation_date or datetime.now().date())
+    rows = read_payments(args.inputs, args.format)
+    parts = _chunks(rows, DTAFile.MAX_RECORDS) if args.split else iter([rows])
+
+    exit_status = 0
+    with _error_report(args.error_report) as report_writer:
+        for part_number, part_rows in enumerate(parts, start=1):
+            shards = _build_part(args, file_values, part_rows, executor)
+            if shards is None:
+                return 1
+            if not _write_reported_part(args, file_values, shards, part_number, report_writer):
+                exit_status = 1
+    return exit_status
+
+
+def main(argv: Sequence[str] = None) -> int:
+    """Entry point of the ``swissdta`` command.
+
+    Args:
+        argv: The command line arguments (default: ``sys.argv[1:]``).
+
+    Returns: The exit status.
+    """
+    parser = _parser()
+    args = parser.parse_args(argv)
+    if args.workers < 1 or args.chunk_size < 1:
+        parser.error('--workers and --chunk-size must be positive')
+    if args.split and not args.output:
+        parser.error('--split requires --output')
+    logging.basicConfig(format='%(levelname)s: %(message)s', level=logging.WARNING)
+
+    try:
+        if args.workers == 1:
+            return run(args)
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            return run(args, executor)
+    except (OSError, ValueError) as err:
+        log.error('%s', err)
+        return 2
@@ -47,6 +47,126 @@ class ChargesRule(IntEnum):
     SHA = 2
 
 
+class UnencodablePolicy(Enum):
+    """Enumerates how alphanumeric fields handle characters which cannot be encoded in latin-1.
+
+    Attributes:
+        ERROR: The value is kept and is invalid
+        REPLACE: Each character is replaced by ``'.'`` (with a warning)
+        DECOMPOSE: Each character is replaced by its base characters if it
+            has any (e.g. ``'č'`` by ``'c'``), by ``'.'`` otherwise (with a warning)
+    """
+    ERROR = 'error'
+    REPLACE = 'replace'
+    DECOMPOSE = 'decompose'
+
+
+class ErrorCode(Enum):
+    """Enumerates the types of validation errors and warnings.
+
+    The values are stable and can safely be persisted
+    or used to filter the issues of a record.
+    """
+    OTHER = 'OTHER'
+    TOO_LONG = 'TOO_LONG'
+    NOT_PERMITTED_VALUE = 'NOT_PERMITTED_VALUE'
+    TRUNCATED = 'TRUNCATED'
+    NOT_NUMERICAL = 'NOT_NUMERICAL'
+    ZERO_AMOUNT = 'ZERO_AMOUNT'
+    NEGATIVE_AMOUNT = 'NEGATIVE_AMOUNT'
+    INVALID_CURRENCY = 'INVALID_CURRENCY'
+    INVALID_IBAN = 'INVALID_IBAN'
+    INVALID_DATE_TYPE = 'INVALID_DATE_TYPE'
+    INVALID_CREATION_DATE = 'INVALID_CREATION_DATE'
+    CREATION_DATE_OUT_OF_RANGE = 'CREATION_DATE_OUT_OF_RANGE'
+    PROCESSING_DATE_NOT_PERMITTED = 'PROCESSING_DATE_NOT_PERMITTED'
+    RECIPIENT_CLEARING_NOT_BLANK = 'RECIPIENT_CLEARING_NOT_BLANK'
+    CLIENT_CLEARING_NOT_BLANK = 'CLIENT_CLEARING_NOT_BLANK'
+    INVALID_TRANSACTION_TYPE = 'INVALID_TRANSACTION_TYPE'
+    INVALID_PAYMENT_TYPE = 'INVALID_PAYMENT_TYPE'
+    MISSING_REFERENCE = 'MISSING_REFERENCE'
+    DUPLICATE_REFERENCE = 'DUPLICATE_REFERENCE'
+    INVALID_CLIENT_ACCOUNT = 'INVALID_CLIENT_ACCOUNT'
+    IID_MISMATCH = 'IID_MISMATCH'
+    INVALID_VALUE_DATE = 'INVALID_VALUE_DATE'
+    VALUE_DATE_EXPIRED = 'VALUE_DATE_EXPIRED'
+    VALUE_DATE_TOO_FAR_AHEAD = 'VALUE_DATE_TOO_FAR_AHEAD'
+    TOO_MANY_DECIMAL_PLACES = 'TOO_MANY_DECIMAL_PLACES'
+    MISSING_CLIENT_ADDRESS = 'MISSING_CLIENT_ADDRESS'
+    INCOMPLETE_CLIENT_ADDRESS = 'INCOMPLETE_CLIENT_ADDRESS'
+    CLIENT_ADDRESS_CONTAINS_C = 'CLIENT_ADDRESS_CONTAINS_C'
+    INVALID_BIC = 'INVALID_BIC'
+    SEQUENCE_ERROR = 'SEQUENCE_ERROR'
+    DIFFERENT_CREATION_DATE = 'DIFFERENT_CREATION_DATE'
+    DIFFERENT_SENDER_ID = 'DIFFERENT_SENDER_ID'
+    DUPLICATE_PAYMENT = 'DUPLICATE_PAYMENT'
+    INVALID_CHARACTER = 'INVALID_CHARACTER'
+    REPLACED_CHARACTER = 'REPLACED_CHARACTER'
+
+
+ERROR_MESSAGES = {
+    ErrorCode.OTHER: '{message}',
+    ErrorCode.TOO_LONG: "TOO LONG: '{value}' can be at most {length} characters",
+    ErrorCode.NOT_PERMITTED_VALUE: "INVALID: Only {allowed_values} permitted (got: '{value}')",
+    ErrorCode.TRUNCATED: "WARNING: '{value}' over {length} characters long, truncating to '{truncated_value}'",
+    ErrorCode.NOT_NUMERICAL: "NOT NUMERICAL: Only digits allowed (got: '{value}')",
+    ErrorCode.ZERO_AMOUNT: 'INVALID: May not be zero',
+    ErrorCode.NEGATIVE_AMOUNT: 'INVALID: May not be negative',
+    ErrorCode.INVALID_CURRENCY: "INVALID: Must contain a valid ISO currency code. (got: '{value}')",
+    ErrorCode.INVALID_IBAN: 'IBAN INVALID: {reason}',
+    ErrorCode.INVALID_DATE_TYPE: 'INVALID: date must contain a valid date or None ({null_date}).',
+    ErrorCode.INVALID_CREATION_DATE: 'INVALID: must contain a valid date.',
+    ErrorCode.CREATION_DATE_OUT_OF_RANGE: ('INVALID: creation date may not differ by +/- 90 calendar days'
+                                           ' from the date when read in.'),
+    ErrorCode.PROCESSING_DATE_NOT_PERMITTED: "NOT PERMITTED: header processing date must be '000000'.",
+    ErrorCode.RECIPIENT_CLEARING_NOT_BLANK: "NOT ALLOWED: beneficiary's bank clearing number must be blank.",
+    ErrorCode.CLIENT_CLEARING_NOT_BLANK: 'INVALID: must be completed with blanks',
+    ErrorCode.INVALID_TRANSACTION_TYPE: 'INVALID: Transaction type must be TA {transaction_type}.',
+    ErrorCode.INVALID_PAYMENT_TYPE: 'INVALID: Payment type must be 0 or 1 TA {transaction_type}.',
+    ErrorCode.MISSING_REFERENCE: 'MISSING TRANSACTION NUMBER: Reference may not be blank.',
+    ErrorCode.DUPLICATE_REFERENCE: ("DUPLICATE TRANSACTION NUMBER: reference '{reference}'"
+                                    " is present more than once."),
+    ErrorCode.INVALID_CLIENT_ACCOUNT: ('IBAN INVALID: Client account must be a valid with'
+                                       ' a 21 digit Swiss IBAN (CH resp. LI) .'),
+    ErrorCode.IID_MISMATCH: ("IID IN IBAN NOT IDENTICAL WITH BC-NO: IID in IBAN (pos. 5 to 9) must concur with the"
+                             " ordering party's BC no."),
+    ErrorCode.INVALID_VALUE_DATE: 'INVALID: Must contain a valid date.',
+    ErrorCode.VALUE_DATE_EXPIRED: 'EXPIRED: value date may not be elapsed more than 10 calendar days.',
+    ErrorCode.VALUE_DATE_TOO_FAR_AHEAD: 'TOO FAR AHEAD: value date may not exceed the reading in date + 60 days.',
+    ErrorCode.TOO_MANY_DECIMAL_PLACES: ('MORE THAN {max_decimal_places} DECIMAL PLACES: {subject} may not contain'
+                                        ' more than {max_decimal_places} decimal places.'),
+    ErrorCode.MISSING_CLIENT_ADDRESS: 'INCOMPLETE: Ordering party address, at least one line must exist.',
+    ErrorCode.INCOMPLETE_CLIENT_ADDRESS: 'INCOMPLETE: At least two address lines must exist.',
+    ErrorCode.CLIENT_ADDRESS_CONTAINS_C: 'INVALID: /C/ may not be present for TA 836.',
+    ErrorCode.INVALID_BIC: ('INCORRECT FIELD IDENTIFICATION: bank address type {bank_address_type} may only'
+                            ' be used if an 8 or 11 character BIC address (SWIFT) exists.'),
+    ErrorCode.SEQUENCE_ERROR: ('SEQUENCE ERROR: Must be consecutive commencing with 1 in ascending order.'
+                               ' (expected {expected}, got {actual})'),
+    ErrorCode.DIFFERENT_CREATION_DATE: ('DIFFERENT: Must be identical with the creation date'
+                                        ' on the first record of the data file.'),
+    ErrorCode.DIFFERENT_SENDER_ID: 'DIFFERENT: Must be identical with the first record on the data carrier.',
+    ErrorCode.DUPLICATE_PAYMENT: "DUPLICATE PAYMENT: already sent on {sent_on} with reference '{reference}'.",
+    ErrorCode.INVALID_CHARACTER: "INVALID CHARACTER: '{character}' cannot be encoded in ISO 8859-1 (latin-1).",
+    ErrorCode.REPLACED_CHARACTER: ("WARNING: '{character}' cannot be encoded in ISO 8859-1 (latin-1),"
+                                   " replaced by '{replacement}'"),
+}
+"""dict of ErrorCode: str: Templates of the human readable messages for each error code.
+
+The templates are formatted with the parameters of the issue."""
+
+
+DATE_FORMAT = '%y%m%d'
+"""str: Format of the dates of the DTA files (YYMMDD)."""
+
+MAX_DECIMAL_PLACES = {'CHF': 2}
+"""dict of str: int: Maximum number of decimal places of the amount for specific currencies.
+
+Currencies not in the mapping use ``FOREIGN_MAX_DECIMAL_PLACES``."""
+
+FOREIGN_MAX_DECIMAL_PLACES = 3
+"""int: Maximum number of decimal places of the amount for (foreign) currencies not in ``MAX_DECIMAL_PLACES``."""
+
+
 CONVERTED_CHARACTERS = {
     0: '.',
     1: '.',
@@ -0,0 +1,182 @@
+"""Differences between two DTA files.
+
+The records of both files are matched by their full reference (sender
+id and 11 characters reference). Each record body (the record without
+its header, which holds the sequence number and creation date) is hashed
+while the files are read sequentially, such that only the records whose
+hash differs are compared field by field.
+
+The module can also be run as a command::
+
+    python -m swissdta.diff old.dta new.dta
+"""
+import hashlib
+import os
+import sys
+from argparse import ArgumentParser
+from typing import BinaryIO, Dict, Iterator, List, NamedTuple, Sequence, Tuple, Union
+
+from swissdta.layout import HEADER_SPANS, RECORD_836_SIZE, SPANS_836
+from swissdta.view import RecordView836
+
+_HEADER_START = min(span.start for span in HEADER_SPANS.values())
+_HEADER_STOP = max(span.stop for span in HEADER_SPANS.values())
+_BODY_FIELDS = tuple(name for name in SPANS_836 if name not in HEADER_SPANS and name != 'sender_reference')
+_REFERENCE = slice(SPANS_836['sender_reference'].start, SPANS_836['reference'].stop)
+
+
+class FieldChange(NamedTuple):
+    """A field with different values in both files.
+
+    Attributes:
+        field: The name of the field (as in ``DTARecord836``).
+        old: The formatted value in the old file.
+        new: The formatted value in the new file.
+    """
+    field: str
+    old: str
+    new: str
+
+
+class RecordChange(NamedTuple):
+    """A record present in both files with different values.
+
+    Attributes:
+        reference: The full reference of the record (sender id and reference).
+        changes: The fields with different values.
+    """
+    reference: str
+    changes: List[FieldChange]
+
+
+class FileDiff(NamedTuple):
+    """The differences between two DTA files.
+
+    Attributes:
+        added: The references of the records only in the new file, in the order of the new file.
+        removed: The references of the records only in the old file, in the order of the old file.
+        changed: The records in both files with different values, in the order of the new file.
+    """
+    added: List[str]
+    removed: List[str]
+    changed: List[RecordChange]
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+
+def _body_hash(record: bytes) -> bytes:
+    body = hashlib.blake2b(record[:_HEADER_START], digest_size=16)
+    body.update(record[_HEADER_STOP:])
+    return body.digest()
+
+
+def _records(stream: BinaryIO, buffer_records: int = 1024) -> Iterator[Tuple[int, bytes]]:
+    """Iterate over the TA 836 records of a stream, ignoring the final TA 890 record."""
+    tail = b''
+    position = 0
+    block_size = buffer_records * RECORD_836_SIZE
+    transaction_type = SPANS_836['transaction_type']
+    while True:
+        block = stream.read(block_size)
+        if not block:
+            break
+        data = tail + block if tail else block
+        end = len(data) - len(data) % RECORD_836_SIZE
+        for offset in range(0, end, RECORD_836_SIZE):
+            record = data[offset:offset + RECORD_836_SIZE]
+            if record[transaction_type] != b'836':
+                raise ValueError(f'Invalid DTA file: record at byte {position + offset} is not a TA 836 record.')
+            yield position + offset, record
+        tail = data[end:]
+        position += end
+
+
+def _index(stream: BinaryIO) -> Dict[bytes, Tuple[bytes, Union[int, bytes]]]:
+    # Seekable files only keep the offsets of the records, which are read again if they changed
+    seekable = stream.seekable()
+    return {record[_REFERENCE]: (_body_hash(record), offset if seekable else record)
+            for offset, record in _records(stream)}
+
+
+def _field_changes(old_record: bytes, new_record: bytes) -> List[FieldChange]:
+    old_view, new_view = RecordView836(old_record), RecordView836(new_record)
+    changes = []
+    for name in _BODY_FIELDS:
+        old_value, new_value = getattr(old_view, name), getattr(new_view, name)
+        if old_value != new_value:
+            changes.append(FieldChange(name, old_value, new_value))
+    return changes
+
+
+def diff(old: Union[str, BinaryIO], new: Union[str, BinaryIO]) -> FileDiff:
+    """Compare the TA 836 records of two DTA files.
+
+    The old file is indexed in a first pass, the new file is then
+    streamed and compared to the index, both in linear time. References
+    are expected to be unique within each file.
+
+    Args:
+        old: The path or binary stream of the old file.
+        new: The path or binary stream of the new file.
+
+    Returns: The added, removed and changed records.
+
+    Raises:
+        ValueError: When a file is not a DTA file of TA 836 records.
+    """
+    if isinstance(old, (str, os.PathLike)):
+        with open(old, 'rb') as old_stream:
+            return diff(old_stream, new)
+    if isinstance(new, (str, os.PathLike)):
+        with open(new, 'rb') as new_stream:
+            return diff(old, new_stream)
+
+    old_index = _index(old)
+    seen = set()
+    added = []
+    changed = []
+    for _, record in _records(new):
+        reference = record[_REFERENCE]
+        seen.add(reference)
+        if reference not in old_index:
+            added.append(reference.decode('latin-1'))
+            continue
+        old_hash, old_record = old_index[reference]
+        if old_hash != _body_hash(record):
+            if isinstance(old_record, int):
+                old.seek(old_record)
+                old_record = old.read(RECORD_836_SIZE)
+            changed.append(RecordChange(reference.decode('latin-1'), _field_changes(old_record, record)))
+
+    removed = [reference.decode('latin-1') for reference in old_index if reference not in seen]
+    return FileDiff(added, removed, changed)
+
+
+def main(argv: Sequence[str] = None) -> int:
+    """Print the differences between two DTA files.
+
+    Args:
+        argv: The command line arguments (default: ``sys.argv[1:]``).
+
+    Returns: The exit status, ``0`` if the files have the same records, ``1`` otherwise.
+    """
+    parser = ArgumentParser(prog='python -m swissdta.diff', description='Compare the records of two DTA files.')
+    parser.add_argument('old', help='the old DTA file')
+    parser.add_argument('new', help='the new DTA file')
+    args = parser.parse_args(argv)
+
+    file_diff = diff(args.old, args.new)
+    for reference in file_diff.removed:
+        print(f'- {reference}')
+    for reference in file_diff.added:
+        print(f'+ {reference}')
+    for record_change in file_diff.changed:
+        print(f'~ {record_change.reference}')
+        for change in record_change.changes:
+            print(f'    {change.field}: {change.old.rstrip()!r} -> {change.new.rstrip()!r}')
+    return 1 if file_diff else 0
+
+
+if __name__ == '__main__':  # pragma: no cover
+    sys.exit(main())
@@ -0,0 +1,137 @@
+"""Persistent index of the payments sent across DTA files.
+
+``DTAFile`` only detects duplicate references within a single file. A
+``DuplicateIndex`` keeps a content hash of every generated TA 836
+record in a local SQLite database, such that a payment which was
+already sent in a previous file can be detected when a new file
+is generated.
+"""
+import hashlib
+import sqlite3
+from datetime import date, timedelta
+from typing import Iterable, NamedTuple, Union
+
+from swissdta.records import DTARecord836
+
+# Fields identifying a payment, the value date and the addresses are left out
+# such that a payment sent again on a later date is still detected.
+HASHED_FIELDS = ('client_account', 'currency', 'amount', 'recipient_iban', 'purpose1', 'purpose2', 'purpose3')
+
+
+def payment_hash(record: DTARecord836) -> bytes:
+    """Compute the content hash of a payment.
+
+    Args:
+        record: The TA 836 record (or record view) of the payment.
+
+    Returns: A 16 bytes digest of the fields identifying the payment (see ``HASHED_FIELDS``).
+    """
+    content = '\x00'.join(getattr(record, name) for name in HASHED_FIELDS)
+    return hashlib.blake2b(content.encode('latin-1', errors='replace'), digest_size=16).digest()
+
+
+class SentPayment(NamedTuple):
+    """A payment recorded in the index.
+
+    Attributes:
+        reference: The full reference of the payment (sender id and reference).
+        sent_on: The creation date of the file in which the payment was sent.
+    """
+    reference: str
+    sent_on: date
+
+
+class DuplicateIndex(object):
+    """Persistent index of the payments of generated files.
+
+    The index is a SQLite database with a single table clustered by content
+    hash and date, lookups remain fast with millions of payments. Payments
+    are only flagged if they were sent within ``window`` before the creation
+    date of the new file. A payment recorded with the same reference and
+    creation date is not a duplicate: it is the same file generated again.
+
+    The index is used by ``DTAFile`` (see its ``duplicate_index``
+    parameter) but can also be queried and filled directly.
+    """
+
+    def __init__(self, path: str, window: timedelta = timedelta(days=14)):
+        """Open (or create) an index.
+
+        Args:
+            path: The path of the SQLite database.
+            window: How long a payment is considered to be already sent.
+        """
+        self.path = path
+        self.window = window
+        # Files generated asynchronously look payments up from executor threads, one at a time
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute('PRAGMA journal_mode = WAL')
+        self._connection.execute('PRAGMA synchronous = NORMAL')
+        self._connection.execute('PRAGMA cache_size = -65536')  # 64 MiB, inserts of random hashes touch many pages
+        with self._connection:
+            # The table is clustered on the content hash, lookups only read the matching rows
+            self._connection.execute('CREATE TABLE IF NOT EXISTS payments ('
+                                     'content_hash BLOB NOT NULL, sent_on INTEGER NOT NULL, reference TEXT NOT NULL,'
+                                     ' PRIMARY KEY (content_hash, sent_on, reference)) WITHOUT ROWID')
+            # References are looked up when appending to a generated file (see ``DTAFile.append_to``)
+            self._connection.execute('CREATE INDEX IF NOT EXISTS payments_by_reference'
+                                     ' ON payments (reference, sent_on)')
+
+    def __enter__(self) -> 'DuplicateIndex':
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._connection.execute('SELECT COUNT(*) FROM payments').fetchone()[0]
+
+    def close(self) -> None:
+        """Close the database."""
+        self._connection.close()
+
+    def find(self, record: DTARecord836, sent_on: date) -> Union[SentPayment, None]:
+        """Find a previous payment with the same content.
+
+        Args:
+            record: The TA 836 record (or record view) to look up.
+            sent_on: The creation date of the file of the record.
+
+        Returns: The most recent previous payment within the window, ``None`` if there is none.
+        """
+        reference = f'{record.header.sender_id}{record.reference}'
+        row = self._connection.execute(
+            'SELECT reference, sent_on FROM payments'
+            ' WHERE content_hash = ? AND sent_on >= ? AND sent_on <= ? AND NOT (reference = ? AND sent_on = ?)'
+            ' ORDER BY sent_on DESC LIMIT 1',
+            (payment_hash(record), (sent_on - self.window).toordinal(), sent_on.toordinal(),
+             reference, sent_on.toordinal())
+        ).fetchone()
+        return SentPayment(row[0], date.fromordinal(row[1])) if row is not None else None
+
+    def has_reference(self, reference: str, sent_on: date) -> bool:
+        """Whether a payment was recorded with a reference on a date.
+
+        Args:
+            reference: The full reference of the payment (sender id and reference).
+            sent_on: The creation date of the file of the payment.
+        """
+        return self._connection.execute('SELECT 1 FROM payments WHERE reference = ? AND sent_on = ?',
+                                        (reference, sent_on.toordinal())).fetchone() is not None
+
+    def add(self, records: Iterable[DTARecord836], sent_on: date) -> None:
+        """Record sent payments.
+
+        Payments already recorded with the same reference on
+        the same date (i.e. the same file) are not added again.
+
+        Args:
+            records: The TA 836 records (or record views) of the sent payments.
+            sent_on: The creation date of the file of the records.
+        """
+        ordinal = sent_on.toordinal()
+        with self._connection:
+            self._connection.executemany(
+                'INSERT OR IGNORE INTO payments (content_hash, reference, sent_on) VALUES (?, ?, ?)',
+                ((payment_hash(record), f'{record.header.sender_id}{record.reference}', ordinal) for record in records)
+            )
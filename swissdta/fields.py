@@ -2,23 +2,25 @@
 
 The fields module contains the definitions of all the fields used by DTA Records.
 """
+import unicodedata
 from datetime import date
 from enum import Enum, EnumMeta
 
 from decimal import Decimal
-from typing import List
+from typing import TYPE_CHECKING, Any, List, Tuple
 from weakref import WeakKeyDictionary
 
-from iso4217 import Currency as CurrencyCode
-from schwifty import IBAN
-
-from swissdta.constants import CONVERTED_CHARACTERS, FillSide
+from swissdta.constants import CONVERTED_CHARACTERS, DATE_FORMAT, ErrorCode, FillSide, UnencodablePolicy
+from swissdta.util import currency_table, lazy_import
 
 # pylint: disable=useless-super-delegation, too-few-public-methods
 # useless-super-delegation disabled as it clashes with type annotations
 # too-few-public-methods disabled as each field defines a different behavior
 # but doesn't need to redefine its public API
-from swissdta.records.common import ValidationLogMixin
+from swissdta.records.common import ValidationIssue, ValidationLogMixin
+
+if TYPE_CHECKING:  # pragma: no cover
+    from schwifty import IBAN  # pylint: disable=unused-import
 
 
 class Field(object):
@@ -53,7 +55,8 @@ class Field(object):
         return self._format_value(self.data.get(instance, self.default)) if instance is not None else self
 
     def __set__(self, instance: ValidationLogMixin, value) -> None:
-        instance.set_warnings(self.name)  # remove all warnings on new value
+        value, warnings = self._convert(value)
+        instance.set_warnings(self.name, *warnings)  # replaces all the warnings of the previous value
         instance.set_errors(self.name, *self.validate(value))
         self.data[instance] = value
 
@@ -61,13 +64,45 @@ class Field(object):
         name = self.name if self.name else 'UNREGISTERED'
         return f'<{self.__class__.__name__}(length={self.length}, name={name})>'
 
+    def check(self, value) -> Tuple[str, List[ValidationIssue], List[ValidationIssue]]:
+        """Check a value without setting it.
+
+        The value is converted and validated exactly as it would
+        be when set on a record, without requiring a record.
+
+        Args:
+            value: The value to check
+
+        Returns: The formatted value, the validation errors and the validation warnings.
+        """
+        value, errors, warnings = self.convert(value)
+        return self._format_value(value), errors, warnings
+
+    def convert(self, value) -> Tuple[Any, List[ValidationIssue], List[ValidationIssue]]:
+        """Convert and validate a value without setting it.
+
+        Args:
+            value: The value to convert
+
+        Returns: The converted value (as stored for a record), the validation errors and the validation warnings.
+        """
+        value, warnings = self._convert(value)
+        return value, self.validate(value), warnings
+
+    def _convert(self, value) -> Tuple[Any, List[ValidationIssue]]:
+        """Convert a new value before it is validated and set.
+
+        Returns: The converted value and the warnings raised by the conversion.
+        """
+        return value, []
+
     def _format_value(self, value: str) -> str:
         if self.fillside == FillSide.LEFT:
             return (value if value is not None else '').rjust(self.length, self.fillchar)
         elif self.fillside == FillSide.RIGHT:
             return (value if value is not None else '').ljust(self.length, self.fillchar)
 
-    def validate(self, value) -> List[str]:
+    def validate(self, value) -> List[ValidationIssue]:
         """Validate the value of a field.
 
         This base validation only validates the length, children should
@@ -82,11 +117,11 @@ class Field(object):
         Args:
             value: The value to validate (usually a new value to set)
 
-        Returns: An array of validation errors (empty if no errors)
+        Returns: An array of validation issues (empty if no errors)
         """
         formatted_value = self._format_value(value)
         if len(formatted_value) > self.length:
-            return [f"TOO LONG: '{formatted_value}' can be at most {self.length} characters"]
+            return [ValidationIssue(ErrorCode.TOO_LONG, self.name, {'value': formatted_value, 'length': self.length})]
         return []
 
 
@@ -112,12 +147,12 @@ class AllowedValuesMixin(object):
 
         super().__init__(*args, **kwargs)
 
-    def __set__(self, instance, value) -> None:
+    def _convert(self, value) -> Tuple[Any, List[ValidationIssue]]:
         if isinstance(value, Enum):
             value = value.value
-        super().__set__(instance, value)
+        return super()._convert(value)
 
-    def validate(self, value) -> List[str]:
+    def validate(self, value) -> List[ValidationIssue]:
         """Validate a value against the set of given allowed values
 
         Args:
@@ -131,46 +166,94 @@ class AllowedValuesMixin(object):
             return errors
 
         if value not in self.allowed_values:
-            errors.append(f"INVALID: Only {self.allowed_values} permitted (got: '{value}')")
+            errors.append(ValidationIssue(ErrorCode.NOT_PERMITTED_VALUE, self.name,
+                                          {'allowed_values': self.allowed_values, 'value': value}))
 
         return errors
 
 
 class AlphaNumeric(AllowedValuesMixin, Field):
-    """Field accepting alphanumeric characters."""
-    def __init__(self, length: int, *args, truncate: bool = False, default: str = '', **kwargs):
+    """Field accepting alphanumeric characters.
+
+    Attributes:
+        unencodable_policy: How characters which cannot be encoded in latin-1
+            are handled (see ``UnencodablePolicy``). Set on the class to
+            change the default of all the alphanumeric fields.
+    """
+    unencodable_policy: UnencodablePolicy = UnencodablePolicy.ERROR
+
+    def __init__(self, length: int, *args, truncate: bool = False, default: str = '',
+                 unencodable_policy: UnencodablePolicy = None, **kwargs):
         """Creates a new alphanumeric field.
 
         Note: The length is mandatory and applies to the formatted
         version of the value. This field automatically converts invalid
         characters into valid ones. Some invalid characters can be
         converted into a sequence of characters (e.g. ``ü`` into ``ue``).
+        Characters which cannot be encoded in latin-1 are detected when
+        the value is set and handled according to the ``unencodable_policy``.
 
         Args:
             length: The length of the field value in characters.
             truncate: Whether to truncate the value if it is over the length or not.
             default: The default alphanumeric value
+            unencodable_policy: The policy of this field for characters which cannot be
+                encoded in latin-1 (default: ``AlphaNumeric.unencodable_policy``).
         """
         self.truncate = truncate
+        if unencodable_policy is not None:
+            self.unencodable_policy = unencodable_policy
         super().__init__(length, *args, default=default, **kwargs)
 
     def __set__(self, instance: ValidationLogMixin, value: str) -> None:
-        if hasattr(value, 'value'):  # Ugly but needed before calling super and super is where this happens
+        super().__set__(instance, value)
+
+    def _convert(self, value: str) -> Tuple[str, List[ValidationIssue]]:
+        if hasattr(value, 'value'):  # Enum values must be unwrapped before converting the characters
             value = value.value
 
-        value = ''.join(CONVERTED_CHARACTERS.get(ord(char), char) for char in value)
+        value = value.translate(CONVERTED_CHARACTERS)
+        value, warnings = super()._convert(value)
+        if self.unencodable_policy != UnencodablePolicy.ERROR:
+            try:
+                value.encode('latin-1')
+            except UnicodeEncodeError:
+                value = self._replace_unencodable(value, warnings)
 
         if self.truncate and len(value) > self.length:  # if truncate is True, value is truncated automatically
-            old_value = value                           # and will always be of valid length
-            value = value[:self.length]
-        else:
-            old_value = False
-
-        super(AlphaNumeric, self).__set__(instance, value)
-
-        if old_value:  # must add the warning after call to super which set the initial warnings and errors
-            instance.add_warning(self.name,
-                                 f"WARNING: '{old_value}' over {self.length} characters long, truncating to '{value}'")
+            truncated_value = value[:self.length]       # and will always be of valid length
+            params = {'value': value, 'length': self.length, 'truncated_value': truncated_value}
+            warnings.append(ValidationIssue(ErrorCode.TRUNCATED, self.name, params))
+            value = truncated_value
+
+        return value, warnings
+
+    def _replace_unencodable(self, value: str, warnings: List[ValidationIssue]) -> str:
+        characters = []
+        for character in value:
+            if ord(character) < 256:  # the characters of latin-1 are the first 256 code points
+                characters.append(character)
+                continue
+            replacement = ''
+            if self.unencodable_policy == UnencodablePolicy.DECOMPOSE:
+                replacement = ''.join(base for base in unicodedata.normalize('NFKD', character)
+                                      if ord(base) < 256 and not unicodedata.combining(base))
+                replacement = replacement.translate(CONVERTED_CHARACTERS)
+            replacement = replacement or '.'
+            characters.append(replacement)
+            warnings.append(ValidationIssue(ErrorCode.REPLACED_CHARACTER, self.name,
+                                            {'character': character, 'replacement': replacement}))
+        return ''.join(characters)
+
+    def validate(self, value: str) -> List[ValidationIssue]:
+        """Validate that the value can be encoded in latin-1."""
+        errors = super().validate(value)
+        try:
+            value.encode('latin-1')
+        except UnicodeEncodeError as err:
+            errors.append(ValidationIssue(ErrorCode.INVALID_CHARACTER, self.name,
+                                          {'character': err.object[err.start]}))
+        return errors
 
 
 class Numeric(AllowedValuesMixin, Field):
@@ -189,7 +272,7 @@ class Numeric(AllowedValuesMixin, Field):
     def _format_value(self, value: int) -> str:
         return super()._format_value(f'{value}')
 
-    def validate(self, value: int) -> List[str]:
+    def validate(self, value: int) -> List[ValidationIssue]:
         """Validate that the value only contains numeric characters.
 
         Args:
@@ -197,7 +280,7 @@ class Numeric(AllowedValuesMixin, Field):
         """
         errors = super().validate(value)
         if not isinstance(value, int) and not str(value).isdigit():
-            errors.append(f"NOT NUMERICAL: Only digits allowed (got: '{value}')")
+            errors.append(ValidationIssue(ErrorCode.NOT_NUMERICAL, self.name, {'value': value}))
         return errors
 
 
@@ -234,7 +317,7 @@ class Amount(Field):
                 formatted_amount = f'{integers},{decimals}'
         return super()._format_value(formatted_amount)
 
-    def validate(self, value: Decimal) -> List[str]:
+    def validate(self, value: Decimal) -> List[ValidationIssue]:
         """Validate that the value is positive.
 
         The value must be ``Decimal``.
@@ -244,9 +327,9 @@ class Amount(Field):
             return errors
 
         if value.is_zero():
-            errors.append('INVALID: May not be zero')
+            errors.append(ValidationIssue(ErrorCode.ZERO_AMOUNT, self.name, {}))
         elif value.is_signed():
-            errors.append('INVALID: May not be negative')
+            errors.append(ValidationIssue(ErrorCode.NEGATIVE_AMOUNT, self.name, {}))
         return errors
 
 
@@ -263,15 +346,16 @@ class Currency(Field):
         super().__init__(length, *args, default=default, **kwargs)
 
     def __set__(self, instance, value: str) -> None:
-        super().__set__(instance, value.upper() if value is not None else value)
+        super().__set__(instance, value)
 
-    def validate(self, value: str) -> List[str]:
+    def _convert(self, value: str) -> Tuple[str, List[ValidationIssue]]:
+        return super()._convert(value.upper() if value is not None else value)
+
+    def validate(self, value: str) -> List[ValidationIssue]:
         """Validate that the value is a valid ISO 4217 currency code."""
         errors = super(Currency, self).validate(value)
-        try:
-            CurrencyCode(value)
-        except ValueError:
-            errors.append(f"INVALID: Must contain a valid ISO currency code. (got: '{value}')")
+        if value not in currency_table():
+            errors.append(ValidationIssue(ErrorCode.INVALID_CURRENCY, self.name, {'value': value}))
 
         return errors
 
@@ -292,9 +376,12 @@ class Iban(Field):
         super().__init__(length, *args, default=default, **kwargs)
 
     def __set__(self, instance, value: str) -> None:
-        super().__set__(instance, IBAN(value, allow_invalid=True))
+        super().__set__(instance, value)
+
+    def _convert(self, value: str) -> Tuple['IBAN', List[ValidationIssue]]:
+        return super()._convert(lazy_import('schwifty').IBAN(value, allow_invalid=True))
 
-    def validate(self, value: IBAN) -> List[str]:
+    def validate(self, value: 'IBAN') -> List[ValidationIssue]:
         """Validate the IBAN value.
 
         Warning: Some invalid IBANs can pass this validation.
@@ -309,17 +396,17 @@ class Iban(Field):
         try:
             value.validate()
         except ValueError as err:
-            errors.append(f"IBAN INVALID: {err}")
+            errors.append(ValidationIssue(ErrorCode.INVALID_IBAN, self.name, {'reason': f'{err}'}))
 
         return errors
 
-    def _format_value(self, value: IBAN) -> str:
+    def _format_value(self, value: 'IBAN') -> str:
         return super()._format_value(value.compact if hasattr(value, 'compact') else value)
 
 
 class Date(Field):
     """Field representing a date."""
-    DATE_FORMAT = '%y%m%d'
+    DATE_FORMAT = DATE_FORMAT
     NULL_DATE = '000000'
 
     def __init__(self, length=6, *args, default: date = None, **kwargs):
@@ -341,11 +428,11 @@ class Date(Field):
     def __set__(self, instance, value: date) -> None:
         super().__set__(instance, value)
 
-    def validate(self, value) -> List[str]:
+    def validate(self, value) -> List[ValidationIssue]:
         """Validates whether the ``value`` is a ``date`` object or ``None``."""
         errors = super().validate(value)
         if value is not None and not isinstance(value, date):
-            errors.append(f"INVALID: date must contain a valid date or None ({self.NULL_DATE}).")
+            errors.append(ValidationIssue(ErrorCode.INVALID_DATE_TYPE, self.name, {'null_date': self.NULL_DATE}))
         return errors
 
     def _format_value(self, value: date) -> str:
@@ -1,21 +1,45 @@
 """This module provides the interface for a DTA record file."""
+import asyncio
+import heapq
+import math
+import mmap
+import os
+import random
+import threading
+from collections import deque
+from contextlib import contextmanager
 from datetime import date, datetime
 from decimal import Decimal
-from itertools import count
+from concurrent.futures import Executor
+from itertools import count, islice
 from logging import getLogger
-from typing import Tuple, Union, Set
+from typing import (TYPE_CHECKING, AsyncIterator, BinaryIO, Callable, Iterable, Iterator, MutableSequence, Sequence,
+                    Set, Tuple, Union)
 
-from swissdta.constants import ChargesRule, IdentificationBankAddress, IdentificationPurpose
-from swissdta.records import DTARecord836
+from swissdta.constants import ChargesRule, ErrorCode, IdentificationBankAddress, IdentificationPurpose
+from swissdta.records import DTARecord836, OrderingParty
 from swissdta.records.record import DTARecord
 from swissdta.records.record890 import DTARecord890
-from swissdta.util import is_swiss_iban
+from swissdta.records.rules import ValidationProfile, get_profile
+from swissdta.report import ValidationReport
+from swissdta.layout import HEADER_SPANS, LINE_LENGTH, LINE_SEPARATOR, RECORD_836_SIZE, SPANS_836, SPANS_890
+from swissdta.util import is_swiss_iban, parse_amount, parse_date
+
+if TYPE_CHECKING:  # pragma: no cover
+    from swissdta.duplicates import DuplicateIndex  # pylint: disable=unused-import
+    from swissdta.pool import RecordPool  # pylint: disable=unused-import
 
 
 log = getLogger(__name__)
 
 
-class DTAFile(object):
+def _add_duplicate_reference_error(record: DTARecord) -> None:
+    """Mark a record as a duplicate reference, unless it already is (e.g. when merged)."""
+    if all(error.code != ErrorCode.DUPLICATE_REFERENCE for error in record.error_issues()):
+        record.add_error('reference', ErrorCode.DUPLICATE_REFERENCE, reference=record.reference)
+
+
+class DTAFile(object):  # pylint: disable=too-many-instance-attributes
     """DTA File holding records
 
     Implementation of a DTA File holding a list of TA records.
@@ -24,30 +48,105 @@ class DTAFile(object):
     it is recommended to use the ``add_<transaction_type>_record``
     (so far only ``836``) method instead.
 
+    Records can be added concurrently by several threads: added records
+    are buffered in a lock-free queue (producers never wait on each
+    other) and moved to the records of the file the next time the
+    ``records`` are accessed or the file is validated or generated.
+    Records added while the file is being generated are kept for the
+    next generation. Generating, validating and appending the file are
+    serialized, except while the file is generated asynchronously
+    (see ``agenerate``): the file is then not locked, but generating,
+    validating, appending or releasing it raises a ``RuntimeError``
+    until the asynchronous generation is done. Constructing records is thread-safe as long as each
+    record is only used by one thread at a time (call ``warmup`` once
+    before starting the threads to import the heavy dependencies).
+
     Attributes:
         MAX_RECORDS: Maximum number of records which can be contained in a single file
+        report: The validation report of the last generation of the file
+            (``None`` until the file is generated)
     """
 
     MAX_RECORDS: int = 99_998
 
-    def __init__(self, sender_id: str, client_clearing: str, creation_date: date = None):
+    # The optional collaborators of the file are keyword-only arguments with a default
+    def __init__(self, sender_id: str, client_clearing: str,  # pylint: disable=too-many-arguments
+                 creation_date: date = None, *,
+                 record_store: MutableSequence = None, duplicate_index: 'DuplicateIndex' = None,
+                 record_pool: 'RecordPool' = None, ordering_party: OrderingParty = None,
+                 validation_profile: Union[str, ValidationProfile] = 'full', disabled_rules: Iterable[str] = ()):
         """Instantiate a DTA file with a sender id, client clearing and creation date.
 
+        The other arguments are optional and keyword-only.
+
         Args:
             sender_id: Data file sender
                 identification (5 characters exactly)
             client_clearing: Bank clearing
                 no. of the ordering party's bank
             creation_date: Date when data file was created.
+            record_store: The (empty) sequence holding the records of
+                the file (default: a new ``list``). Use a
+                ``swissdta.store.SpillingRecordStore`` to bound
+                the memory used by large files.
+            duplicate_index: The index of the payments sent in previous files.
+                When given, payments already sent within the window of the
+                index are invalid and the payments of the generated file are
+                added to the index.
+            record_pool: The pool from which the records created by
+                ``add_836_record`` are taken. Call ``release_records``
+                once the file is generated to return its records to the pool.
+            ordering_party: The ordering party shared by the records added with
+                ``add_836_record`` whose client account and address are the
+                ones of the ordering party (or omitted).
+            validation_profile: The validation profile (or its name) selecting
+                the rules applied to the records (see ``swissdta.records.rules``).
+            disabled_rules: The names of rules of the profile not to apply.
+
+        Raises:
+            ValueError: When the validation profile or a disabled rule is unknown.
         """
-        self.records: [DTARecord] = []
+        self._records: MutableSequence[DTARecord] = record_store if record_store is not None else []
+        self._pending: deque = deque()
+        self._lock = threading.Lock()
+        self._generating = False  # whether an asynchronous generation is in progress
         self.sender_id: str = sender_id
         self.client_clearing: str = client_clearing
         self.creation_date: date = creation_date if creation_date is not None else datetime.now().date()
+        self.report: ValidationReport = None
+        self.duplicate_index: 'DuplicateIndex' = duplicate_index
+        self.record_pool: 'RecordPool' = record_pool
+        self.ordering_party: OrderingParty = ordering_party
+        self.validation_profile: ValidationProfile = get_profile(validation_profile).without(*disabled_rules)
+
+    def __getstate__(self) -> dict:
+        # The lock cannot be pickled, the buffered records are pickled with the records of the file
+        self._drain()
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @property
+    def records(self) -> MutableSequence[DTARecord]:
+        """The records of the file, including the records added concurrently so far."""
+        self._drain()
+        return self._records
+
+    @records.setter
+    def records(self, records: MutableSequence[DTARecord]) -> None:
+        with self._exclusive():
+            self._pending.clear()
+            self._records = records
 
     def add_record(self, record: DTARecord) -> None:
         """Add a new record to the file.
 
+        This method can be called concurrently by several threads.
+
         Args:
             record: The record to add
 
@@ -60,54 +159,199 @@ class DTAFile(object):
         record.header.sender_id = self.sender_id
         record.header.client_clearing = self.client_clearing
         record.header.creation_date = self.creation_date
-        self.records.append(record)
+        self._pending.append(record)  # atomic, the buffer is drained when the records are needed
 
-    def validate(self) -> bool:
-        """Validate the all records in the file.
+    def release_records(self) -> None:
+        """Remove all the records from the file and return them to the record pool of the file.
 
-        Returns: ``False`` if there are format errors, no
-        records or any other reason which will prevent the
-        file from being processed; ``True`` otherwise.
+        The records must not be used anymore. The file is empty (its record
+        store is cleared) and can be reused. Without a record pool, the
+        records are only removed.
+
+        Note: The records of a ``SpillingRecordStore`` which has spilled
+        to disk are only removed: they are copies loaded from the database
+        and returning them to the pool would load all of them in memory.
         """
-        if not self.records:
-            return False
+        with self._exclusive():
+            self._move_pending()
+            if self.record_pool is not None and not getattr(self._records, 'spilled', False):
+                self.record_pool.release(self._records)
+            self._records.clear()
+            self.report = None
+
+    @classmethod
+    def merge(cls, *files: 'DTAFile', record_store: MutableSequence = None) -> 'DTAFile':
+        """Merge multiple DTA files into a new file.
+
+        The records of each file are sorted and the (sorted) files
+        are then merged together in a single pass, keeping the order
+        in which ``generate`` sorts the records. Only the header of
+        records from files with a different sender id, client clearing
+        or creation date than the first file are updated. As with any
+        other file, the records are validated and numbered and the
+        total is computed when the merged file is validated or generated.
+
+        The files must share the same duplicate index, record pool,
+        ordering party and validation profile (including the disabled
+        rules), which are the ones of the merged file.
+
+        The records whose reference is present more than once across
+        the files are invalid (duplicate reference), they are logged
+        and marked as invalid when merged.
+
+        Note: The records are shared with the new file and
+        not copied, the merged files should not be used anymore.
 
-        valid_file = True
+        Args:
+            *files: The files to merge, the first file gives the
+                sender id, client clearing and creation date.
+            record_store: The (empty) sequence holding the records of the
+                merged file (default: a new ``list``).
 
+        Returns: A new file containing the records of all the files.
+
+        Raises:
+            ValueError: When no files are given or when the files have different settings.
+        """
+        if not files:
+            raise ValueError('Merging invalid files: at least one file is required.')
+
+        first_file = files[0]
+        cls._check_merged_settings(files)
+        merged_file = cls(sender_id=first_file.sender_id,
+                          client_clearing=first_file.client_clearing,
+                          creation_date=first_file.creation_date,
+                          record_store=record_store,
+                          duplicate_index=first_file.duplicate_index,
+                          record_pool=first_file.record_pool,
+                          ordering_party=first_file.ordering_party,
+                          validation_profile=first_file.validation_profile)
+        file_values = (merged_file.sender_id, merged_file.client_clearing, merged_file.creation_date)
+
+        shards = []
+        for dta_file in files:
+            records = dta_file.records
+            dta_file._sort_records()  # pylint: disable=protected-access
+            if (dta_file.sender_id, dta_file.client_clearing, dta_file.creation_date) == file_values:
+                shards.append(iter(records))
+            else:
+                shards.append(merged_file._with_file_header(records))  # pylint: disable=protected-access
+
+        seen_references = set()
+        duplicate_references = set()
+        for record in heapq.merge(*shards, key=cls._sort_key):
+            if record.reference in seen_references:
+                duplicate_references.add(record.reference)
+            else:
+                seen_references.add(record.reference)
+            merged_file._records.append(record)  # pylint: disable=protected-access
+
+        if duplicate_references:
+            log.warning('Merged files contain %d duplicate reference(s): %s',
+                        len(duplicate_references), ', '.join(sorted(duplicate_references)))
+            for record in merged_file._records:  # pylint: disable=protected-access
+                if record.reference in duplicate_references:
+                    _add_duplicate_reference_error(record)
+
+        return merged_file
+
+    @staticmethod
+    def _check_merged_settings(files: Sequence['DTAFile']) -> None:
+        for name in ('duplicate_index', 'record_pool', 'ordering_party', 'validation_profile'):
+            if any(getattr(dta_file, name) != getattr(files[0], name) for dta_file in files[1:]):
+                raise ValueError(f'Merging invalid files: the {name} of the files must be identical.')
+
+    def validate(self, first_sequence_nr: int = 1) -> ValidationReport:
+        """Validate the all records in the file.
+
+        Args:
+            first_sequence_nr: The expected sequence number of the first
+                record (only records appended to an existing file do
+                not start at 1).
+
+        Returns: The validation report of the file, the report is
+        falsy if there are format errors, no records or any other
+        reason which will prevent the file from being processed;
+        truthy otherwise.
+        """
+        with self._exclusive():
+            self._move_pending()
+            return self._validate(first_sequence_nr)
+
+    def _validate(self, first_sequence_nr: int = 1, existing_references: Set[str] = frozenset()) -> ValidationReport:
+        report = ValidationReport()
+        for _ in self._validation_steps(report, first_sequence_nr, existing_references=existing_references):
+            pass
+        return report
+
+    def _validation_steps(self, report: ValidationReport, first_sequence_nr: int = 1,
+                          existing_references: Set[str] = frozenset(),
+                          sample: Tuple[Set[int], ValidationProfile] = None) -> Iterator[None]:
+        """Validate the records into a report, yielding after each record.
+
+        References in ``existing_references`` (of the file the records are appended to) are duplicates.
+        With a sample (see ``_sample``), only the sampled records are validated with the profile of the
+        file, the other records are validated with the profile of the sample.
+        """
+        if not self._records:
+            report.valid_file = False
+            return
+
+        sampled_indexes, other_profile = sample if sample is not None else (frozenset(), self.validation_profile)
         duplicate_references = self._get_duplicate_references()
-        creation_date = self.records[0].header.creation_date
-        sender_id = self.records[0].header.sender_id
+        creation_date = self._records[0].header.creation_date
+        sender_id = self._records[0].header.sender_id
 
-        for i, record in enumerate(self.records):
-            sequence_nr = str(i + 1)
+        for i, record in enumerate(self._records):
+            sequence_nr = str(i + first_sequence_nr)
             if record.header.sequence_nr.strip().lstrip('0') != sequence_nr:
-                record.header.add_error(
-                    'sequence_nr',
-                    f"SEQUENCE ERROR: Must be consecutive commencing with 1 in ascending order."
-                    f" (expected {sequence_nr}, got {record.header.sequence_nr.strip().lstrip('0')})"
-                )
-                valid_file = False
+                record.header.add_error('sequence_nr', ErrorCode.SEQUENCE_ERROR,
+                                        expected=sequence_nr, actual=record.header.sequence_nr.strip().lstrip('0'))
+                report.valid_file = False
 
             if record.header.creation_date != creation_date:
-                record.header.add_error(
-                    'creation_date',
-                    'DIFFERENT: Must be identical with the creation date on the first record of the data file.')
-                valid_file = False
+                record.header.add_error('creation_date', ErrorCode.DIFFERENT_CREATION_DATE)
+                report.valid_file = False
 
             if record.header.sender_id != sender_id:
-                record.header.add_error('sender_id',
-                                        "DIFFERENT: Must be identical with the first record on the data carrier.")
-                valid_file = False
+                record.header.add_error('sender_id', ErrorCode.DIFFERENT_SENDER_ID)
+                report.valid_file = False
+
+            if record.reference in duplicate_references or record.reference in existing_references:
+                _add_duplicate_reference_error(record)
 
-            if record.reference in duplicate_references:
-                record.add_error(
-                    'reference',
-                    f"DUPLICATE TRANSACTION NUMBER: reference '{record.reference}' is present more than once."
-                )
+            if self.duplicate_index is not None:
+                sent_payment = self.duplicate_index.find(record, self.creation_date)
+                if sent_payment is not None:
+                    record.add_error('reference', ErrorCode.DUPLICATE_PAYMENT,
+                                     reference=sent_payment.reference, sent_on=sent_payment.sent_on)
 
-            record.validate()
+            record.validate(self.validation_profile if i in sampled_indexes else other_profile)
+            report.add_record(i, record)
+            yield
 
-        return valid_file
+    def _sample(self, rate: float, seed: int) -> Tuple[Set[int], ValidationProfile]:
+        """Draw a random sample of the records and check it with the rules of the profile.
+
+        The rules which are not structural are applied to the sampled records without
+        changing them. Unless a sampled record fails, the other records only need to be
+        validated with the structural rules.
+
+        Returns: The indexes of the sampled records and the profile validating the other records.
+        """
+        profile = self.validation_profile
+        record_count = len(self._records)
+        sampled_indexes = set(random.Random(seed).sample(range(record_count),
+                                                         min(record_count, max(1, math.ceil(rate * record_count)))))
+        sampled_rules = profile._replace(rules=tuple(rule for rule in profile.rules if not rule.structural),
+                                         short_circuit=True)
+        for i in sorted(sampled_indexes):  # only the sampled records are loaded from a record store
+            record = self._records[i]
+            if record.has_errors() or any(True for _ in sampled_rules.errors(record, record.header.client_clearing)):
+                log.warning('The verified sample contains invalid records, all the records are fully validated.')
+                return sampled_indexes, profile
+        return sampled_indexes, profile._replace(rules=tuple(rule for rule in profile.rules if rule.structural),
+                                                 short_circuit=True)
 
     def add_836_record(self,  # pylint: disable=too-many-arguments,too-many-locals
                        reference: str,
@@ -132,13 +376,15 @@ class DTAFile(object):
                 party; must be unique within a data file.
             client_account: Account to be debited (Only IBAN
                 is accepted, despite the fact that the
-                standard accepts both with or without IBAN)
+                standard accepts both with or without IBAN),
+                ``None`` for the account of the file's ordering party.
             processing_date: The date at which
                 the payment should be processed
             currency: The currency for the amount of the payment
             amount: The actual amount of the payment
             client_address: Ordering party's address
-                (3 times 35 characters)
+                (3 times 35 characters), ``None`` for the
+                address of the file's ordering party.
             recipient_iban: The beneficiary's IBAN
             recipient_name: Name of the beneficiary
             recipient_address: Address of the beneficiary
@@ -176,14 +422,26 @@ class DTAFile(object):
                 on the basis of the bank's foreign exchange rate.
                 A maximum of 6 decimal places is permitted.
         """
-        record = DTARecord836()
+        record = self.record_pool.acquire(DTARecord836) if self.record_pool is not None else DTARecord836()
         record.reference = reference
-        record.client_account = client_account
+        if self.ordering_party is not None:
+            # Each client field which is not given is the one of the ordering party
+            if client_account is None:
+                client_account = self.ordering_party.client_account
+            if client_address is None:
+                client_address = self.ordering_party.client_address
+        shares_ordering_party = (self.ordering_party is not None
+                                 and self.ordering_party.matches(client_account, client_address))
+        if shares_ordering_party:
+            record.ordering_party = self.ordering_party
+        else:
+            record.client_account = client_account
         record.value_date = processing_date
         record.currency = currency
         record.amount = amount
         record.conversion_rate = conversion_rate
-        record.client_address = client_address
+        if not shares_ordering_party:
+            record.client_address = client_address
         record.recipient_iban = recipient_iban
         if is_swiss_iban(record.recipient_iban):
             record.bank_address_type = IdentificationBankAddress.BENEFICIARY_ADDRESS
@@ -201,44 +459,440 @@ class DTAFile(object):
 
         self.add_record(record)
 
-    def generate(self) -> bytes:
+    def generate(self, verify: str = 'full', rate: float = 0.01, seed: int = 0) -> bytes:
         """Generate a DTA file with all the records.
 
+        The validation report of the file is available
+        through the ``report`` attribute once generated.
+
+        By default, all the records are fully validated (``verify='full'``).
+        With ``verify='sample'``, meant for records which were already
+        validated before being added (e.g. coming from a validated ledger),
+        only a random sample of the records (``rate`` of the records, at
+        least one) is fully validated. The other records are only checked
+        with the structural rules of the validation profile (see
+        ``swissdta.records.rules``), field values are always validated when
+        set. If any record of the sample is invalid, all the records are
+        fully validated. The sample only depends on ``seed`` and on the
+        number of records.
+
+        Args:
+            verify: How to validate the records, ``'full'`` or ``'sample'``.
+            rate: The share of the records fully validated with ``verify='sample'``.
+            seed: The seed of the random sample.
+
+        Returns: A DTA file of valid records, encoded to ``latin-1`` as bytes.
+
+        Raises:
+            ValueError: When ``verify`` or ``rate`` is invalid.
+        """
+        return b''.join(self._generate(verify, rate, seed))
+
+    def write_to(self, stream: BinaryIO, verify: str = 'full', rate: float = 0.01, seed: int = 0) -> int:
+        """Generate the DTA file and write it to a binary stream.
+
+        The records are written to the stream as they are generated
+        instead of generating the whole file in memory first. Nothing
+        is written if the file cannot be generated.
+
+        Args:
+            stream: The binary stream to write to (e.g. a file opened in ``'wb'`` mode).
+            verify: How to validate the records, ``'full'`` or ``'sample'`` (see ``generate``).
+            rate: The share of the records fully validated with ``verify='sample'``.
+            seed: The seed of the random sample.
+
+        Returns: The number of bytes written.
+
+        Raises:
+            ValueError: When ``verify`` or ``rate`` is invalid.
+        """
+        written = 0
+        for chunk in self._generate(verify, rate, seed):
+            stream.write(chunk)
+            written += len(chunk)
+        return written
+
+    async def agenerate(self, chunk_size: int = 1000,  # pylint: disable=too-many-arguments
+                        progress: Callable[[int, int], None] = None, executor: Executor = None,
+                        verify: str = 'full', rate: float = 0.01, seed: int = 0) -> bytes:
+        """Generate a DTA file with all the records without blocking the event loop.
+
+        Same as ``generate`` but the records are validated and rendered
+        in an executor, ``chunk_size`` records at a time. The event loop
+        runs between the chunks and cancelling the generation stops it
+        after the current chunk.
+
+        Args:
+            chunk_size: The number of records validated or rendered per chunk.
+            progress: Called with the number of steps done and the total number
+                of steps after each chunk (each record is validated then rendered).
+            executor: The executor running the chunks (default: the default executor of the loop).
+            verify: How to validate the records, ``'full'`` or ``'sample'`` (see ``generate``).
+            rate: The share of the records fully validated with ``verify='sample'``.
+            seed: The seed of the random sample.
+
         Returns: A DTA file of valid records, encoded to ``latin-1`` as bytes.
+
+        Raises:
+            ValueError: When ``verify`` or ``rate`` is invalid.
+            RuntimeError: When the file is already being generated asynchronously.
         """
+        chunks = []
+        async for chunk in self._agenerate(chunk_size, progress, executor, verify, rate, seed):
+            chunks.append(chunk)
+        return b''.join(chunks)
+
+    async def awrite_to(self, writer: asyncio.StreamWriter,  # pylint: disable=too-many-arguments
+                        chunk_size: int = 1000, progress: Callable[[int, int], None] = None,
+                        executor: Executor = None, verify: str = 'full', rate: float = 0.01, seed: int = 0) -> int:
+        """Generate the DTA file and write it to a stream without blocking the event loop.
+
+        Same as ``write_to`` for an ``asyncio.StreamWriter``: each chunk of
+        records (see ``agenerate``) is written as soon as it is rendered
+        and the writer is drained before the next chunk is generated.
+
+        Args:
+            writer: The stream writer to write to.
+            chunk_size: The number of records validated or rendered per chunk.
+            progress: Called with the number of steps done and the total number of steps after each chunk.
+            executor: The executor running the chunks (default: the default executor of the loop).
+            verify: How to validate the records, ``'full'`` or ``'sample'`` (see ``generate``).
+            rate: The share of the records fully validated with ``verify='sample'``.
+            seed: The seed of the random sample.
+
+        Returns: The number of bytes written.
+
+        Raises:
+            ValueError: When ``verify`` or ``rate`` is invalid.
+            RuntimeError: When the file is already being generated asynchronously.
+        """
+        written = 0
+        chunks = self._agenerate(chunk_size, progress, executor, verify, rate, seed)
+        try:
+            async for chunk in chunks:
+                writer.write(chunk)
+                written += len(chunk)
+                await writer.drain()
+        finally:
+            await chunks.aclose()
+        return written
+
+    async def _agenerate(self, chunk_size: int,  # pylint: disable=too-many-arguments
+                         progress: Union[Callable[[int, int], None], None], executor: Union[Executor, None],
+                         verify: str, rate: float, seed: int) -> AsyncIterator[bytes]:
+        self._check_verification(verify, rate)
+        # Python 3.6 has no ``get_running_loop``, ``get_event_loop`` returns the running loop in a coroutine
+        loop = getattr(asyncio, 'get_running_loop', asyncio.get_event_loop)()
+        # The lock is not held across awaits (the event loop would block on it), the file is
+        # marked as being generated instead. The lock may be held by a generation in another thread.
+        start = loop.run_in_executor(executor, self._start_async_generation)
+        steps = self._generate_locked(verify, rate, seed)
+        steps_lock = threading.Lock()  # a generator cannot be resumed by two threads at once, even to close it
+        finished = False
+        done = 0
+        try:
+            await asyncio.shield(start)
+            while not finished:
+                step_count, chunk, finished = await loop.run_in_executor(
+                    executor, self._next_steps, steps, steps_lock, chunk_size)
+                done = self._report_progress(progress, done, step_count, finished)
+                if chunk:
+                    yield chunk
+        finally:
+            if finished:
+                self._end_async_generation(steps, steps_lock)
+            else:  # cancelled or failed, the steps are closed as soon as the current chunk is done
+                await asyncio.shield(self._aend_async_generation(loop, executor, start, steps, steps_lock))
+
+    def _report_progress(self, progress: Union[Callable[[int, int], None], None], done: int,
+                         step_count: int, finished: bool) -> int:
+        """Count the steps of a chunk, call ``progress`` and return the number of steps done."""
+        total = 2 * len(self._records) + 1
+        done = total if finished else done + step_count
+        if progress is not None:
+            progress(done, total)
+        return done
+
+    async def _aend_async_generation(self, loop: asyncio.AbstractEventLoop, executor: Union[Executor, None],
+                                     start: asyncio.Future, steps: Iterator[Union[bytes, None]],
+                                     steps_lock: threading.Lock) -> None:
+        try:
+            await start
+        except RuntimeError:  # the file was already being generated, by another generation
+            return
+        await loop.run_in_executor(executor, self._end_async_generation, steps, steps_lock)
+
+    def _start_async_generation(self) -> None:
+        with self._exclusive():
+            self._generating = True
+
+    def _end_async_generation(self, steps: Iterator[Union[bytes, None]], steps_lock: threading.Lock) -> None:
+        with steps_lock:
+            steps.close()
+        self._generating = False
+
+    @staticmethod
+    def _next_steps(steps: Iterator[Union[bytes, None]], steps_lock: threading.Lock,
+                    chunk_size: int) -> Tuple[int, bytes, bool]:
+        with steps_lock:
+            chunk = list(islice(steps, chunk_size))
+        return len(chunk), b''.join(filter(None, chunk)), len(chunk) < chunk_size
+
+    @staticmethod
+    def _check_verification(verify: str, rate: float) -> None:
+        if verify not in ('full', 'sample'):
+            raise ValueError(f"Invalid verification: must be 'full' or 'sample' (got: '{verify}')")
+        if not 0 < rate <= 1:
+            raise ValueError(f'Invalid sample rate: must be greater than 0 and at most 1 (got: {rate})')
+
+    def _generate(self, verify: str = 'full', rate: float = 0.01, seed: int = 0) -> Iterator[bytes]:
+        self._check_verification(verify, rate)
+        return (chunk for chunk in self._generate_steps(verify, rate, seed) if chunk is not None)
+
+    def _generate_steps(self, verify: str = 'full', rate: float = 0.01,
+                        seed: int = 0) -> Iterator[Union[bytes, None]]:
+        """Generate the file, yielding ``None`` after each validated or skipped (invalid) record."""
+        with self._exclusive():
+            yield from self._generate_locked(verify, rate, seed)
+
+    def _generate_locked(self, verify: str, rate: float, seed: int) -> Iterator[Union[bytes, None]]:
+        # The caller holds the lock, or has marked the file as being generated asynchronously
+        self._move_pending()
         self._sort_records()
         self._set_sequence_numbers()
 
-        if not self.validate():
+        self.report = ValidationReport()
+        yield from self._validation_steps(self.report, sample=self._sample(rate, seed) if verify == 'sample' else None)
+        if not self.report:
             log.error('The file contains format errors and cannot be processed.')
-            self._log_errors(default_error='Record is valid but the file has a format error')
-            return ''.encode('latin-1')
+            self.report.log(log)
+            return
 
-        self._log_errors()
+        self.report.log(log)
 
-        valid_records = tuple(record for record in self.records if not record.has_errors())
-        if not valid_records:
+        if self.report.invalid_record_count == self.report.record_count:
             log.error('No valid records, file not generated')
-            return ''.encode('latin-1')
+            return
 
-        self._log_warning(*valid_records)
+        # The valid records are iterated over (instead of being collected) such that
+        # records held by a record store are never all loaded in memory at once.
+        self._set_sequence_numbers(self._valid_records())
+        total_record = self._generate_890_record(self._valid_records())
+        if total_record is None:  # something went wrong
+            return
+
+        for record in self._records:
+            yield f'{record.generate()}\r\n'.encode('latin-1') if not record.has_errors() else None
+        yield total_record.generate().encode('latin-1')
+
+        if self.duplicate_index is not None:
+            self.duplicate_index.add(self._valid_records(), self.creation_date)
+
+    def append_to(self, path: str, records: Iterable[DTARecord] = None) -> int:
+        """Append the records of this file to an already generated DTA file.
+
+        The TA 890 total record at the end of the existing file is replaced
+        by the valid records of this file, numbered after the existing
+        records, followed by an updated total record. The existing records
+        are neither parsed nor copied: the number of records and the total
+        amount are read from the total record.
+
+        The records are validated as when generating a file, records whose
+        reference is already used in the existing file are invalid (duplicate
+        reference). With a ``duplicate_index`` (to which the records of the
+        existing file were added when it was generated), the references are
+        looked up in the index and the time taken only depends on the number
+        of appended records. Without an index, the references of all the
+        existing records are read (at their fixed offsets), which takes time
+        proportional to the size of the existing file. The validation report
+        is available through the ``report`` attribute. The existing file is
+        left untouched if no record can be appended.
+
+        The appended bytes are first written to a journal next to the file
+        (``<path>.append``), removed once the file is updated. If the update
+        is interrupted (e.g. by a crash), the next ``append_to`` the same
+        file completes it from the journal first (see ``recover_append``).
 
-        self._set_sequence_numbers(*valid_records)
-        total_record = self._generate_890_record(valid_records)
+        Args:
+            path: The path of the existing DTA file.
+            records: Records to add to this file before appending (see ``add_record``).
+
+        Returns: The number of records appended.
+
+        Raises:
+            ValueError: When the existing file does not end with a TA 890
+                record, has a different sender id or creation date than
+                this file, or would contain more than ``MAX_RECORDS`` records.
+        """
+        for record in records if records is not None else ():
+            self.add_record(record)
+
+        with self._exclusive():
+            self._move_pending()
+            self.recover_append(path)
+            with open(path, 'r+b') as file:
+                return self._append_locked(path, file)
+
+    def _append_locked(self, path: str, file: BinaryIO) -> int:
+        total_offset = self._read_total_record(file)
+        total_line = file.read(LINE_LENGTH)
+        record_count = int(total_line[HEADER_SPANS['sequence_nr']]) - 1
+        if record_count * RECORD_836_SIZE != total_offset:
+            raise ValueError(f'Invalid DTA file {path}: the sequence number of the total record'
+                             f' does not match the number of records.')
+        if (total_line[HEADER_SPANS['sender_id']].decode('latin-1').strip() != self.sender_id
+                or parse_date(total_line[HEADER_SPANS['creation_date']]) != self.creation_date):
+            raise ValueError(f'Cannot append to DTA file {path}: the sender id and the creation date'
+                             f' must be identical to the ones of the existing records.')
+
+        self._sort_records()
+        self._set_sequence_numbers(start=record_count + 1)
+        self.report = self._validate(first_sequence_nr=record_count + 1,
+                                     existing_references=self._existing_references(file, record_count))
+        self.report.log(log)
+        if not self.report or self.report.invalid_record_count == self.report.record_count:
+            log.error('No valid records, nothing appended to %s', path)
+            return 0
+
+        appended_count = self.report.record_count - self.report.invalid_record_count
+        if record_count + appended_count > self.MAX_RECORDS:
+            raise ValueError(f'Cannot append to DTA file {path}: a file may contain'
+                             f' at most {self.MAX_RECORDS} records.')
+
+        self._set_sequence_numbers(self._valid_records(), start=record_count + 1)
+        total_record = self._generate_890_record(self._valid_records(), record_count=record_count,
+                                                 total=parse_amount(total_line[SPANS_890['amount']]))
         if total_record is None:  # something went wrong
-            return ''.encode('latin-1')
+            return 0
+
+        # The total record is overwritten by the new records, the file only grows
+        appended = b''.join(f'{record.generate()}\r\n'.encode('latin-1') for record in self._valid_records())
+        appended += total_record.generate().encode('latin-1')
+        journal_path = self._journal_path(path)
+        self._write_journal(journal_path, total_offset, appended)
+        self._write_at(file, total_offset, appended)
+        os.remove(journal_path)
+
+        if self.duplicate_index is not None:
+            self.duplicate_index.add(self._valid_records(), self.creation_date)
+        return appended_count
+
+    def _existing_references(self, file: BinaryIO, record_count: int) -> Set[str]:
+        """Get the references of this file which are already used by the records of an existing file."""
+        references = {record.reference for record in self._records}
+        if self.duplicate_index is not None:
+            return {reference for reference in references
+                    if self.duplicate_index.has_reference(f'{self.sender_id}{reference}', self.creation_date)}
+        if not record_count:
+            return set()
+        start, stop = SPANS_836['reference'].start, SPANS_836['reference'].stop
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return references.intersection(str(data[offset + start:offset + stop], 'latin-1')
+                                           for offset in range(0, record_count * RECORD_836_SIZE, RECORD_836_SIZE))
+
+    @classmethod
+    def recover_append(cls, path: str) -> bool:
+        """Complete an interrupted ``append_to`` from its journal.
+
+        Called by ``append_to`` before appending to a file, call it before
+        reading a file to which records may have been appended when the
+        process was interrupted.
+
+        Args:
+            path: The path of the DTA file.
 
-        return '\r\n'.join((
-            *(record.generate() for record in valid_records),
-            total_record.generate()
-        )).encode('latin-1')
+        Returns: ``True`` if an interrupted append was completed, ``False`` if there was none.
+        """
+        journal_path = cls._journal_path(path)
+        try:
+            with open(journal_path, 'rb') as journal:
+                offset = int(journal.readline())
+                appended = journal.read()
+        except FileNotFoundError:
+            return False
+        with open(path, 'r+b') as file:
+            cls._write_at(file, offset, appended)
+        os.remove(journal_path)
+        log.warning('Completed the interrupted append to %s', path)
+        return True
+
+    @staticmethod
+    def _journal_path(path: str) -> str:
+        return f'{path}.append'
+
+    @staticmethod
+    def _write_journal(journal_path: str, offset: int, appended: bytes) -> None:
+        # The journal is complete once it exists: it is written under another name and then renamed
+        temporary_path = f'{journal_path}.tmp'
+        with open(temporary_path, 'wb') as journal:
+            journal.write(b'%d\n' % offset)
+            journal.write(appended)
+            journal.flush()
+            os.fsync(journal.fileno())
+        os.replace(temporary_path, journal_path)
+
+    @staticmethod
+    def _write_at(file: BinaryIO, offset: int, content: bytes) -> None:
+        file.seek(offset)
+        file.write(content)
+        file.truncate()
+        file.flush()
+        os.fsync(file.fileno())
+
+    @staticmethod
+    def _read_total_record(file: BinaryIO) -> int:
+        """Position a DTA file at the start of its total record.
+
+        Returns: The offset of the total record.
+        """
+        size = file.seek(0, 2)
+        if size < LINE_LENGTH:
+            raise ValueError(f'Invalid DTA file {file.name}: the file does not end with a TA 890 record.')
+        # The separator of the total record is optional
+        file.seek(size - len(LINE_SEPARATOR))
+        total_offset = size - LINE_LENGTH - (len(LINE_SEPARATOR) if file.read() == LINE_SEPARATOR else 0)
+        file.seek(total_offset)
+        total_line = file.read(LINE_LENGTH)
+        if total_line[:2] != b'01' or total_line[SPANS_890['transaction_type']] != b'890':
+            raise ValueError(f'Invalid DTA file {file.name}: the file does not end with a TA 890 record.')
+        file.seek(total_offset)
+        return total_offset
+
+    @contextmanager
+    def _exclusive(self) -> Iterator[None]:
+        """Lock the file, which must not be being generated asynchronously."""
+        with self._lock:
+            if self._generating:
+                raise RuntimeError('The file is being generated asynchronously.')
+            yield
+
+    def _drain(self) -> None:
+        """Move the records added concurrently to the records of the file."""
+        if not self._pending:
+            return
+        with self._lock:
+            if not self._generating:  # otherwise the records are kept for the next generation
+                self._move_pending()
+
+    def _move_pending(self) -> None:
+        # The lock must be held by the caller
+        while self._pending:
+            self._records.append(self._pending.popleft())
+
+    def _valid_records(self) -> Iterator[DTARecord]:
+        return (record for record in self._records if not record.has_errors())
+
+    def _generate_890_record(self, records: Iterable[DTARecord], record_count: int = 0,
+                             total: Decimal = Decimal(0)) -> Union[DTARecord890, None]:
+        for record in records:
+            record_count += 1
+            total += Decimal(record.amount.strip().replace(',', '.'))
 
-    def _generate_890_record(self, records) -> Union[DTARecord890, None]:
         record = DTARecord890()
-        record.header.sequence_nr = len(records) + 1
+        record.header.sequence_nr = record_count + 1
         record.header.sender_id = self.sender_id
         record.header.creation_date = self.creation_date
-        record.amount = sum(Decimal(record.amount.strip().replace(',', '.')) for record in records)
+        record.amount = total
 
         record.validate()  # just to make sure
         if record.has_errors():
@@ -248,58 +902,36 @@ class DTAFile(object):
 
         return record
 
-    def _log_warning(self, *records) -> None:
-        if not records:
-            records = self.records
-
+    def _with_file_header(self, records: Iterable[DTARecord]) -> Iterator[DTARecord]:
         for record in records:
-            if not record.has_warnings():
-                continue
-
-            log.warning('TA %s record (seq no %s, ref: %s) was processed '
-                        'but triggered the following warning(s):\n  %s',
-                        record.header.transaction_type,
-                        record.header.sequence_nr,
-                        record.reference,
-                        '\n  '.join(record.validation_warnings))
-
-    def _log_errors(self, *records, default_error='') -> None:
-        if not records:
-            records = self.records
-
-        for record in records:
-            if record.has_errors():
-                log.error('TA %s record (seq no %s, ref: %s) not processed, reason:\n  %s',
-                          record.header.transaction_type,
-                          record.header.sequence_nr,
-                          record.reference,
-                          '\n  '.join(record.validation_errors))
-            elif default_error:
-                log.error('TA %s record (seq no %s, ref: %s) not processed, reason:\n  %s',
-                          record.header.transaction_type,
-                          record.header.sequence_nr,
-                          record.reference,
-                          default_error)
-
-    def _sort_records(self) -> None:
-        self.records.sort(key=lambda record: (
+            record.header.sender_id = self.sender_id
+            record.header.client_clearing = self.client_clearing
+            record.header.creation_date = self.creation_date
+            yield record
+
+    @staticmethod
+    def _sort_key(record: DTARecord) -> Tuple[str, str, str]:
+        return (
             record.header.processing_date,
             record.header.sender_id,
             record.header.recipient_clearing.strip()  # remove whitespace padding
-        ))
+        )
+
+    def _sort_records(self) -> None:
+        self._records.sort(key=self._sort_key)
 
-    def _set_sequence_numbers(self, *records) -> None:
-        if not records:
-            records = self.records
+    def _set_sequence_numbers(self, records: Iterable[DTARecord] = None, start: int = 1) -> None:
+        if records is None:
+            records = self._records
 
-        sequence_nr = count(start=1, step=1)
+        sequence_nr = count(start=start, step=1)
         for record in records:
             record.header.sequence_nr = next(sequence_nr)
 
     def _get_duplicate_references(self) -> Set[str]:
         seen_references = set()
         duplicate_references = set()
-        for record in self.records:
+        for record in self._records:
             if record.reference in seen_references:
                 duplicate_references.add(record.reference)
             else:
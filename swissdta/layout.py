@@ -0,0 +1,61 @@
+"""Byte layout of generated DTA files.
+
+Each line of a DTA file is exactly ``LINE_LENGTH`` characters long and
+followed by ``LINE_SEPARATOR``. A TA 836 record spans 5 lines (segments
+01 to 05) and the TA 890 total record a single line, such that the
+position of every field of every record can be computed directly.
+
+The spans below are relative to the start of a record.
+"""
+from typing import Dict, Iterator, Sequence, Tuple
+
+LINE_LENGTH: int = 128
+LINE_SEPARATOR: bytes = b'\r\n'
+LINE_SIZE: int = LINE_LENGTH + len(LINE_SEPARATOR)
+
+RECORD_836_LINES: int = 5
+RECORD_836_SIZE: int = RECORD_836_LINES * LINE_SIZE
+RECORD_890_SIZE: int = LINE_SIZE
+
+# The fields of each line as (name, length), ``None`` marks constants and padding.
+# The header constants are zeros, the padding at the end of the lines is blank.
+HEADER_FIELDS: Tuple[Tuple[str, int], ...] = (
+    ('processing_date', 6), ('recipient_clearing', 12), (None, 5), ('creation_date', 6), ('client_clearing', 7),
+    ('sender_id', 5), ('sequence_nr', 5), ('transaction_type', 3), ('payment_type', 1), (None, 1)
+)
+
+# Fields of each segment, after the 2 digits segment number.
+SEGMENTS_836: Tuple[Tuple[Tuple[str, int], ...], ...] = (
+    HEADER_FIELDS + (('sender_reference', 5), ('reference', 11), ('client_account', 24), ('value_date', 6),
+                     ('currency', 3), ('amount', 15), (None, 11)),
+    (('conversion_rate', 12), ('client_address1', 35), ('client_address2', 35), ('client_address3', 35), (None, 9)),
+    (('bank_address_type', 1), ('bank_address1', 35), ('bank_address2', 35), ('recipient_iban', 34), (None, 21)),
+    (('recipient_name', 35), ('recipient_address1', 35), ('recipient_address2', 35), (None, 21)),
+    (('identification_purpose', 1), ('purpose1', 35), ('purpose2', 35), ('purpose3', 35), ('charges_rules', 1),
+     (None, 19))
+)
+SEGMENTS_890: Tuple[Tuple[Tuple[str, int], ...], ...] = (HEADER_FIELDS + (('amount', 16), (None, 59)),)
+
+
+def _spans(segments: Sequence[Sequence[Tuple[str, int]]]) -> Iterator[Tuple[str, slice]]:
+    for line_number, fields in enumerate(segments):
+        start = line_number * LINE_SIZE + 2
+        for name, length in fields:
+            if name is not None:
+                yield name, slice(start, start + length)
+            start += length
+        assert start == (line_number + 1) * LINE_SIZE - len(LINE_SEPARATOR), 'Invalid segment length'
+
+
+SPANS_836: Dict[str, slice] = dict(_spans(SEGMENTS_836))
+"""The spans of the fields of a TA 836 record, including the header fields.
+
+The 16 characters reference is split in the sender id (``sender_reference``)
+and the 11 characters reference set on the record (``reference``).
+"""
+
+SPANS_890: Dict[str, slice] = dict(_spans(SEGMENTS_890))
+"""The spans of the fields of a TA 890 record, including the header fields."""
+
+HEADER_SPANS: Dict[str, slice] = {name: SPANS_890[name] for name, _ in HEADER_FIELDS if name is not None}
+"""The spans of the header fields (identical for all the transaction types)."""
@@ -0,0 +1,63 @@
+"""Pool of reusable record instances.
+
+Services generating many files create and discard a large number of
+records, each with its header and validation logs. A ``RecordPool``
+keeps the records of the files which are no longer needed and resets
+them (see ``ValidationLogMixin.reset``) such that the next files reuse
+them instead of allocating new records.
+"""
+from collections import defaultdict, deque
+from typing import Iterable, Type
+
+from swissdta.records import DTARecord836
+from swissdta.records.record import DTARecord
+
+
+class RecordPool(object):
+    """Pool of reset records, by record type.
+
+    Records are acquired and released without locking, a pool can
+    be shared by files built concurrently in different threads. The
+    maximum size is then approximate: threads releasing records at the
+    same time may each add a record to a pool which is almost full.
+    """
+
+    def __init__(self, max_size: int = 100_000):
+        """Instantiate an empty pool.
+
+        Args:
+            max_size: The maximum number of records of each
+                type kept in the pool, other records are discarded.
+        """
+        self.max_size = max_size
+        self._records = defaultdict(deque)
+
+    def __len__(self) -> int:
+        return sum(len(records) for records in self._records.values())
+
+    def acquire(self, record_type: Type[DTARecord] = DTARecord836) -> DTARecord:
+        """Get a record from the pool.
+
+        Args:
+            record_type: The type of record to get.
+
+        Returns: A reset record from the pool, or a new record if the pool has none.
+        """
+        try:
+            return self._records[record_type].pop()
+        except IndexError:
+            return record_type()
+
+    def release(self, records: Iterable[DTARecord]) -> None:
+        """Reset records and return them to the pool.
+
+        The records must not be used anymore once released.
+
+        Args:
+            records: The records to return to the pool.
+        """
+        for record in records:
+            pooled_records = self._records[type(record)]
+            if len(pooled_records) < self.max_size:
+                record.reset()
+                pooled_records.append(record)
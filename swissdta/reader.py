@@ -0,0 +1,147 @@
+"""Parallel reading of large DTA files.
+
+Since every TA 836 record has the same size, a file can be cut into byte
+ranges starting and ending on record boundaries without looking at its
+content. The ranges are then read and parsed independently by a pool of
+processes.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal
+from itertools import repeat
+from typing import Any, Callable, Dict, List, NamedTuple, Tuple
+
+from swissdta.layout import RECORD_836_SIZE
+from swissdta.records import DTARecord836
+from swissdta.util import parse_amount
+from swissdta.view import DTAFileView, RecordView836
+
+_FIELD_NAMES = tuple(name for name, _ in DTARecord836._fields())  # pylint: disable=protected-access
+
+
+def record_values(record: RecordView836) -> Dict[str, str]:
+    """Decode all the fields of a record (default parser of ``read_parallel``).
+
+    Args:
+        record: The view over the record.
+
+    Returns: A mapping of the field names of ``DTARecord836`` to their values, without padding.
+    """
+    return {name: getattr(record, name).strip() for name in _FIELD_NAMES}
+
+
+class ChunkResult(NamedTuple):
+    """The result of a range of records read by a worker.
+
+    Attributes:
+        results: The parsed records, in the order of the file.
+        record_count: The number of records in the range.
+        total_amount: The sum of the amounts of the records in the range.
+    """
+    results: List[Any]
+    record_count: int
+    total_amount: Decimal
+
+
+class ReadResult(NamedTuple):
+    """The result of reading a whole DTA file.
+
+    Attributes:
+        results: The parsed records, in the order of the file.
+        record_count: The number of TA 836 records.
+        total_amount: The sum of the amounts of the TA 836 records.
+        control_total: The amount of the TA 890 total record.
+    """
+    results: List[Any]
+    record_count: int
+    total_amount: Decimal
+    control_total: Decimal
+
+    @property
+    def matches_control_total(self) -> bool:
+        """``True`` if the sum of the amounts matches the TA 890 control total."""
+        return self.total_amount == self.control_total
+
+
+def record_ranges(record_count: int, chunk_size: int) -> List[Tuple[int, int]]:
+    """Split the TA 836 records of a file in ranges aligned on record boundaries.
+
+    Args:
+        record_count: The number of TA 836 records in the file.
+        chunk_size: The maximum number of records per range.
+
+    Returns: The ``(start, stop)`` byte offsets of each range.
+    """
+    return [(start * RECORD_836_SIZE, min(start + chunk_size, record_count) * RECORD_836_SIZE)
+            for start in range(0, record_count, chunk_size)]
+
+
+def read_chunk(path: str, start: int, stop: int,
+               parser: Callable[[RecordView836], Any] = record_values) -> ChunkResult:
+    """Read and parse a range of TA 836 records.
+
+    Args:
+        path: The path of the DTA file.
+        start: The offset of the first byte of the range (on a record boundary).
+        stop: The offset of the byte after the range (on a record boundary).
+        parser: The function parsing each record.
+
+    Returns: The parsed records of the range with their count and total amount.
+    """
+    with open(path, 'rb') as file:
+        file.seek(start)
+        buffer = memoryview(file.read(stop - start))
+
+    amount = RecordView836.amount.span
+    results = []
+    total_amount = Decimal(0)
+    for offset in range(0, len(buffer), RECORD_836_SIZE):
+        results.append(parser(RecordView836(buffer[offset:offset + RECORD_836_SIZE])))
+        total_amount += parse_amount(bytes(buffer[offset + amount.start:offset + amount.stop]))
+    return ChunkResult(results, len(buffer) // RECORD_836_SIZE, total_amount)
+
+
+def read_parallel(path: str, parser: Callable[[RecordView836], Any] = record_values, workers: int = None,
+                  chunk_size: int = 10_000) -> ReadResult:
+    """Read and parse the records of a DTA file in parallel.
+
+    The structure of the file is checked first (see ``DTAFileView``),
+    the records are then split in ranges of ``chunk_size`` records,
+    parsed in a pool of processes and returned in the order of the file.
+    The counts and totals of the ranges are merged such that the result
+    can be checked against the TA 890 control total.
+
+    Args:
+        path: The path of the DTA file.
+        parser: The function parsing each record, it must be picklable
+            (e.g. a module level function or an ``operator.attrgetter``).
+        workers: The number of processes (default: the number of CPUs).
+            With a single worker the records are read in the current process.
+        chunk_size: The maximum number of records parsed at once by a worker.
+
+    Returns: The parsed records with their count, total amount and the control total.
+
+    Raises:
+        ValueError: When the file is not a valid DTA file of TA 836 records.
+    """
+    if chunk_size < 1:
+        raise ValueError(f'Invalid chunk size: must be positive (got: {chunk_size})')
+    with DTAFileView(path) as view:
+        record_count = len(view)
+        control_total = parse_amount(view.total_record.amount)
+
+    ranges = record_ranges(record_count, chunk_size)
+    starts, stops = [start for start, _ in ranges], [stop for _, stop in ranges]
+    workers = workers if workers is not None else os.cpu_count()
+    if workers == 1 or len(ranges) < 2:
+        chunks = list(map(read_chunk, repeat(path), starts, stops, repeat(parser)))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunks = list(executor.map(read_chunk, repeat(path), starts, stops, repeat(parser)))
+
+    return ReadResult(
+        results=[result for chunk in chunks for result in chunk.results],
+        record_count=sum(chunk.record_count for chunk in chunks),
+        total_amount=sum((chunk.total_amount for chunk in chunks), Decimal(0)),
+        control_total=control_total
+    )
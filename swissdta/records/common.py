@@ -1,6 +1,49 @@
 """Common implementation to all DTA record"""
 from collections import defaultdict
-from typing import Tuple
+from typing import Any, Dict, Iterator, NamedTuple, Tuple, Union
+
+from swissdta.constants import ERROR_MESSAGES, ErrorCode
+
+
+class ValidationIssue(NamedTuple):
+    """A validation error or warning of a field.
+
+    Issues only hold the error code and the parameters of their
+    message, the message itself is rendered when requested.
+
+    Attributes:
+        code: The type of the issue.
+        field: The name of the field to which the issue applies.
+        params: The parameters of the issue's message.
+    """
+    code: ErrorCode
+    field: str
+    params: Dict[str, Any]
+
+    @classmethod
+    def create(cls, field_name: str, issue: Union['ValidationIssue', ErrorCode, str], **params) -> 'ValidationIssue':
+        """Create an issue for a field.
+
+        Args:
+            field_name: The name of the field to which the issue applies.
+            issue: An existing issue, an error code or a message (for issues without error code).
+            **params: The parameters of the issue's message.
+
+        Returns: The issue for the field.
+        """
+        if isinstance(issue, ValidationIssue):
+            return issue if issue.field == field_name else issue._replace(field=field_name)
+        if isinstance(issue, ErrorCode):
+            return cls(issue, field_name, params)
+        return cls(ErrorCode.OTHER, field_name, {'message': issue})
+
+    @property
+    def message(self) -> str:
+        """The human readable message of the issue."""
+        return ERROR_MESSAGES[self.code].format(**self.params)
+
+    def __str__(self) -> str:
+        return f'[{self.field}] {self.message}'
 
 
 class ValidationLogMixin(object):
@@ -18,23 +61,46 @@ class ValidationLogMixin(object):
     @property
     def validation_warnings(self) -> Tuple[str, ...]:
         """Return a flat list of all the warnings for all of the fields."""
-        return tuple(warning for warnings in self.__validation_warnings.values() for warning in warnings)
+        return tuple(f'{warning}' for warning in self.warning_issues())
 
     @property
     def validation_errors(self) -> Tuple[str, ...]:
         """Return a flat list of all the errors for all of the fields."""
-        return tuple(error for errors in self.__validation_errors.values() for error in errors)
+        return tuple(f'{error}' for error in self.error_issues())
+
+    def warning_issues(self) -> Iterator['ValidationIssue']:
+        """Iterate over the warnings of all of the fields, without rendering their messages."""
+        return (warning for warnings in self.__validation_warnings.values() for warning in warnings)
 
-    def add_warning(self, field_name: str, warning: str) -> None:
+    def error_issues(self) -> Iterator['ValidationIssue']:
+        """Iterate over the errors of all of the fields, without rendering their messages."""
+        return (error for errors in self.__validation_errors.values() for error in errors)
+
+    def field_warnings(self) -> Iterator[Tuple[str, str]]:
+        """Iterate over the warnings of all of the fields.
+
+        Returns: An iterator of ``(field_name, warning)`` tuples.
+        """
+        return ((warning.field, warning.message) for warning in self.warning_issues())
+
+    def field_errors(self) -> Iterator[Tuple[str, str]]:
+        """Iterate over the errors of all of the fields.
+
+        Returns: An iterator of ``(field_name, error)`` tuples.
+        """
+        return ((error.field, error.message) for error in self.error_issues())
+
+    def add_warning(self, field_name: str, warning: Union[ErrorCode, str], **params) -> None:
         """Add a warning for a specific field.
 
         Args:
             field_name: The name of the field to which the warning applies.
-            warning: The warning for the field.
+            warning: The error code of the warning or the warning message.
+            **params: The parameters of the warning's message.
         """
-        self.__validation_warnings[field_name].append(f'[{field_name}] {warning}')
+        self.__validation_warnings[field_name].append(ValidationIssue.create(field_name, warning, **params))
 
-    def set_warnings(self, field_name: str, *warnings: str) -> None:
+    def set_warnings(self, field_name: str, *warnings: Union['ValidationIssue', str]) -> None:
         """Overwrite the warnings for a given field.
 
         Calling the method without any warnings:
@@ -45,18 +111,20 @@ class ValidationLogMixin(object):
             field_name: The name of the field to overwrite or set the warnings.
             *warnings: The warnings to set.
         """
-        self.__validation_warnings[field_name] = [f'[{field_name}] {warning}' for warning in warnings]
+        self.__validation_warnings[field_name] = [ValidationIssue.create(field_name, warning)
+                                                  for warning in warnings]
 
-    def add_error(self, field_name: str, error: str) -> None:
+    def add_error(self, field_name: str, error: Union[ErrorCode, str], **params) -> None:
         """Add a error for a specific field.
 
         Args:
             field_name: The name of the field to which the error applies.
-            error: The warning for the field.
+            error: The error code of the error or the error message.
+            **params: The parameters of the error's message.
         """
-        self.__validation_errors[field_name].append(f'[{field_name}] {error}')
+        self.__validation_errors[field_name].append(ValidationIssue.create(field_name, error, **params))
 
-    def set_errors(self, field_name: str, *errors: str) -> None:
+    def set_errors(self, field_name: str, *errors: Union['ValidationIssue', str]) -> None:
         """Overwrite the errors for a given field.
 
         Calling the method without any errors:
@@ -67,7 +135,54 @@ class ValidationLogMixin(object):
             field_name: The name of the field to overwrite or set the errors.
             *errors: The errors to set.
         """
-        self.__validation_errors[field_name] = [f'[{field_name}] {error}' for error in errors]
+        self.__validation_errors[field_name] = [ValidationIssue.create(field_name, error) for error in errors]
+
+    def __getstate__(self) -> dict:
+        # Field values are stored by the (class level) field descriptors and not in the
+        # instance dictionary, they must be added explicitly for the instance to be pickled.
+        state = self.__dict__.copy()
+        state['_field_values'] = {name: field.data[self] for name, field in self._fields() if self in field.data}
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        state = state.copy()
+        field_values = state.pop('_field_values', {})
+        self.__dict__.update(state)
+        for name, value in field_values.items():
+            # The values were validated when initially set, the errors and warnings are restored with the state
+            getattr(type(self), name).data[self] = value
+
+    def reset(self) -> None:
+        """Reset all the fields to their default value and clear all the warnings and errors.
+
+        Resetting an instance is cheaper than creating a new
+        one (see ``swissdta.pool.RecordPool``).
+        """
+        for field in self._field_descriptors():
+            field.data.pop(self, None)
+        self.__validation_warnings.clear()
+        self.__validation_errors.clear()
+
+    @classmethod
+    def _field_descriptors(cls) -> Tuple[Any, ...]:
+        # Looked up in the class dictionary only, each subclass has its own fields
+        descriptors = cls.__dict__.get('_descriptors')
+        if descriptors is None:
+            descriptors = tuple(field for _, field in cls._fields())
+            cls._descriptors = descriptors
+        return descriptors
+
+    @classmethod
+    def _fields(cls) -> Iterator[Tuple[str, Any]]:
+        from swissdta.fields import Field  # pylint: disable=cyclic-import
+        seen = set()
+        for klass in cls.__mro__:
+            for name, attribute in vars(klass).items():
+                if name in seen:  # overridden in a subclass
+                    continue
+                seen.add(name)
+                if isinstance(attribute, Field):
+                    yield name, attribute
 
     def has_warnings(self) -> bool:
         """Utility method to indicate whether any warnings have been recorded."""
@@ -1,7 +1,7 @@
 """Standard header for any DTA record type."""
 from datetime import datetime, timedelta
 
-from swissdta.constants import FillSide, PaymentType
+from swissdta.constants import ErrorCode, FillSide, PaymentType
 from swissdta.fields import AlphaNumeric, Date, Numeric
 from swissdta.records.common import ValidationLogMixin
 
@@ -88,11 +88,10 @@ class DTAHeader(ValidationLogMixin):
         try:
             creation_date = datetime.strptime(self.creation_date, Date.DATE_FORMAT)
         except ValueError:
-            self.add_error('creation_date', "INVALID: must contain a valid date.")
+            self.add_error('creation_date', ErrorCode.INVALID_CREATION_DATE)
         else:
             if not earliest_valid_creation_date < creation_date < latest_valid_creation_date:
-                self.add_error('creation_date', "INVALID: creation date may not differ by +/- 90 calendar days"
-                                                " from the date when read in.")
+                self.add_error('creation_date', ErrorCode.CREATION_DATE_OUT_OF_RANGE)
 
         # XXX Properly validate bank clearing no. of the client can only be done with a reliable and up to date
         # database of bank clearing numbers, which is difficult to obtain.
@@ -1,9 +1,9 @@
 """Base class for DTA TA records"""
 
 from itertools import chain
-from typing import Tuple
+from typing import Iterator
 
-from swissdta.records.common import ValidationLogMixin
+from swissdta.records.common import ValidationIssue, ValidationLogMixin
 from swissdta.records.header import DTAHeader
 
 
@@ -22,15 +22,13 @@ class DTARecord(ValidationLogMixin):
         super().__init__()
         self.header = DTAHeader()
 
-    @property
-    def validation_warnings(self) -> Tuple[str, ...]:
-        """~ValidationLog.validation_warnings"""
-        return tuple(warning for warning in chain(self.header.validation_warnings, super().validation_warnings))
+    def warning_issues(self) -> Iterator[ValidationIssue]:
+        """~ValidationLog.warning_issues"""
+        return chain(self.header.warning_issues(), super().warning_issues())
 
-    @property
-    def validation_errors(self) -> Tuple[str, ...]:
-        """~ValidationLog.validation_errors"""
-        return tuple(error for error in chain(self.header.validation_errors, super().validation_errors))
+    def error_issues(self) -> Iterator[ValidationIssue]:
+        """~ValidationLog.error_issues"""
+        return chain(self.header.error_issues(), super().error_issues())
 
     def has_warnings(self) -> bool:
         """~ValidationLog.has_warnings"""
@@ -40,7 +38,12 @@ class DTARecord(ValidationLogMixin):
         """~ValidationLog.has_errors"""
         return self.header.has_errors() or super().has_errors()
 
-    def validate(self) -> None:
+    def reset(self) -> None:
+        """~ValidationLog.reset, the header is reset as well."""
+        super().reset()
+        self.header.reset()
+
+    def validate(self, profile=None) -> None:  # pylint: disable=unused-argument
         """Triggers the validation of the record.
 
         This validate the data in the record according to the
@@ -51,6 +54,10 @@ class DTARecord(ValidationLogMixin):
         The ``has_warnings`` and ``has_errors`` properties should
         be used to test for the presence of warnings or errors.
 
+        Args:
+            profile: The validation profile selecting the rules of the
+                record type, if it has any (see ``swissdta.records.rules``).
+
         .. _DTA Standards and Formats:
             https://www.six-interbank-clearing.com/dam/downloads/en/standardization/dta/dta.pdf
         """
@@ -1,14 +1,15 @@
 """Implementation of TA 836 Record"""
-from datetime import datetime, timedelta
-from itertools import combinations
-from typing import Tuple
+from types import SimpleNamespace
+from typing import Any, List, Mapping, Tuple, Union
 
-from schwifty import BIC, IBAN
-
-from swissdta.constants import ChargesRule, IdentificationBankAddress, IdentificationPurpose, FillSide, PaymentType
+from swissdta.constants import (ChargesRule, ErrorCode, FillSide, IdentificationBankAddress, IdentificationPurpose,
+                                PaymentType)
 from swissdta.fields import AlphaNumeric, Amount, Currency, Date, Iban, Numeric
+from swissdta.records.common import ValidationIssue
 from swissdta.records.record import DTARecord
-from swissdta.util import remove_whitespace, is_swiss_iban
+from swissdta.records.rules import (ValidationProfile, client_address_errors, client_iban_errors, get_profile,
+                                    iid_errors)
+from swissdta.util import is_swiss_iban
 
 
 class DTARecord836(DTARecord):  # pylint: disable=too-many-instance-attributes
@@ -125,6 +126,28 @@ class DTARecord836(DTARecord):  # pylint: disable=too-many-instance-attributes
     def __init__(self):
         super().__init__()
         self.header.transaction_type = 836
+        self._ordering_party: Union['OrderingParty', None] = None
+
+    def reset(self) -> None:
+        super().reset()
+        self.header.transaction_type = 836
+        self._ordering_party = None
+
+    @property
+    def ordering_party(self) -> Union['OrderingParty', None]:
+        """The ordering party shared with other records (``None`` if the client fields were set individually).
+
+        Setting the ordering party sets the client account and address
+        to the values converted and validated once by the ordering party.
+        """
+        if self._ordering_party is not None and not self._ordering_party.is_shared_by(self):
+            self._ordering_party = None  # a client field was changed since
+        return self._ordering_party
+
+    @ordering_party.setter
+    def ordering_party(self, ordering_party: 'OrderingParty') -> None:
+        ordering_party.share_with(self)
+        self._ordering_party = ordering_party
 
     @property
     def client_address(self) -> Tuple[str, str, str]:
@@ -205,85 +228,169 @@ class DTARecord836(DTARecord):  # pylint: disable=too-many-instance-attributes
             padding=''
         )
 
-    def validate(self) -> None:  # pylint: disable=too-complex, too-many-branches
-        """Validate the field's value of the record."""
+    def validate(self, profile: Union[str, ValidationProfile] = 'full') -> None:
+        """Validate the field's value of the record.
+
+        Args:
+            profile: The validation profile (or its name) selecting the
+                TA 836 rules to apply (see ``swissdta.records.rules``).
+        """
         super().validate()
         if self.header.processing_date != '000000':
-            self.header.add_error('processing_date', "NOT PERMITTED: header processing date must be '000000'.")
+            self.header.add_error('processing_date', ErrorCode.PROCESSING_DATE_NOT_PERMITTED)
 
         if self.header.recipient_clearing.strip():
-            self.header.add_error('recipient_clearing',
-                                  "NOT ALLOWED: beneficiary's bank clearing number must be blank.")
+            self.header.add_error('recipient_clearing', ErrorCode.RECIPIENT_CLEARING_NOT_BLANK)
 
         if self.header.transaction_type != '836':
-            self.header.add_error('transaction_type', "INVALID: Transaction type must be TA 836.")
-
-        if self.header.payment_type not in {payment_type.value for payment_type in PaymentType}:
-            self.header.add_error('payment_type', "INVALID: Payment type must be 0 or 1 TA 836.")
-
-        if not remove_whitespace(self.reference):
-            self.add_error('reference', "MISSING TRANSACTION NUMBER: Reference may not be blank.")
-
-        try:
-            client_iban = IBAN(self.client_account, allow_invalid=False)
-        except ValueError:  # Will throw ValueError if it is not a valid IBAN
-            self.add_error(
-                'client_account',
-                "IBAN INVALID: Client account must be a valid with a 21 digit Swiss IBAN (CH resp. LI) ."
-            )
-        else:
-            if not is_swiss_iban(client_iban):
-                self.add_error(
-                    'client_account',
-                    "IBAN INVALID: Client account must be a valid with a 21 digit Swiss IBAN (CH resp. LI) ."
-                )
-
-        # Bank clearing is at pos 5-9 in IBAN
-        if self.client_account[4:9].lstrip('0') != self.header.client_clearing.strip():
-            self.add_error('client_account',
-                           "IID IN IBAN NOT IDENTICAL WITH BC-NO: IID in IBAN (pos. 5 to 9) must concur with the "
-                           "ordering party's BC no.")
-
-        now = datetime.now()
-        ten_days_ago = now - timedelta(days=10)
-        sixty_days_ahead = now + timedelta(days=60)
-        try:
-            value_date = datetime.strptime(self.value_date, Date.DATE_FORMAT)
-        except ValueError:
-            self.add_error('value_date', "INVALID: Must contain a valid date.")
-        else:
-            if value_date < ten_days_ago:
-                self.add_error('value_date', "EXPIRED: value date may not be elapsed more than 10 calendar days.")
-            elif value_date > sixty_days_ahead:
-                self.add_error('value_date', "TOO FAR AHEAD: value date may not exceed the reading in date + 60 days.")
-
-        decimal_places = len(self.amount.strip().split(',', maxsplit=1)[1])
-        if self.currency == 'CHF' and decimal_places > 2:
-            self.add_error('currency',
-                           "MORE THAN 2 DECIMAL PLACES: Amount may not contain more than 2 decimal places.")
-        elif self.currency != 'CHF' and decimal_places > 3:
-            self.add_error(
-                'currency',
-                " MORE THAN 3 DECIMAL PLACES: Amount may not contain more than 3 decimal places (foreign currencies)."
-            )
-
-        if not any(self.client_address):
-            self.add_error('client_address', "INCOMPLETE: Ordering party address, at least one line must exist.")
-        if self.bank_address_type == IdentificationBankAddress.SWIFT_ADDRESS:
-            try:
-                BIC(self.bank_address1).validate()
-            except ValueError:
-                self.add_error(
-                    'bank_address_type',
-                    f"INCORRECT FIELD IDENTIFICATION: bank address type {IdentificationBankAddress.SWIFT_ADDRESS} "
-                    f"may only be used if an 8 or 11 character BIC address (SWIFT) exists."
-                )
-        # No specification on how to validate a bank's address if the `bank_address_type` is not SWIFT.
-
-        if all(not line1.strip() or not line2.strip() for line1, line2 in combinations(self.client_address, 2)):
-            self.add_error('client_address', "INCOMPLETE: At least two address lines must exist.")
-
-        if any('/C/' in address for address in self.client_address):
-            self.add_error('client_address', "INVALID: /C/ may not be present for TA 836.")
+            self.header.add_error('transaction_type', ErrorCode.INVALID_TRANSACTION_TYPE, transaction_type=836)
+
+        if self.header.payment_type not in {f'{payment_type.value}' for payment_type in PaymentType}:
+            self.header.add_error('payment_type', ErrorCode.INVALID_PAYMENT_TYPE, transaction_type=836)
+
+        for error in get_profile(profile).errors(self, self.header.client_clearing):
+            self.add_error(error.field, error)
 
         # XXX Missing validation of IPI reference if identification purpose is structured (I)
+
+
+def validate_836(payment: Mapping[str, Any], client_clearing: str = None,
+                 profile: Union[str, ValidationProfile] = 'full') -> List[ValidationIssue]:
+    """Validate a single TA 836 payment without creating a record.
+
+    The payment is converted and validated with the same field
+    validations and TA 836 record rules as a record added with
+    ``DTAFile.add_836_record``, in a single lightweight pass. Rules
+    which depend on the file (sequence numbers, unique references, ...)
+    are not applied.
+
+    Args:
+        payment: The payment as a mapping with the same keys as the
+            arguments of ``DTAFile.add_836_record``.
+        client_clearing: The bank clearing no. of the ordering party's
+            bank. The client account's IID is not validated if omitted.
+        profile: The validation profile (or its name) selecting the TA 836 rules to apply.
+
+    Returns: The validation errors of the payment (empty if the payment is valid).
+
+    Raises:
+        KeyError: When a mandatory value is missing from the payment.
+    """
+    errors = []
+    values = {}
+
+    def check(field_name: str, value) -> str:
+        formatted_value, field_errors, _ = _FIELDS_836[field_name].check(value)
+        errors.extend(field_errors)
+        values[field_name] = formatted_value
+        return formatted_value
+
+    check('reference', payment['reference'])
+    check('client_account', payment['client_account'])
+    check('value_date', payment['processing_date'])
+    check('currency', payment['currency'])
+    check('amount', payment['amount'])
+    check('conversion_rate', payment.get('conversion_rate'))
+    for field_name, line in zip(('client_address1', 'client_address2', 'client_address3'), payment['client_address']):
+        check(field_name, line)
+
+    if is_swiss_iban(check('recipient_iban', payment['recipient_iban'])):
+        bank_address_type = IdentificationBankAddress.BENEFICIARY_ADDRESS
+        bank_address = ('', '')
+    else:
+        bank_address_type = payment.get('bank_address_type', IdentificationBankAddress.BENEFICIARY_ADDRESS)
+        bank_address = payment.get('bank_address', ('', ''))
+    check('bank_address_type', bank_address_type)
+    check('bank_address1', bank_address[0])
+    check('bank_address2', bank_address[1])
+
+    check('recipient_name', payment['recipient_name'])
+    for field_name, line in zip(('recipient_address1', 'recipient_address2'), payment['recipient_address']):
+        check(field_name, line)
+
+    identification_purpose = payment['identification_purpose']
+    purpose = payment['purpose']
+    if identification_purpose == IdentificationPurpose.STRUCTURED:
+        purpose = (purpose, '', '') if isinstance(purpose, str) else (purpose[0], '', '')
+    check('identification_purpose', identification_purpose)
+    for field_name, line in zip(('purpose1', 'purpose2', 'purpose3'), purpose):
+        check(field_name, line)
+    check('charges_rules', payment['charges_rules'])
+
+    values['client_address'] = (values['client_address1'], values['client_address2'], values['client_address3'])
+    errors.extend(get_profile(profile).errors(SimpleNamespace(**values), client_clearing))
+    return errors
+
+
+_FIELDS_836 = {name: field for name, field in DTARecord836._fields()}  # pylint: disable=protected-access
+_ORDERING_PARTY_FIELDS = ('client_account', 'client_address1', 'client_address2', 'client_address3')
+
+
+class OrderingParty(object):
+    """Client account and address shared by the TA 836 records of an ordering party.
+
+    The client fields of most records of a file are identical. An
+    ordering party converts and validates them once, including the TA 836
+    rules on the client account and address, and the records sharing it
+    (see ``DTARecord836.ordering_party`` or ``DTAFile``) reference the
+    converted values instead of converting and validating them again.
+
+    An ordering party is immutable, create a new one to change its values.
+
+    Attributes:
+        client_account: The account to be debited (as given).
+        client_address: The 3 lines of the ordering party's address (as given).
+        client_clearing: The bank clearing no. of the ordering party's bank.
+        account_errors: The errors of the client account beyond the
+            validation of the field (excluding the IID, which depends on the file).
+        iid_errors: The errors of the IID of the client account for the
+            client clearing of the ordering party (reused by the ``iid``
+            rule for records of files with the same client clearing).
+        address_errors: The errors of the client address beyond the validation of each line.
+    """
+    __slots__ = ('client_account', 'client_address', 'client_clearing', 'account_errors', 'address_errors',
+                 'iid_errors', '_values')
+
+    def __init__(self, client_account: str, client_address: Tuple[str, str, str], client_clearing: str):
+        """Convert and validate the client fields of an ordering party.
+
+        Args:
+            client_account: Account to be debited (only IBAN is accepted)
+            client_address: Ordering party's address (3 times 35 characters)
+            client_clearing: Bank clearing no. of the ordering party's bank
+        """
+        self.client_account = client_account
+        self.client_address = tuple(client_address)
+        self.client_clearing = client_clearing
+        self._values = tuple((name, *_FIELDS_836[name].convert(value))
+                             for name, value in zip(_ORDERING_PARTY_FIELDS, (client_account, *self.client_address)))
+
+        formatted_values = [_FIELDS_836[name]._format_value(value)  # pylint: disable=protected-access
+                            for name, value, _, _ in self._values]
+        self.iid_errors = tuple(iid_errors(formatted_values[0], client_clearing))
+        self.account_errors = tuple(client_iban_errors(formatted_values[0]))
+        self.address_errors = tuple(client_address_errors(tuple(formatted_values[1:])))
+
+    def __repr__(self) -> str:
+        return f'<OrderingParty(client_account={self.client_account!r}, client_clearing={self.client_clearing!r})>'
+
+    @property
+    def errors(self) -> Tuple[ValidationIssue, ...]:
+        """All the validation errors of the ordering party."""
+        field_errors = tuple(error for _, _, errors, _ in self._values for error in errors)
+        return field_errors + self.iid_errors + self.account_errors + self.address_errors
+
+    def matches(self, client_account: str, client_address: Tuple[str, str, str]) -> bool:
+        """Whether the given client account and address are the ones of the ordering party."""
+        return client_account == self.client_account and tuple(client_address) == self.client_address
+
+    def share_with(self, record: DTARecord836) -> None:
+        """Set the converted client fields of a record, with their warnings and errors."""
+        for name, value, errors, warnings in self._values:
+            _FIELDS_836[name].data[record] = value
+            record.set_warnings(name, *warnings)
+            record.set_errors(name, *errors)
+
+    def is_shared_by(self, record: DTARecord836) -> bool:
+        """Whether the client fields of a record are (still) the ones of the ordering party."""
+        return all(_FIELDS_836[name].data.get(record) is value for name, value, _, _ in self._values)
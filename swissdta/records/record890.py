@@ -1,4 +1,5 @@
 """Implementation of the TA 890 total record"""
+from swissdta.constants import ErrorCode
 from swissdta.fields import Amount
 from swissdta.records.record import DTARecord
 
@@ -27,6 +28,10 @@ class DTARecord890(DTARecord):
         super().__init__()
         self.header.transaction_type = 890
 
+    def reset(self) -> None:
+        super().reset()
+        self.header.transaction_type = 890
+
     def generate(self) -> str:
         """Generate a TA 890 record as a string.
 
@@ -38,16 +43,16 @@ class DTARecord890(DTARecord):
         """
         return self._template.format(header=self.header.generate(), amount=self.amount, padding='')
 
-    def validate(self) -> None:
-        super().validate()
+    def validate(self, profile=None) -> None:
+        """Validate the total record (there are no rules for TA 890 records, ``profile`` is ignored)."""
+        super().validate(profile)
 
         if self.header.transaction_type != '890':
-            self.header.add_error('transaction_type', "INVALID: Transaction type must be TA 890.")
+            self.header.add_error('transaction_type', ErrorCode.INVALID_TRANSACTION_TYPE, transaction_type=890)
 
         if self.header.client_clearing.strip():
-            self.header.add_error('client_clearing', 'INVALID: must be completed with blanks')
+            self.header.add_error('client_clearing', ErrorCode.CLIENT_CLEARING_NOT_BLANK)
 
         decimal_places = len(self.amount.strip().split(',', maxsplit=1)[1])
         if decimal_places > 3:
-            self.add_error('amount',
-                           "MORE THAN 3 DECIMAL PLACES: Total amount may not contain more than 3 decimal places.")
+            self.add_error('amount', ErrorCode.TOO_MANY_DECIMAL_PLACES, max_decimal_places=3, subject='Total amount')
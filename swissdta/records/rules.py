@@ -0,0 +1,241 @@
+"""Registry of the TA 836 record rules and validation profiles.
+
+Besides the validation of each field (done when a value is set), a
+TA 836 record is checked against the rules registered here. Each rule
+has a relative cost and the rules are always applied from the cheapest
+to the most expensive one.
+
+A ``ValidationProfile`` selects the rules applied to the records of a
+file (see the ``validation_profile`` of ``DTAFile``). Three profiles are
+predefined in ``PROFILES``:
+
+``full``
+    All the rules, all the errors of a record are reported (the default).
+``trusted-upstream``
+    All the rules except the ones verifying values which are already
+    verified by trusted upstream systems (the client IBAN and the BIC).
+    The rules of a record stop at its first failing rule.
+``structural``
+    Only the rules checking that the record is well formed (mandatory
+    values, decimal places, IID, address lines and format of the value
+    date). The rules of a record stop at its first failing rule.
+    Expired value dates or value dates too far ahead are not reported.
+"""
+from datetime import datetime, timedelta
+from itertools import combinations
+from typing import Any, Callable, Dict, Iterable, Iterator, NamedTuple, Tuple, Union
+
+from swissdta.constants import (DATE_FORMAT, FOREIGN_MAX_DECIMAL_PLACES, MAX_DECIMAL_PLACES, ErrorCode,
+                                IdentificationBankAddress)
+from swissdta.records.common import ValidationIssue
+from swissdta.util import currency_table, is_swiss_iban, lazy_import, remove_whitespace
+
+
+class Rule(NamedTuple):
+    """A rule applied to the (formatted) values of a TA 836 record.
+
+    Attributes:
+        name: The name of the rule.
+        cost: The relative cost of the rule, cheaper rules are applied first.
+        check: The function returning the errors of a record for a client
+            clearing (``None`` if the IID must not be checked).
+        structural: Whether the rule checks that the record is well formed.
+        upstream: Whether the rule verifies values usually already verified
+            upstream (skipped by the ``trusted-upstream`` profile).
+    """
+    name: str
+    cost: int
+    check: Callable[[Any, Union[str, None]], Iterable[ValidationIssue]]
+    structural: bool
+    upstream: bool
+
+
+RULES: Dict[str, Rule] = {}
+
+
+def rule(name: str, cost: int, structural: bool = False,
+         upstream: bool = False) -> Callable[[Callable], Callable]:
+    """Register a function as a TA 836 rule (see ``Rule``)."""
+    def register(check: Callable) -> Callable:
+        RULES[name] = Rule(name, cost, check, structural, upstream)
+        return check
+    return register
+
+
+class ValidationProfile(NamedTuple):
+    """A set of rules applied to the records of a file.
+
+    Attributes:
+        name: The name of the profile.
+        rules: The rules of the profile, from the cheapest to the most expensive.
+        short_circuit: Whether to stop at the first failing rule of a record.
+    """
+    name: str
+    rules: Tuple[Rule, ...]
+    short_circuit: bool = False
+
+    @classmethod
+    def create(cls, name: str, rules: Iterable[Rule], short_circuit: bool = False) -> 'ValidationProfile':
+        """Create a profile, ordering its rules by cost."""
+        return cls(name, tuple(sorted(rules, key=lambda item: item.cost)), short_circuit)
+
+    def without(self, *names: str) -> 'ValidationProfile':
+        """Create a copy of the profile without some rules.
+
+        Args:
+            *names: The names of the rules to remove.
+
+        Raises:
+            ValueError: When a rule is not registered.
+        """
+        unknown_names = set(names) - set(RULES)
+        if unknown_names:
+            raise ValueError(f"Unknown rule(s): {', '.join(sorted(unknown_names))}")
+        return self._replace(rules=tuple(item for item in self.rules if item.name not in names))
+
+    def errors(self, record, client_clearing: Union[str, None]) -> Iterator[ValidationIssue]:
+        """Apply the rules of the profile to a record.
+
+        Args:
+            record: The TA 836 record or any object with the same (formatted) attributes.
+            client_clearing: The bank clearing no. of the ordering party
+                (``None`` to skip the validation of the client account's IID).
+
+        Returns: An iterator over the validation errors.
+        """
+        for item in self.rules:
+            failed = False
+            for error in item.check(record, client_clearing):
+                failed = True
+                yield error
+            if failed and self.short_circuit:
+                return
+
+
+def get_profile(profile: Union[str, ValidationProfile]) -> ValidationProfile:
+    """Get a predefined profile by name (profiles are returned as is).
+
+    Raises:
+        ValueError: When there is no profile with this name.
+    """
+    if isinstance(profile, ValidationProfile):
+        return profile
+    try:
+        return PROFILES[profile]
+    except KeyError:
+        raise ValueError(f"Unknown validation profile '{profile}' (use one of: {', '.join(PROFILES)})") from None
+
+
+def client_iban_errors(client_account: str) -> Iterator[ValidationIssue]:
+    """Validate that the formatted client account is a Swiss IBAN."""
+    try:
+        client_iban = lazy_import('schwifty').IBAN(client_account, allow_invalid=False)
+    except ValueError:  # Will throw ValueError if it is not a valid IBAN
+        yield ValidationIssue(ErrorCode.INVALID_CLIENT_ACCOUNT, 'client_account', {})
+    else:
+        if not is_swiss_iban(client_iban):
+            yield ValidationIssue(ErrorCode.INVALID_CLIENT_ACCOUNT, 'client_account', {})
+
+
+def iid_errors(client_account: str, client_clearing: Union[str, None]) -> Iterator[ValidationIssue]:
+    """Validate the IID of the formatted client account against the client clearing if not ``None``."""
+    # Bank clearing is at pos 5-9 in IBAN
+    if client_clearing is not None and client_account[4:9].lstrip('0') != client_clearing.strip():
+        yield ValidationIssue(ErrorCode.IID_MISMATCH, 'client_account', {})
+
+
+def client_address_errors(client_address: Tuple[str, str, str]) -> Iterator[ValidationIssue]:
+    """Validate the formatted lines of the client address."""
+    if not any(line.strip() for line in client_address):
+        yield ValidationIssue(ErrorCode.MISSING_CLIENT_ADDRESS, 'client_address', {})
+        return  # an empty address is incomplete as well
+
+    if all(not line1.strip() or not line2.strip() for line1, line2 in combinations(client_address, 2)):
+        yield ValidationIssue(ErrorCode.INCOMPLETE_CLIENT_ADDRESS, 'client_address', {})
+
+    if any('/C/' in address for address in client_address):
+        yield ValidationIssue(ErrorCode.CLIENT_ADDRESS_CONTAINS_C, 'client_address', {})
+
+
+@rule('reference', cost=1, structural=True)
+def _reference(record, _) -> Iterator[ValidationIssue]:
+    if not remove_whitespace(record.reference):
+        yield ValidationIssue(ErrorCode.MISSING_REFERENCE, 'reference', {})
+
+
+@rule('iid', cost=1, structural=True)
+def _iid(record, client_clearing: Union[str, None]) -> Iterable[ValidationIssue]:
+    ordering_party = getattr(record, 'ordering_party', None)
+    if (ordering_party is not None and client_clearing is not None
+            and client_clearing.strip() == ordering_party.client_clearing.strip()):
+        return ordering_party.iid_errors
+    return iid_errors(record.client_account, client_clearing)
+
+
+@rule('decimal_places', cost=2, structural=True)
+def _decimal_places(record, _) -> Iterator[ValidationIssue]:
+    decimal_places = len(record.amount.strip().split(',', maxsplit=1)[1])
+    currency_info = currency_table().get(record.currency)
+    max_decimal_places = currency_info.max_decimal_places if currency_info else FOREIGN_MAX_DECIMAL_PLACES
+    if decimal_places > max_decimal_places:
+        subject = 'Amount' if record.currency in MAX_DECIMAL_PLACES else 'Amount (foreign currencies)'
+        yield ValidationIssue(ErrorCode.TOO_MANY_DECIMAL_PLACES, 'currency',
+                              {'max_decimal_places': max_decimal_places, 'subject': subject})
+
+
+@rule('client_address', cost=3, structural=True)
+def _client_address(record, _) -> Iterable[ValidationIssue]:
+    ordering_party = getattr(record, 'ordering_party', None)
+    if ordering_party is not None:
+        return ordering_party.address_errors
+    return client_address_errors(record.client_address)
+
+
+@rule('value_date_format', cost=2, structural=True)
+def _value_date_format(record, _) -> Iterator[ValidationIssue]:
+    try:
+        datetime.strptime(record.value_date, DATE_FORMAT)
+    except ValueError:
+        yield ValidationIssue(ErrorCode.INVALID_VALUE_DATE, 'value_date', {})
+
+
+@rule('value_date', cost=5)
+def _value_date(record, _) -> Iterator[ValidationIssue]:
+    now = datetime.now()
+    try:
+        value_date = datetime.strptime(record.value_date, DATE_FORMAT)
+    except ValueError:  # reported by the ``value_date_format`` rule
+        return
+    if value_date < now - timedelta(days=10):
+        yield ValidationIssue(ErrorCode.VALUE_DATE_EXPIRED, 'value_date', {})
+    elif value_date > now + timedelta(days=60):
+        yield ValidationIssue(ErrorCode.VALUE_DATE_TOO_FAR_AHEAD, 'value_date', {})
+
+
+@rule('client_iban', cost=50, upstream=True)
+def _client_iban(record, _) -> Iterable[ValidationIssue]:
+    ordering_party = getattr(record, 'ordering_party', None)
+    if ordering_party is not None:
+        return ordering_party.account_errors
+    return client_iban_errors(record.client_account)
+
+
+@rule('bic', cost=50, upstream=True)
+def _bic(record, _) -> Iterator[ValidationIssue]:
+    # No specification on how to validate a bank's address if the `bank_address_type` is not SWIFT.
+    if record.bank_address_type == IdentificationBankAddress.SWIFT_ADDRESS.value:
+        try:
+            lazy_import('schwifty').BIC(record.bank_address1.strip()).validate()
+        except ValueError:
+            yield ValidationIssue(ErrorCode.INVALID_BIC, 'bank_address_type',
+                                  {'bank_address_type': IdentificationBankAddress.SWIFT_ADDRESS.value})
+
+
+PROFILES: Dict[str, ValidationProfile] = {
+    'full': ValidationProfile.create('full', RULES.values()),
+    'trusted-upstream': ValidationProfile.create('trusted-upstream',
+                                                 (item for item in RULES.values() if not item.upstream),
+                                                 short_circuit=True),
+    'structural': ValidationProfile.create('structural', (item for item in RULES.values() if item.structural),
+                                           short_circuit=True),
+}
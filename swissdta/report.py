@@ -0,0 +1,141 @@
+"""Structured validation report of a DTA file.
+
+The report aggregates the errors and warnings of all the records of a
+file such that they can be inspected programmatically and logged as a
+short summary instead of one log entry per record.
+"""
+from collections import Counter
+from logging import ERROR, WARNING, Logger
+from typing import Any, Dict, List, NamedTuple
+
+from swissdta.constants import ERROR_MESSAGES, ErrorCode
+from swissdta.records.record import DTARecord
+
+
+class ReportEntry(NamedTuple):
+    """A single error or warning of a record.
+
+    Attributes:
+        index: The index of the record in the file.
+        sequence_nr: The sequence number of the record.
+        reference: The reference of the record.
+        transaction_type: The transaction type of the record.
+        code: The error type.
+        field: The name of the field to which the entry applies.
+        params: The parameters of the error or warning message.
+    """
+    index: int
+    sequence_nr: str
+    reference: str
+    transaction_type: str
+    code: ErrorCode
+    field: str
+    params: Dict[str, Any]
+
+    @property
+    def message(self) -> str:
+        """The human readable error or warning message."""
+        return ERROR_MESSAGES[self.code].format(**self.params)
+
+
+class ValidationReport(object):
+    """Errors and warnings of the records of a DTA file.
+
+    A report is truthy if the file can be processed,
+    that is if there is no file format error.
+
+    Attributes:
+        valid_file: ``False`` if the file has format errors, no records or any
+            other reason which will prevent the file from being processed.
+        record_count: The number of records in the report.
+        invalid_record_count: The number of records with errors.
+        errors: The entries for the errors of all the records.
+        warnings: The entries for the warnings of all the records.
+    """
+
+    def __init__(self):
+        self.valid_file: bool = True
+        self.record_count: int = 0
+        self.invalid_record_count: int = 0
+        self.errors: List[ReportEntry] = []
+        self.warnings: List[ReportEntry] = []
+
+    def __bool__(self) -> bool:
+        return self.valid_file
+
+    def add_record(self, index: int, record: DTARecord) -> None:
+        """Add the errors and warnings of a record to the report.
+
+        Args:
+            index: The index of the record in the file.
+            record: The (validated) record.
+        """
+        self.record_count += 1
+        has_errors = record.has_errors()
+        if not has_errors and not record.has_warnings():
+            return
+
+        if has_errors:
+            self.invalid_record_count += 1
+        sequence_nr = record.header.sequence_nr
+        reference = getattr(record, 'reference', '')
+        transaction_type = record.header.transaction_type
+        for entries, issues in ((self.errors, record.error_issues()), (self.warnings, record.warning_issues())):
+            entries.extend(ReportEntry(index, sequence_nr, reference, transaction_type, *issue) for issue in issues)
+
+    def error_counts(self) -> Dict[ErrorCode, int]:
+        """Count the errors per error type.
+
+        Returns: A mapping of the error types to their number of occurrences.
+        """
+        return Counter(entry.code for entry in self.errors)
+
+    def warning_counts(self) -> Dict[ErrorCode, int]:
+        """Count the warnings per warning type.
+
+        Returns: A mapping of the warning types to their number of occurrences.
+        """
+        return Counter(entry.code for entry in self.warnings)
+
+    def log(self, logger: Logger, max_examples: int = 5) -> None:
+        """Log a summary of the report.
+
+        At most one error and one warning message are logged, each
+        listing the number of occurrences per type with no more than
+        ``max_examples`` example entries for each type. Messages are
+        only formatted if the corresponding log level is enabled.
+
+        Args:
+            logger: The logger to use.
+            max_examples: The maximum number of entries to detail per type.
+        """
+        if logger.isEnabledFor(ERROR) and (self.errors or not self.valid_file):
+            summary = self._summary(self.errors, max_examples)
+            if not self.valid_file and self.record_count > self.invalid_record_count:
+                summary += (f'\n  {self.record_count - self.invalid_record_count} record(s) valid '
+                            f'but the file has a format error')
+            logger.error('%d TA record(s) not processed, reason(s):%s',
+                         self.record_count if not self.valid_file else self.invalid_record_count, summary)
+
+        if logger.isEnabledFor(WARNING) and self.warnings:
+            logger.warning('%d warning(s) triggered by the TA record(s):%s',
+                           len(self.warnings), self._summary(self.warnings, max_examples))
+
+    @staticmethod
+    def _summary(entries: List[ReportEntry], max_examples: int) -> str:
+        examples: Dict[ErrorCode, List[ReportEntry]] = {}
+        counts = Counter()
+        for entry in entries:
+            counts[entry.code] += 1
+            code_examples = examples.setdefault(entry.code, [])
+            if len(code_examples) < max_examples:
+                code_examples.append(entry)
+
+        lines = []
+        for code, code_count in counts.most_common():
+            lines.append(f'{code.value}: {code_count} occurrence(s)')
+            lines.extend(f'  TA {entry.transaction_type} record (seq no {entry.sequence_nr}, ref: {entry.reference}) '
+                         f'[{entry.field}] {entry.message}' for entry in examples[code])
+            if code_count > max_examples:
+                lines.append(f'  ... and {code_count - max_examples} more')
+        return ''.join(f'\n  {line}' for line in lines)
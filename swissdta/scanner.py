@@ -0,0 +1,136 @@
+"""Fast summary of the payments of a DTA file.
+
+For reconciliation, only the currency, the value date and the amount of
+the payments and the TA 890 control total are needed. The scanner reads
+the file in large blocks and only slices these fields at their fixed
+offsets in the first segment of each record, without building records
+or decoding the other fields.
+"""
+import os
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+from typing import BinaryIO, Dict, List, NamedTuple, Tuple, Union
+
+from swissdta.layout import LINE_LENGTH, RECORD_836_SIZE, RECORD_890_SIZE, SPANS_836, SPANS_890
+from swissdta.util import parse_amount, parse_date
+
+
+class FileSummary(NamedTuple):
+    """The summary of the payments of a DTA file.
+
+    Attributes:
+        record_count: The number of TA 836 records.
+        total_amount: The sum of the amounts of all the TA 836 records (regardless of the currency).
+        control_total: The amount of the TA 890 total record.
+        totals: The sum of the amounts per currency and value date.
+        counts: The number of payments per currency and value date.
+    """
+    record_count: int
+    total_amount: Decimal
+    control_total: Decimal
+    totals: Dict[Tuple[str, date], Decimal]
+    counts: Dict[Tuple[str, date], int]
+
+    @property
+    def matches_control_total(self) -> bool:
+        """``True`` if the sum of the amounts matches the TA 890 control total."""
+        return self.total_amount == self.control_total
+
+    @property
+    def totals_per_currency(self) -> Dict[str, Decimal]:
+        """The sum of the amounts per currency."""
+        totals = defaultdict(Decimal)
+        for (currency, _), amount in self.totals.items():
+            totals[currency] += amount
+        return dict(totals)
+
+    @property
+    def totals_per_value_date(self) -> Dict[date, Dict[str, Decimal]]:
+        """The sum of the amounts per value date and currency."""
+        totals = defaultdict(dict)
+        for (currency, value_date), amount in self.totals.items():
+            totals[value_date][currency] = amount
+        return dict(totals)
+
+
+def scan(source: Union[str, BinaryIO], buffer_records: int = 1024) -> FileSummary:
+    """Summarize the payments of a DTA file.
+
+    Only the record boundaries, the transaction types and the scanned
+    fields are checked. Use ``swissdta.view.DTAFileView`` to check the
+    whole structure of the file.
+
+    Args:
+        source: The path of the DTA file or a binary stream.
+        buffer_records: The number of records read at once.
+
+    Returns: The summary of the payments.
+
+    Raises:
+        ValueError: When the file is not a DTA file of TA 836 records followed by a TA 890 record.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb', buffering=0) as stream:
+            return _scan(stream, buffer_records)
+    return _scan(source, buffer_records)
+
+
+def _scan(stream: BinaryIO, buffer_records: int) -> FileSummary:
+    amounts: Dict[bytes, List[bytes]] = defaultdict(list)
+    tail = b''
+    position = 0  # offset in the file of the start of ``data``
+    block_size = buffer_records * RECORD_836_SIZE
+    while True:
+        block = stream.read(block_size)
+        if not block:
+            break
+        data = tail + block if tail else block
+        end = _scan_records(data, position, amounts)
+        tail = data[end:]
+        position += end
+
+    # The remaining bytes are the total record (shorter than a TA 836 record), with or without line separator
+    if len(tail) not in (LINE_LENGTH, RECORD_890_SIZE) or tail[SPANS_890['transaction_type']] != b'890':
+        raise ValueError('Invalid DTA file: the file does not end with a TA 890 record.')
+
+    totals, counts = _sum_amounts(amounts)
+    return FileSummary(
+        record_count=sum(counts.values()),
+        total_amount=sum(totals.values(), Decimal(0)),
+        control_total=parse_amount(tail[SPANS_890['amount']]),
+        totals=totals,
+        counts=counts
+    )
+
+
+def _scan_records(data: bytes, position: int, amounts: Dict[bytes, List[bytes]]) -> int:
+    """Add the raw amounts of the complete TA 836 records of ``data`` to their group and return their size."""
+    transaction_type = SPANS_836['transaction_type']
+    type_start, type_stop = transaction_type.start, transaction_type.stop
+    # The value date and the currency are adjacent, they are used together as grouping key
+    key_start, key_stop = SPANS_836['value_date'].start, SPANS_836['currency'].stop
+    amount_start, amount_stop = SPANS_836['amount'].start, SPANS_836['amount'].stop
+
+    end = len(data) - len(data) % RECORD_836_SIZE
+    for offset in range(0, end, RECORD_836_SIZE):
+        if data[offset + type_start:offset + type_stop] != b'836':
+            raise ValueError(f'Invalid DTA file: record at byte {position + offset} is not a TA 836 record.')
+        key = data[offset + key_start:offset + key_stop]
+        amounts[key].append(data[offset + amount_start:offset + amount_stop])
+    return end
+
+
+def _sum_amounts(amounts: Dict[bytes, List[bytes]]) -> Tuple[Dict[Tuple[str, date], Decimal],
+                                                             Dict[Tuple[str, date], int]]:
+    """Sum and count the raw amounts of each (currency, value date) group."""
+    totals = {}
+    counts = {}
+    for key, key_amounts in amounts.items():
+        value_date, currency = key[:6], key[6:].decode('latin-1')
+        group = (currency, parse_date(value_date))
+        # Decode all the amounts of a group at once, amounts never contain spaces
+        totals[group] = sum(map(Decimal, b' '.join(key_amounts).decode('latin-1').replace(',', '.').split()),
+                            Decimal(0))
+        counts[group] = len(key_amounts)
+    return totals, counts
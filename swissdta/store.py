@@ -0,0 +1,170 @@
+"""Record stores for DTA files.
+
+By default a ``DTAFile`` holds its records in a plain ``list``. The
+``SpillingRecordStore`` defined here can be used instead to assemble
+large files with a bounded amount of memory.
+"""
+import os
+import pickle
+import sqlite3
+from array import array
+from tempfile import mkstemp
+from typing import Any, Callable, Iterator, List, Union
+from weakref import finalize
+
+from swissdta.records.record import DTARecord
+
+
+def _remove_database(connection: sqlite3.Connection, path: str) -> None:
+    connection.close()
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class SpillingRecordStore(object):
+    """List-like record store which spills its records to disk.
+
+    Records are kept in memory until more than ``spill_threshold``
+    records have been added. At that point, all the records are moved
+    to a temporary SQLite database and only their order is kept in
+    memory. Each record is stored with its field values and its
+    validation warnings and errors, such that sorting, validation
+    and the computation of the total keep working as usual.
+
+    Note: Once spilled, the records read from the store are copies.
+    Changes made to the records while iterating over the store are
+    written back automatically. However, a record obtained by index
+    must be explicitly stored back (``store[index] = record``).
+
+    The temporary database is removed when the store is closed
+    or garbage collected.
+    """
+
+    def __init__(self, spill_threshold: int = 10_000, directory: str = None):
+        """Instantiate an empty record store.
+
+        Args:
+            spill_threshold: Number of records to keep in memory
+                before spilling all the records to disk.
+            directory: Directory in which to create the temporary
+                database (default: the system's temporary directory).
+
+        Raises:
+            ValueError: When ``spill_threshold`` is negative.
+        """
+        if spill_threshold < 0:
+            raise ValueError(f'Invalid spill threshold: must be positive (got: {spill_threshold})')
+        self.spill_threshold = spill_threshold
+        self.directory = directory
+        self._records: List[DTARecord] = []
+        self._order = array('q')
+        self._connection: sqlite3.Connection = None
+        self._finalizer: finalize = None
+
+    @property
+    def spilled(self) -> bool:
+        """Whether the records have been spilled to disk or not."""
+        return self._connection is not None
+
+    def __len__(self) -> int:
+        return len(self._order) if self.spilled else len(self._records)
+
+    def __iter__(self) -> Iterator[DTARecord]:
+        return self._iter(write_back=True)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[DTARecord, List[DTARecord]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if not self.spilled:
+            return self._records[index]
+        return self._load(self._order[index])[1]
+
+    def __setitem__(self, index: int, record: DTARecord) -> None:
+        if not self.spilled:
+            self._records[index] = record
+        else:
+            self._update(self._order[index], record)
+
+    def append(self, record: DTARecord) -> None:
+        """Add a record at the end of the store.
+
+        Args:
+            record: The record to add.
+        """
+        if self.spilled:
+            self._order.append(self._insert(record))
+            return
+
+        self._records.append(record)
+        if len(self._records) > self.spill_threshold:
+            self._spill()
+
+    def sort(self, key: Callable[[DTARecord], Any], reverse: bool = False) -> None:
+        """Stable sort of the records in place.
+
+        Once spilled, only the keys are held in memory to sort the records.
+
+        Args:
+            key: Function computing the sort key of a record.
+            reverse: Whether to sort in descending order or not.
+        """
+        if not self.spilled:
+            self._records.sort(key=key, reverse=reverse)
+            return
+
+        keys = [key(record) for record in self._iter(write_back=False)]
+        positions = sorted(range(len(keys)), key=keys.__getitem__, reverse=reverse)
+        self._order = array('q', (self._order[position] for position in positions))
+
+    def clear(self) -> None:
+        """Remove all the records and the temporary database, the store can be used again."""
+        self.close()
+
+    def close(self) -> None:
+        """Remove all the records and the temporary database."""
+        if self._finalizer is not None:
+            self._finalizer()
+        self._records = []
+        self._order = array('q')
+        self._connection = None
+        self._finalizer = None
+
+    def _iter(self, write_back: bool) -> Iterator[DTARecord]:
+        if not self.spilled:
+            yield from self._records
+            return
+
+        for record_id in self._order:
+            state, record = self._load(record_id)
+            try:
+                yield record
+            finally:
+                if write_back:
+                    self._update(record_id, record, previous_state=state)
+
+    def _spill(self) -> None:
+        descriptor, path = mkstemp(prefix='swissdta-', suffix='.sqlite', dir=self.directory)
+        os.close(descriptor)
+        self._connection = sqlite3.connect(path)
+        self._finalizer = finalize(self, _remove_database, self._connection, path)
+        self._connection.execute('PRAGMA journal_mode = OFF')
+        self._connection.execute('PRAGMA synchronous = OFF')
+        self._connection.execute('CREATE TABLE records (id INTEGER PRIMARY KEY, state BLOB NOT NULL)')
+        for record in self._records:
+            self._order.append(self._insert(record))
+        self._records = []
+
+    def _insert(self, record: DTARecord) -> int:
+        return self._connection.execute('INSERT INTO records (state) VALUES (?)',
+                                        (pickle.dumps(record, pickle.HIGHEST_PROTOCOL),)).lastrowid
+
+    def _load(self, record_id: int):
+        state, = self._connection.execute('SELECT state FROM records WHERE id = ?', (record_id,)).fetchone()
+        return state, pickle.loads(state)
+
+    def _update(self, record_id: int, record: DTARecord, previous_state: bytes = None) -> None:
+        state = pickle.dumps(record, pickle.HIGHEST_PROTOCOL)
+        if state != previous_state:  # avoid useless writes for records which were only read
+            self._connection.execute('UPDATE records SET state = ? WHERE id = ?', (state, record_id))
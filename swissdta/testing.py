@@ -0,0 +1,217 @@
+"""Synthetic payments for load tests and benchmarks.
+
+``generate_payments`` streams realistic payments which can be added to
+a ``DTAFile`` as is (``dta_file.add_836_record(**payment)``): Swiss and
+foreign recipients with valid IBANs (check digits included) and BICs,
+names and addresses with umlauts and accents converted by the
+alphanumeric fields (see ``CONVERTED_CHARACTERS``), structured and
+unstructured purposes, and a configurable share of invalid payments.
+
+The payments only depend on the arguments: the same seed always
+generates the same payments. All the random choices are drawn from
+tables prepared once and indexed with a random float (much cheaper
+than ``random.choice``), such that generating the payments is much
+faster than adding them to a file.
+"""
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterator, Tuple
+
+from swissdta.constants import ChargesRule, IdentificationBankAddress, IdentificationPurpose
+
+# The account of the default ordering party, its IID (8888) is the client clearing of the file
+CLIENT_ACCOUNT = 'CH38 0888 8123 4567 8901 2'
+CLIENT_ADDRESS = ('Muster AG', 'Bahnhofstrasse 1', '8001 Zürich')
+
+_FIRST_NAMES = ('Jürg', 'Hélène', 'Björn', 'Zoë', 'François', 'Käthi', 'Ruedi', 'Anaïs', 'Urs', 'Gisèle', 'Jörg',
+                'Céline', 'Mathias', 'Léa', 'Dölf', 'Noémie', 'Beat', 'Andrea', 'René', 'Bettina')
+_LAST_NAMES = ('Müller', 'Schärer', 'Bühler', 'Gächter', 'Nägeli', 'Dubois', 'Fässler', 'Keller', 'Lüthi', 'Mégroz',
+               'Côté', 'Schürch', 'Brändli', 'Rossi', 'Zürcher', 'Fröhlich', 'Egli', 'Bärtschi', 'Piccard', 'Weiß')
+_STREETS = ('Bahnhofstrasse', 'Rue du Rhône', 'Hauptstrasse', 'Dorfstrasse', 'Via San Gottardo', 'Zürcherstrasse',
+            'Chemin des Étangs', 'Gäbelbachstrasse', 'Rue de Genève', 'Seestrasse', 'Avenue de la Gare',
+            'Schlossgasse', 'Münsterplatz', 'Rämistrasse', 'Grand-Rue', 'Lindenhofstraße')
+_SWISS_CITIES = ('8001 Zürich', '1204 Genève', '3011 Bern', '4051 Basel', '6900 Lugano', '9000 St. Gallen',
+                 '1003 Lausanne', '8400 Winterthur', '2502 Biel/Bienne', '3920 Zermatt', '2000 Neuchâtel',
+                 '2800 Delémont', '4142 Münchenstein', '6403 Küssnacht', '8708 Männedorf', '1226 Thônex')
+_PURPOSES = ('Rechnung Nr.', 'Facture n°', 'Fattura', 'Invoice', 'Gebühren', 'Prämie', 'Rückerstattung', 'Loyer')
+
+# Recipient banks: (country, bank code, account digits, BIC, city), Swiss payments do not need a BIC or city
+_SWISS_BANKS = tuple(('CH', clearing, 12, None, None)
+                     for clearing in ('00230', '00700', '00762', '04835', '09000', '08390', '00788', '06300'))
+_FOREIGN_BANKS = (
+    ('DE', '50070010', 10, 'DEUTDEFFXXX', '60311 Frankfurt am Main'),
+    ('DE', '37040044', 10, 'COBADEFFXXX', '50667 Köln'),
+    ('DE', '70150000', 10, 'SSKMDEMMXXX', '80331 München'),
+    ('AT', '12000', 11, 'BKAUATWWXXX', '1010 Wien'),
+    ('FR', '30004', 11, 'BNPAFRPPXXX', '75009 Paris'),
+    ('NL', 'ABNA', 10, 'ABNANL2AXXX', '1082 Amsterdam'),
+)
+# Numeric values of the letters in IBANs (A = 10, ..., Z = 35)
+_LETTERS = {chr(code): str(code - 55) for code in range(ord('A'), ord('Z') + 1)}
+
+
+def _numeric(value: str) -> str:
+    return ''.join(_LETTERS.get(character, character) for character in value)
+
+
+def _iban_factory(country: str, bank_code: str, account_digits: int) -> Callable[[random.Random], str]:
+    numeric_bank_code = _numeric(bank_code)
+    numeric_country = f'{_numeric(country)}00'
+    account_range = 10 ** account_digits  # at most 12 digits, within the precision of a random float
+
+    def iban(rng: random.Random) -> str:
+        account = f'{int(rng.random() * account_range):0{account_digits}}'
+        if country == 'FR':  # the French BBAN ends with the RIB key of the bank, branch (00001) and account numbers
+            account = f'00001{account}{97 - (89 * int(bank_code) + 15 + 3 * int(account)) % 97:02}'
+        check_digits = 98 - int(f'{numeric_bank_code}{account}{numeric_country}') % 97
+        return f'{country}{check_digits:02}{bank_code}{account}'
+    return iban
+
+
+def _ipi_reference(rng: random.Random) -> str:
+    """A 20 positions IPI reference, starting with its 2 check digits (ISO 7064 MOD 97-10)."""
+    reference = f'{rng.getrandbits(64) % 10 ** 18:018}'
+    return f'{98 - int(f"{reference}00") % 97:02}{reference}'
+
+
+def _invalid_recipient_iban(payment: Dict[str, Any], _: random.Random) -> None:
+    iban = payment['recipient_iban']
+    payment['recipient_iban'] = f'{iban[:2]}{(int(iban[2:4]) + 1) % 100:02}{iban[4:]}'
+
+
+def _negative_amount(payment: Dict[str, Any], _: random.Random) -> None:
+    payment['amount'] = -payment['amount']
+
+
+def _expired_value_date(payment: Dict[str, Any], _: random.Random) -> None:
+    payment['processing_date'] -= timedelta(days=45)
+
+
+def _too_many_decimal_places(payment: Dict[str, Any], rng: random.Random) -> None:
+    payment['currency'] = 'CHF'
+    payment['amount'] += Decimal(int(rng.random() * 9) + 1).scaleb(-3)
+
+
+def _unencodable_name(payment: Dict[str, Any], _: random.Random) -> None:
+    payment['recipient_name'] = f"Łukasz {payment['recipient_name'].split(maxsplit=1)[-1]}"
+
+
+def _missing_client_address(payment: Dict[str, Any], _: random.Random) -> None:
+    payment['client_address'] = ('', '', '')
+
+
+# Each invalid payment has a single error
+_INVALIDATIONS: Tuple[Callable[[Dict[str, Any], random.Random], None], ...] = (
+    _invalid_recipient_iban, _negative_amount, _expired_value_date, _too_many_decimal_places, _unencodable_name,
+    _missing_client_address
+)
+
+
+def generate_payments(count: int,  # pylint: disable=too-many-arguments,too-many-locals
+                      seed: int = 0,
+                      invalid_rate: float = 0.0,
+                      foreign_rate: float = 0.2,
+                      structured_rate: float = 0.3,
+                      client_account: str = CLIENT_ACCOUNT,
+                      client_address: Tuple[str, str, str] = CLIENT_ADDRESS,
+                      processing_date: date = None) -> Iterator[Dict[str, Any]]:
+    """Generate synthetic payments.
+
+    Payments in CHF are sent to Swiss IBANs, foreign payments are sent
+    in EUR to European IBANs with the BIC of the bank. The references
+    are numbered from 1 to ``count`` and the value dates are spread over
+    the 30 days following the processing date. The amounts range from
+    1.00 to 100'000.00.
+
+    Invalid payments have a single error among: an IBAN with wrong check
+    digits, a negative amount, an expired value date, too many decimal
+    places, a name which cannot be encoded in latin-1 or a missing
+    client address.
+
+    Args:
+        count: The number of payments.
+        seed: The seed of the payments.
+        invalid_rate: The share of invalid payments.
+        foreign_rate: The share of foreign payments.
+        structured_rate: The share of payments with a structured purpose (IPI reference).
+        client_account: The account to debit (``None`` for the account
+            of the file's ordering party). The client clearing of the
+            file must match its IID (8888 for the default account).
+        client_address: The address of the ordering party (``None`` for
+            the address of the file's ordering party).
+        processing_date: The processing date of the first payments (default: today).
+
+    Returns: An iterator over the payments, as keyword arguments of ``DTAFile.add_836_record``.
+
+    Raises:
+        ValueError: When a rate is not between 0 and 1.
+    """
+    for rate in (invalid_rate, foreign_rate, structured_rate):
+        if not 0 <= rate <= 1:
+            raise ValueError(f'Invalid rate: must be between 0 and 1 (got: {rate})')
+    return _generate_payments(count, seed, invalid_rate, foreign_rate, structured_rate, client_account, client_address,
+                              processing_date or date.today())
+
+
+def _generate_payments(count: int,  # pylint: disable=too-many-arguments,too-many-locals
+                       seed: int,
+                       invalid_rate: float,
+                       foreign_rate: float,
+                       structured_rate: float,
+                       client_account: str,
+                       client_address: Tuple[str, str, str],
+                       processing_date: date) -> Iterator[Dict[str, Any]]:
+    rng = random.Random(seed)
+    random_value = rng.random
+    # Everything which only depends on the recipient's bank, by bank
+    swiss_banks = tuple((_iban_factory(country, code, digits), 'CHF', ChargesRule.OUR,
+                         IdentificationBankAddress.BENEFICIARY_ADDRESS, ('', ''))
+                        for country, code, digits, _, _ in _SWISS_BANKS)
+    foreign_banks = tuple((_iban_factory(country, code, digits), 'EUR', ChargesRule.SHA,
+                           IdentificationBankAddress.SWIFT_ADDRESS, (bic, ''), city)
+                          for country, code, digits, bic, city in _FOREIGN_BANKS)
+    names = tuple(f'{first_name} {last_name}' for first_name in _FIRST_NAMES for last_name in _LAST_NAMES)
+    streets = tuple(f'{street} {number}' for street in _STREETS for number in range(1, 200))
+    value_dates = tuple(processing_date + timedelta(days=days) for days in range(30))
+    # Tables are indexed with ``int(random_value() * len(table))``, inlined since it is done millions of times
+    swiss_bank_count, foreign_bank_count = len(swiss_banks), len(foreign_banks)
+    name_count, street_count, city_count = len(names), len(streets), len(_SWISS_CITIES)
+    purpose_count, value_date_count = len(_PURPOSES), len(value_dates)
+
+    for number in range(1, count + 1):
+        if random_value() < foreign_rate:
+            iban, currency, charges_rules, bank_address_type, bank_address, city = foreign_banks[
+                int(random_value() * foreign_bank_count)]
+        else:
+            iban, currency, charges_rules, bank_address_type, bank_address = swiss_banks[
+                int(random_value() * swiss_bank_count)]
+            city = _SWISS_CITIES[int(random_value() * city_count)]
+        if random_value() < structured_rate:
+            identification_purpose = IdentificationPurpose.STRUCTURED
+            purpose = _ipi_reference(rng)
+        else:
+            identification_purpose = IdentificationPurpose.UNSTRUCTURED
+            purpose = (f'{_PURPOSES[int(random_value() * purpose_count)]} {int(random_value() * 900_000) + 100_000}',
+                       f'Ref. {number}', '')
+
+        payment = {
+            'reference': f'{number:011}',
+            'client_account': client_account,
+            'processing_date': value_dates[int(random_value() * value_date_count)],
+            'currency': currency,
+            # Log-uniform amounts, from 1.00 to 100'000.00
+            'amount': Decimal(f'{int(10 ** (2 + 5 * random_value()))}e-2'),
+            'client_address': client_address,
+            'recipient_iban': iban(rng),
+            'recipient_name': names[int(random_value() * name_count)],
+            'recipient_address': (streets[int(random_value() * street_count)], city),
+            'identification_purpose': identification_purpose,
+            'purpose': purpose,
+            'charges_rules': charges_rules,
+            'bank_address_type': bank_address_type,
+            'bank_address': bank_address,
+        }
+        if invalid_rate and random_value() < invalid_rate:
+            _INVALIDATIONS[int(random_value() * len(_INVALIDATIONS))](payment, rng)
+        yield payment
@@ -1,8 +1,74 @@
 """Collection of utility functions"""
+from datetime import date, datetime
+from decimal import Decimal
+from functools import lru_cache
+from importlib import import_module
 from string import whitespace
-from typing import Union
+from types import MappingProxyType, ModuleType
+from typing import TYPE_CHECKING, Mapping, NamedTuple, Union
 
-from schwifty import IBAN
+from swissdta.constants import DATE_FORMAT, FOREIGN_MAX_DECIMAL_PLACES, MAX_DECIMAL_PLACES
+
+if TYPE_CHECKING:  # pragma: no cover
+    from schwifty import IBAN  # pylint: disable=unused-import
+
+
+@lru_cache(maxsize=None)
+def lazy_import(name: str) -> ModuleType:
+    """Import a module on first use.
+
+    Heavy dependencies (``schwifty`` and ``iso4217``) are
+    imported through this function instead of at the module
+    level to keep the import of the package fast.
+
+    Args:
+        name: The absolute name of the module to import.
+
+    Returns: The imported module.
+    """
+    return import_module(name)
+
+
+class CurrencyInfo(NamedTuple):
+    """Details of an ISO 4217 currency.
+
+    Attributes:
+        exponent: The number of digits of the minor unit
+            (``None`` for currencies without minor unit, e.g. gold).
+        max_decimal_places: The maximum number of decimal
+            places permitted by DTA for an amount in the currency.
+    """
+    exponent: Union[int, None]
+    max_decimal_places: int
+
+
+@lru_cache(maxsize=None)
+def currency_table() -> Mapping[str, CurrencyInfo]:
+    """Return the (read-only) table of the valid ISO 4217 currency codes.
+
+    The table is computed once, on first use.
+
+    Returns: A mapping of the currency codes to their details.
+    """
+    return MappingProxyType({
+        currency.code: CurrencyInfo(
+            exponent=currency.exponent,
+            max_decimal_places=MAX_DECIMAL_PLACES.get(currency.code, FOREIGN_MAX_DECIMAL_PLACES)
+        )
+        for currency in lazy_import('iso4217').Currency
+    })
+
+
+def warmup() -> None:
+    """Import and initialize the heavy dependencies upfront.
+
+    Long running services can call this function once at startup
+    to avoid paying the cost on the first validated record.
+    """
+    schwifty = lazy_import('schwifty')
+    schwifty.IBAN('CH9300762011623852957').validate()
+    schwifty.BIC('UBSWCHZH80A').validate()
+    currency_table()
 
 
 def remove_whitespace(text: str, whitespace_chars: str = whitespace) -> str:
@@ -20,7 +86,7 @@ def remove_whitespace(text: str, whitespace_chars: str = whitespace) -> str:
     return text
 
 
-def is_swiss_iban(iban: Union[IBAN, str]) -> bool:
+def is_swiss_iban(iban: Union['IBAN', str]) -> bool:
     """Check if an IBAN is Swiss or not.
 
     Args:
@@ -29,3 +95,37 @@ def is_swiss_iban(iban: Union[IBAN, str]) -> bool:
     Returns: ``True`` if the IBAN is swiss, ``False`` otherwise.
     """
     return iban.country_code in ('CH', 'LI') if hasattr(iban, 'country_code') else iban.startswith(('CH', 'LI'))
+
+
+def parse_amount(value: Union[str, bytes]) -> Decimal:
+    """Parse an amount as written in a DTA file (e.g. ``'10,50   '``).
+
+    Args:
+        value: The formatted amount, with a comma as decimal separator.
+
+    Returns: The amount.
+
+    Raises:
+        ArithmeticError: When the value is not a valid amount.
+    """
+    if isinstance(value, bytes):
+        value = value.decode('latin-1')
+    return Decimal(value.strip().replace(',', '.'))
+
+
+def parse_date(value: Union[str, bytes]) -> Union[date, None]:
+    """Parse a date as written in a DTA file (``YYMMDD``).
+
+    Args:
+        value: The formatted date.
+
+    Returns: The date, ``None`` for the null date (``000000``).
+
+    Raises:
+        ValueError: When the value is not a valid date.
+    """
+    if isinstance(value, bytes):
+        value = value.decode('latin-1')
+    if value == '000000':
+        return None
+    return datetime.strptime(value, DATE_FORMAT).date()
@@ -0,0 +1,163 @@
+"""Structural verification of generated DTA files.
+
+``verify`` is a cheap self-check of a generated file, meant to be run
+on every file before it is sent to the bank. Each line is matched
+against a pattern compiled once per segment type from the layout (see
+``swissdta.layout``), which checks the line length, the segment number,
+the transaction type and the format of the fixed format fields. The
+records must be numbered consecutively and the amount of the TA 890
+record must be the sum of the amounts of the TA 836 records.
+
+The file is read in large blocks and the five segments of a TA 836
+record are matched at once, without building records or decoding
+fields. The line separators of each block are counted beforehand, such
+that the free text fields are matched by skipping their characters.
+Use ``DTAFile.validate`` to validate the content of the records.
+"""
+import os
+import re
+from decimal import Decimal
+from typing import BinaryIO, Dict, Iterable, List, Pattern, Sequence, Tuple, Union
+
+from swissdta.layout import (HEADER_FIELDS, LINE_LENGTH, LINE_SEPARATOR, LINE_SIZE, RECORD_836_LINES, RECORD_836_SIZE,
+                             RECORD_890_SIZE, SEGMENTS_836, SEGMENTS_890, SPANS_836, SPANS_890)
+from swissdta.util import parse_amount
+
+# Allowed characters of the fixed format fields, other fields accept any character except line separators
+_ANY_CHARACTER = r'[^\r\n]'
+_ANY_CHARACTER_PATTERN = _ANY_CHARACTER.encode('latin-1')
+_FIELD_CHARACTERS: Dict[str, str] = {
+    'processing_date': '[0-9]',
+    'creation_date': '[0-9]',
+    'sequence_nr': '[0-9]',
+    'payment_type': '[01]',
+    'value_date': '[0-9]',
+    'currency': '[A-Z]',
+    'conversion_rate': '[0-9, ]',
+    'bank_address_type': '[AD]',
+    'identification_purpose': '[IU]',
+    'charges_rules': '[012]',
+}
+# Amounts are left aligned, the width of the field is fixed by the other fields of the line
+_AMOUNT = '[0-9]*,[0-9]* *'
+
+
+def _fields_pattern(fields: Sequence[Tuple[str, int]], constant: str, transaction_type: str) -> str:
+    patterns = []
+    for name, length in fields:
+        if name is None:
+            patterns.append(constant * length)
+        elif name == 'transaction_type':
+            patterns.append(transaction_type)
+        elif name == 'amount':
+            patterns.append(_AMOUNT)
+        else:
+            patterns.append(f'{_FIELD_CHARACTERS.get(name, _ANY_CHARACTER)}{{{length}}}')
+    return ''.join(patterns)
+
+
+def _segment_patterns(segments: Sequence[Sequence[Tuple[str, int]]], transaction_type: str) -> Tuple[str, ...]:
+    header_length = len(HEADER_FIELDS)
+    return (
+        f'01{_fields_pattern(HEADER_FIELDS, "0", transaction_type)}'
+        f'{_fields_pattern(segments[0][header_length:], " ", transaction_type)}',
+        *(f'{number:02}{_fields_pattern(fields, " ", transaction_type)}'
+          for number, fields in enumerate(segments[1:], start=2))
+    )
+
+
+_SEPARATOR = re.escape(LINE_SEPARATOR.decode('latin-1'))
+_SEGMENTS_836: Tuple[Pattern[bytes], ...] = tuple(re.compile(f'{pattern}{_SEPARATOR}'.encode('latin-1'))
+                                                  for pattern in _segment_patterns(SEGMENTS_836, '836'))
+# Matching any character is much faster, the line separators are counted separately
+_RECORD_836: Pattern[bytes] = re.compile(
+    b''.join(pattern.pattern for pattern in _SEGMENTS_836).replace(_ANY_CHARACTER_PATTERN, b'.'), re.DOTALL
+)
+# The separator of the last line is optional
+_RECORD_890: Pattern[bytes] = re.compile(
+    f'{_segment_patterns(SEGMENTS_890, "890")[0]}(?:{_SEPARATOR})?'.encode('latin-1')
+)
+
+
+def verify(source: Union[bytes, str, BinaryIO], buffer_records: int = 1024) -> int:
+    """Verify the structure of a generated DTA file.
+
+    Args:
+        source: The content of the DTA file (as returned by
+            ``DTAFile.generate``), its path or a binary stream.
+        buffer_records: The number of records read at once from a file or stream.
+
+    Returns: The number of TA 836 records of the file.
+
+    Raises:
+        ValueError: When the file is not a well formed DTA file of TA 836 records
+            followed by a TA 890 total record.
+    """
+    block_size = buffer_records * RECORD_836_SIZE
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return _verify((bytes(source),))
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb', buffering=0) as stream:
+            return _verify(iter(lambda: stream.read(block_size), b''))
+    return _verify(iter(lambda: source.read(block_size), b''))
+
+
+def _verify(blocks: Iterable[bytes]) -> int:
+    amounts = []
+    record_count = 0
+    tail = b''
+    for block in blocks:
+        data = tail + block if tail else block
+        end = len(data) - len(data) % RECORD_836_SIZE
+        line_count = end // RECORD_836_SIZE * RECORD_836_LINES
+        if data.count(b'\r', 0, end) != line_count or data.count(b'\n', 0, end) != line_count:
+            raise ValueError(f'Invalid DTA file: {_find_mismatch(data, end, record_count)}.')
+        record_count = _verify_records(data, end, record_count, amounts)
+        tail = bytes(data[end:])
+
+    # The remaining bytes are the total record (shorter than a TA 836 record)
+    if len(tail) not in (LINE_LENGTH, RECORD_890_SIZE) or _RECORD_890.fullmatch(tail) is None:
+        raise ValueError('Invalid DTA file: the file does not end with a TA 890 record.')
+    if tail[SPANS_890['sequence_nr']] != b'%05d' % (record_count + 1):
+        raise ValueError(f'Invalid DTA file: records are not numbered consecutively (record {record_count + 1}).')
+
+    # Decode all the amounts at once, amounts never contain spaces
+    total_amount = sum(map(Decimal, b' '.join(amounts).decode('latin-1').replace(',', '.').split()), Decimal(0))
+    control_total = parse_amount(tail[SPANS_890['amount']])
+    if total_amount != control_total:
+        raise ValueError(f'Invalid DTA file: the total amount of the TA 890 record ({control_total}) does not match'
+                         f' the sum of the amounts ({total_amount}).')
+    return record_count
+
+
+def _verify_records(data: bytes, end: int, record_count: int, amounts: List[bytes]) -> int:
+    sequence_nr = SPANS_836['sequence_nr']
+    sequence_start, sequence_stop = sequence_nr.start, sequence_nr.stop
+    amount_start, amount_stop = SPANS_836['amount'].start, SPANS_836['amount'].stop
+    match_record = _RECORD_836.match
+    for offset in range(0, end, RECORD_836_SIZE):
+        record_count += 1
+        if match_record(data, offset) is None:
+            raise ValueError(f'Invalid DTA file: {_mismatch(data, offset, record_count)}.')
+        if data[offset + sequence_start:offset + sequence_stop] != b'%05d' % record_count:
+            raise ValueError(f'Invalid DTA file: records are not numbered consecutively (record {record_count}).')
+        amounts.append(data[offset + amount_start:offset + amount_stop])
+    return record_count
+
+
+def _find_mismatch(data: bytes, end: int, record_count: int) -> str:
+    for record_number, offset in enumerate(range(0, end, RECORD_836_SIZE), start=record_count + 1):
+        if any(pattern.match(data, offset + index * LINE_SIZE) is None for index, pattern in enumerate(_SEGMENTS_836)):
+            return _mismatch(data, offset, record_number)
+    raise AssertionError('No mismatching record')  # pragma: no cover
+
+
+def _mismatch(data: bytes, offset: int, record_number: int) -> str:
+    for index, pattern in enumerate(_SEGMENTS_836):
+        line_offset = offset + index * LINE_SIZE
+        if pattern.match(data, line_offset) is None:
+            line = f'line {(record_number - 1) * RECORD_836_LINES + index + 1}'
+            if data[line_offset + LINE_LENGTH:line_offset + LINE_SIZE] != LINE_SEPARATOR:
+                return f'{line} is not {LINE_LENGTH} characters long'
+            return f'{line} is not a valid segment {index + 1:02} of a TA 836 record (record {record_number})'
+    raise AssertionError('No mismatching segment')  # pragma: no cover
@@ -0,0 +1,345 @@
+"""Read-only views over generated DTA files.
+
+Since all the lines of a DTA file have the same length, the position of
+every record can be computed from its sequence number. A ``DTAFileView``
+maps a file in memory and reads the records directly at their offsets,
+without parsing the whole file.
+
+Records are exposed as lazy views holding a ``memoryview`` of their
+bytes. Each field is only decoded when it is accessed, such that
+scanning large files for a few fields does not decode all the others.
+"""
+import mmap
+from typing import Dict, Iterator, List, Mapping, Tuple, Union
+
+from swissdta.layout import (HEADER_SPANS, LINE_LENGTH, LINE_SEPARATOR, LINE_SIZE, RECORD_836_LINES,
+                             RECORD_836_SIZE, RECORD_890_SIZE, SPANS_836, SPANS_890)
+from swissdta.util import remove_whitespace
+
+
+class FieldView(object):
+    """Descriptor decoding a field of a record view from its fixed offsets.
+
+    The span of the field is looked up by name in the ``_spans``
+    of the view class. Like the fields of the records, the value
+    is the formatted value of the field (including the padding).
+    """
+
+    def __init__(self):
+        self.name: str = None
+        self.span: slice = None
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+        self.span = owner._spans[name]  # pylint: disable=protected-access
+
+    def __get__(self, instance: 'RecordView', _) -> str:
+        if instance is None:
+            return self
+        return str(instance._buffer[self.span], 'latin-1')  # pylint: disable=protected-access
+
+    def __repr__(self) -> str:
+        return f'<{self.__class__.__name__}(span={self.span.start}:{self.span.stop}, name={self.name})>'
+
+
+class RecordView(object):
+    """Base class of the lazy views over the bytes of a record."""
+    __slots__ = ('_buffer',)
+    _spans: Mapping[str, slice] = HEADER_SPANS
+
+    def __init__(self, buffer: Union[bytes, memoryview]):
+        """Create a view over the bytes of a record.
+
+        Args:
+            buffer: The bytes of the record, starting at the
+                segment number of its first line. The bytes
+                are not copied when a ``memoryview`` is given.
+        """
+        self._buffer = memoryview(buffer)
+
+    def __bytes__(self) -> bytes:
+        return self._buffer.tobytes()
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, RecordView):
+            return type(self) is type(other) and self._buffer == other._buffer
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self._buffer.tobytes())
+
+    def __repr__(self) -> str:
+        return f'<{self.__class__.__name__}(sequence_nr={self.header.sequence_nr})>'
+
+    @property
+    def header(self) -> 'HeaderView':
+        """The view over the header of the record."""
+        return HeaderView(self._buffer)
+
+
+class HeaderView(RecordView):  # pylint: disable=too-few-public-methods
+    """Lazy view over the header of a record, see ``swissdta.records.header.DTAHeader``."""
+    __slots__ = ()
+
+    processing_date = FieldView()
+    recipient_clearing = FieldView()
+    creation_date = FieldView()
+    client_clearing = FieldView()
+    sender_id = FieldView()
+    sequence_nr = FieldView()
+    transaction_type = FieldView()
+    payment_type = FieldView()
+
+    @property
+    def header(self) -> 'HeaderView':
+        return self
+
+
+class RecordView836(RecordView):  # pylint: disable=too-many-instance-attributes
+    """Lazy view over a TA 836 record.
+
+    The view has the same attributes as ``swissdta.records.DTARecord836``
+    and returns the same (formatted) values.
+    """
+    __slots__ = ()
+    _spans = SPANS_836
+
+    reference = FieldView()
+    client_account = FieldView()
+    value_date = FieldView()
+    currency = FieldView()
+    amount = FieldView()
+
+    conversion_rate = FieldView()
+    client_address1 = FieldView()
+    client_address2 = FieldView()
+    client_address3 = FieldView()
+
+    bank_address_type = FieldView()
+    bank_address1 = FieldView()
+    bank_address2 = FieldView()
+    recipient_iban = FieldView()
+
+    recipient_name = FieldView()
+    recipient_address1 = FieldView()
+    recipient_address2 = FieldView()
+
+    identification_purpose = FieldView()
+    purpose1 = FieldView()
+    purpose2 = FieldView()
+    purpose3 = FieldView()
+    charges_rules = FieldView()
+
+    @property
+    def client_address(self) -> Tuple[str, str, str]:
+        """The 3 lines of the client address as a tuple of 3 strings."""
+        return self.client_address1, self.client_address2, self.client_address3
+
+    @property
+    def bank_address(self) -> Tuple[str, str]:
+        """The 2 lines of the bank address as a tuple of 2 strings."""
+        return self.bank_address1, self.bank_address2
+
+    @property
+    def recipient_address(self) -> Tuple[str, str]:
+        """The 2 lines of the recipient address as a tuple of 2 strings."""
+        return self.recipient_address1, self.recipient_address2
+
+    @property
+    def purpose(self) -> Tuple[str, str, str]:
+        """The 3 lines of the purpose as a tuple of 3 strings."""
+        return self.purpose1, self.purpose2, self.purpose3
+
+
+class RecordView890(RecordView):  # pylint: disable=too-few-public-methods
+    """Lazy view over a TA 890 total record, see ``swissdta.records.DTARecord890``."""
+    __slots__ = ()
+    _spans = SPANS_890
+
+    amount = FieldView()
+
+
+class DTAFileView(object):
+    """Memory-mapped view over a DTA file of TA 836 records.
+
+    The structure of the file (line lengths, segment numbers, transaction
+    types and sequence numbers) is checked once when the view is opened.
+    Records are then accessed in constant time by index or by sequence
+    number, the secondary indexes by reference and recipient IBAN are
+    only built when requested.
+
+    Records are returned as ``RecordView836`` instances sharing the
+    memory map, their fields are only decoded when accessed. The view
+    must be closed after use, preferably by using it as a context
+    manager::
+
+        with DTAFileView('payments.dta', index_references=True) as view:
+            record = view.find_reference('01234567890')
+    """
+
+    def __init__(self, path: str, index_references: bool = False, index_recipient_ibans: bool = False):
+        """Open a view over a DTA file.
+
+        Args:
+            path: The path of the DTA file.
+            index_references: Build the index to look up records by reference.
+            index_recipient_ibans: Build the index to look up records by recipient IBAN.
+
+        Raises:
+            ValueError: When the file is not a valid DTA file of TA 836 records.
+        """
+        self.path = path
+        with open(path, 'rb') as file:
+            try:
+                self._data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as err:  # empty file
+                raise ValueError(f'Invalid DTA file {path}: the file is empty.') from err
+        self._buffer = memoryview(self._data)
+        try:
+            self._record_count = self._check_structure()
+        except ValueError:
+            self.close()
+            raise
+        self._references: Dict[str, int] = None
+        self._recipient_ibans: Dict[str, List[int]] = None
+        if index_references:
+            self._build_reference_index()
+        if index_recipient_ibans:
+            self._build_recipient_iban_index()
+
+    def __enter__(self) -> 'DTAFileView':
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._record_count
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[RecordView836, List[RecordView836]]:
+        if isinstance(index, slice):
+            return [self._record(i) for i in range(*index.indices(self._record_count))]
+        if index < 0:
+            index += self._record_count
+        if not 0 <= index < self._record_count:
+            raise IndexError('record index out of range')
+        return self._record(index)
+
+    def __iter__(self) -> Iterator[RecordView836]:
+        return (self._record(index) for index in range(self._record_count))
+
+    @property
+    def total_record(self) -> RecordView890:
+        """The TA 890 total record."""
+        start = self._record_count * RECORD_836_SIZE
+        return RecordView890(self._buffer[start:start + RECORD_890_SIZE])
+
+    def close(self) -> None:
+        """Close the view and release the memory map.
+
+        If record views obtained from this view are still referenced,
+        the memory map is only released once they are garbage collected.
+        """
+        self._buffer.release()
+        try:
+            self._data.close()
+        except BufferError:  # record views still reference the memory map
+            pass
+
+    def record(self, sequence_nr: int) -> RecordView836:
+        """Get the TA 836 record with the given sequence number.
+
+        Args:
+            sequence_nr: The sequence number of the record (starting at 1).
+
+        Raises:
+            KeyError: When there is no TA 836 record with this sequence number.
+        """
+        if not 1 <= sequence_nr <= self._record_count:
+            raise KeyError(sequence_nr)
+        return self._record(sequence_nr - 1)
+
+    def find_reference(self, reference: str) -> RecordView836:
+        """Find a record by its reference.
+
+        Args:
+            reference: The reference of the record, with or without
+                the sender id (first 5 characters of the 16 characters
+                reference written in the file).
+
+        Raises:
+            KeyError: When no record has this reference.
+            RuntimeError: When the view was opened without ``index_references``.
+        """
+        if self._references is None:
+            raise RuntimeError('The view was opened without the reference index (index_references=False).')
+        return self._record(self._references[reference[-11:].rjust(11, '0')])
+
+    def find_recipient_iban(self, iban: str) -> List[RecordView836]:
+        """Find the records for a recipient IBAN.
+
+        Args:
+            iban: The IBAN of the recipient, compact or with spaces.
+
+        Returns: The records with this recipient IBAN in the order of the file (possibly none).
+
+        Raises:
+            RuntimeError: When the view was opened without ``index_recipient_ibans``.
+        """
+        if self._recipient_ibans is None:
+            raise RuntimeError('The view was opened without the IBAN index (index_recipient_ibans=False).')
+        return [self._record(index) for index in self._recipient_ibans.get(remove_whitespace(iban).upper(), ())]
+
+    def _record(self, index: int) -> RecordView836:
+        start = index * RECORD_836_SIZE
+        return RecordView836(self._buffer[start:start + RECORD_836_SIZE])
+
+    def _field_values(self, name: str) -> Iterator[str]:
+        span = SPANS_836[name]
+        return (str(self._buffer[offset + span.start:offset + span.stop], 'latin-1').strip()
+                for offset in range(0, self._record_count * RECORD_836_SIZE, RECORD_836_SIZE))
+
+    def _build_reference_index(self) -> None:
+        references = {}
+        for index, reference in enumerate(self._field_values('reference')):
+            references.setdefault(reference, index)
+        self._references = references
+
+    def _build_recipient_iban_index(self) -> None:
+        recipient_ibans = {}
+        for index, iban in enumerate(self._field_values('recipient_iban')):
+            recipient_ibans.setdefault(iban, []).append(index)
+        self._recipient_ibans = recipient_ibans
+
+    def _check_structure(self) -> int:
+        data = self._data
+        size = len(data)
+        # The separator of the last line (total record) is optional
+        record_count, remainder = divmod(size - LINE_LENGTH, RECORD_836_SIZE)
+        if remainder not in (0, len(LINE_SEPARATOR)) or size < LINE_LENGTH:
+            raise ValueError(f'Invalid DTA file {self.path}: the size ({size} bytes) does not match'
+                             f' a whole number of lines of {LINE_LENGTH} characters.')
+
+        line_count = record_count * RECORD_836_LINES + 1
+        separated_lines = line_count if remainder else line_count - 1
+        if (data[LINE_LENGTH::LINE_SIZE] != LINE_SEPARATOR[:1] * separated_lines
+                or data[LINE_LENGTH + 1::LINE_SIZE] != LINE_SEPARATOR[1:] * separated_lines):
+            raise ValueError(f'Invalid DTA file {self.path}: lines are not separated by CRLF every'
+                             f' {LINE_LENGTH} characters.')
+
+        if data[0::LINE_SIZE] != b'0' * line_count or data[1::LINE_SIZE] != b'12345' * record_count + b'1':
+            raise ValueError(f'Invalid DTA file {self.path}: segments are not numbered 01 to 05 for each record'
+                             f' followed by a total record.')
+
+        transaction_type = SPANS_836['transaction_type']
+        sequence_nr = SPANS_836['sequence_nr']
+        for index, offset in enumerate(range(0, size, RECORD_836_SIZE)):
+            expected_type = b'890' if index == record_count else b'836'
+            if data[offset + transaction_type.start:offset + transaction_type.stop] != expected_type:
+                raise ValueError(f'Invalid DTA file {self.path}: record {index + 1}'
+                                 f' is not a TA {expected_type.decode()} record.')
+            if data[offset + sequence_nr.start:offset + sequence_nr.stop] != b'%05d' % (index + 1):
+                raise ValueError(f'Invalid DTA file {self.path}: records are not numbered sequentially'
+                                 f' (record {index + 1}).')
+
+        return record_count
@@ -0,0 +1,83 @@
+"""Fixtures shared by the tests."""
+
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+
+from swissdta.constants import ChargesRule, IdentificationPurpose
+from swissdta.file import DTAFile
+
+IBANS = ('CH9300762011623852957', 'DE89370400440532013000')
+
+
+@pytest.fixture(name='make_payment')
+def fixture_make_payment():
+    """Factory of the arguments of ``DTAFile.add_836_record`` for the payment ``index``.
+
+    The reference is the index, the amount the index plus 1 and the
+    recipient IBAN alternates between a Swiss and a German IBAN. The
+    arguments are updated with the given changes.
+    """
+    def make_payment(index, **changes):
+        payment = {
+            'reference': f'{index:011}',
+            'client_account': 'CH38 0888 8123 4567 8901 2',
+            'processing_date': date.today(),
+            'currency': 'CHF',
+            'amount': Decimal(index + 1),
+            'client_address': ('Alphabet Inc', 'Brandschenkestrasse 110', '8002 Zürich'),
+            'recipient_iban': IBANS[index % 2],
+            'recipient_name': 'Herr Peter Haller',
+            'recipient_address': ('Marktplaz 4', '9400 Rorschach'),
+            'identification_purpose': IdentificationPurpose.UNSTRUCTURED,
+            'purpose': (f'Payment {index}', '', ''),
+            'charges_rules': ChargesRule.OUR,
+            'bank_address': ('DEUTDEFF', '') if index % 2 else ('', ''),
+        }
+        payment.update(changes)
+        return payment
+    return make_payment
+
+
+@pytest.fixture(name='make_dta_file')
+def fixture_make_dta_file(make_payment):
+    """Factory of DTA files with ``record_count`` payments (see ``make_payment``).
+
+    The payments are updated with the given changes, by index. The other
+    keyword arguments are passed to ``DTAFile``, the sender id is
+    ``ABC12`` and the client clearing ``8888`` by default.
+    """
+    def make_dta_file(record_count, changes=(), **options):
+        options.setdefault('sender_id', 'ABC12')
+        options.setdefault('client_clearing', '8888')
+        dta_file = DTAFile(**options)
+        for i in range(record_count):
+            dta_file.add_836_record(**make_payment(i, **(changes[i] if i < len(changes) else {})))
+        return dta_file
+    return make_dta_file
+
+
+@pytest.fixture(name='dta_content')
+def fixture_dta_content(make_dta_file):
+    """A generated DTA file of 4 Swiss payments (32.30 in total) in CHF and EUR, on 2 value dates."""
+    today = date.today()
+    payments = (
+        ('CHF', today, '10.50'),
+        ('EUR', today, '20'),
+        ('CHF', today + timedelta(days=1), '1.25'),
+        ('CHF', today, '0.55'),
+    )
+    return make_dta_file(4, [
+        {'currency': currency, 'processing_date': value_date, 'amount': Decimal(amount),
+         'recipient_iban': IBANS[0], 'bank_address': ('', ''), 'purpose': ('Scanner Test', '', '')}
+        for currency, value_date, amount in payments
+    ]).generate()
+
+
+@pytest.fixture(name='dta_path')
+def fixture_dta_path(make_dta_file, tmpdir):
+    """The path of a generated DTA file of 7 payments (28 in total)."""
+    path = tmpdir / 'payments.dta'
+    path.write_binary(make_dta_file(7).generate())
+    return str(path)
@@ -0,0 +1,59 @@
+"""Tests for the archive of DTA files."""
+
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+
+from swissdta.archive import ArchivedPayment, DTAArchive
+
+
+@pytest.fixture(name='archive')
+def fixture_archive(tmpdir):
+    with DTAArchive(str(tmpdir / 'archive')) as archive:
+        yield archive
+
+
+def test_add(archive, dta_content):
+    file_id = archive.add(dta_content)
+    assert file_id in archive
+    assert archive.add(dta_content) == file_id
+    assert len(archive) == 1
+    with open(archive.path(file_id), 'rb') as file:
+        assert file.read() == dta_content
+    assert len(archive.search(file_id=file_id)) == 4
+
+
+def test_search(archive, dta_content):
+    today = date.today()
+    file_id = archive.add(dta_content)
+
+    assert archive.search(reference='ABC1200000000001') == [
+        ArchivedPayment(file_id, 2, 'ABC1200000000001', 'CH9300762011623852957', today, 'EUR', Decimal(20))
+    ]
+    assert [payment.sequence_nr for payment in archive.search(reference='3')] == [4]
+    assert len(archive.search(recipient_iban='CH93 0076 2011 6238 5295 7')) == 4
+    assert len(archive.search(recipient_iban='CH93 0076 2011 6238 5295 7', value_date=today)) == 3
+    assert len(archive.search(value_date=today + timedelta(days=1))) == 1
+    assert [payment.amount for payment in archive.search(currency='chf')] == [Decimal('10.5'), Decimal('1.25'),
+                                                                              Decimal('0.55')]
+    assert [payment.amount for payment in archive.search(min_amount=Decimal('1'), max_amount='10.50')] == [
+        Decimal('10.5'), Decimal('1.25')
+    ]
+    assert len(archive.search(limit=2)) == 2
+    assert archive.search(reference='XYZ9900000000001') == []
+
+
+def test_persistence(dta_content, tmpdir):
+    with DTAArchive(str(tmpdir / 'archive')) as archive:
+        file_id = archive.add(dta_content)
+    with DTAArchive(str(tmpdir / 'archive')) as archive:
+        assert file_id in archive
+        assert len(archive.search()) == 4
+
+
+def test_invalid_file(archive, dta_content):
+    with pytest.raises(ValueError):
+        archive.add(dta_content[130:])
+    assert len(archive) == 0
+    assert archive.search() == []
@@ -0,0 +1,119 @@
+"""Tests for the command line interface."""
+
+import csv
+import json
+from datetime import date
+
+import pytest
+
+from swissdta import cli
+from swissdta.file import DTAFile
+
+CSV_HEADER = ('reference', 'client_account', 'processing_date', 'currency', 'amount',
+              'client_address1', 'client_address2', 'client_address3', 'recipient_iban', 'recipient_name',
+              'recipient_address1', 'recipient_address2', 'purpose1', 'charges_rules')
+FILE_ARGUMENTS = ['--sender-id', 'ABC12', '--client-clearing', '8888', '--creation-date', f'{date.today()}']
+
+
+def _row(reference, amount='10.00'):
+    return (reference, 'CH38 0888 8123 4567 8901 2', f'{date.today():%Y-%m-%d}', 'CHF', amount,
+            'Alphabet Inc', 'Brandschenkestrasse 110', '8002 Zürich', 'CH9300762011623852957',
+            'Herr Peter Haller', 'Marktplaz 4', '9400 Rorschach', 'CLI Test', 'OUR')
+
+
+def _write_csv(path, rows):
+    with open(str(path), 'w', newline='', encoding='utf-8') as stream:
+        writer = csv.writer(stream)
+        writer.writerow(CSV_HEADER)
+        writer.writerows(rows)
+
+
+def _read_lines(path):
+    with open(str(path), 'rb') as stream:
+        return stream.read().decode('latin-1').splitlines()
+
+
+def test_csv(tmpdir):
+    """Verify that a CSV export is converted into a DTA file."""
+    _write_csv(tmpdir / 'payments.csv', [_row(f'{i:011}') for i in range(3)])
+    output = tmpdir / 'payments.dta'
+
+    assert cli.main([str(tmpdir / 'payments.csv'), '-o', str(output)] + FILE_ARGUMENTS) == 0
+    lines = _read_lines(output)
+    assert len(lines) == 3 * 5 + 1
+    assert all(len(line) == 128 for line in lines)
+    assert lines[-1][48:51] == '890'
+    assert lines[-1][53:69].strip() == '30,00'
+
+
+def test_jsonl(tmpdir):
+    """Verify that JSON Lines are converted into the same file as the equivalent CSV."""
+    rows = [_row(f'{i:011}', amount) for i, amount in enumerate(('1.5', '20.25'))]
+    _write_csv(tmpdir / 'payments.csv', rows)
+    with open(str(tmpdir / 'payments.jsonl'), 'w', encoding='utf-8') as stream:
+        for row in rows:
+            payment = dict(zip(CSV_HEADER, row))
+            payment['amount'] = float(payment['amount'])
+            payment['client_address'] = [payment.pop(f'client_address{i}') for i in range(1, 4)]
+            stream.write(json.dumps(payment) + '\n')
+
+    assert cli.main([str(tmpdir / 'payments.csv'), '-o', str(tmpdir / 'csv.dta')] + FILE_ARGUMENTS) == 0
+    assert cli.main([str(tmpdir / 'payments.jsonl'), '-o', str(tmpdir / 'jsonl.dta')] + FILE_ARGUMENTS) == 0
+    assert _read_lines(tmpdir / 'csv.dta') == _read_lines(tmpdir / 'jsonl.dta')
+
+
+def test_error_report(tmpdir):
+    """Verify that rejected payments are listed in the error report."""
+    _write_csv(tmpdir / 'payments.csv', [_row('00000000001'), _row('00000000002', 'abc'), _row('00000000003', '-1')])
+    output = tmpdir / 'payments.dta'
+    report = tmpdir / 'errors.csv'
+
+    assert cli.main([str(tmpdir / 'payments.csv'), '-o', str(output), '--error-report', str(report)]
+                    + FILE_ARGUMENTS) == 1
+    assert len(_read_lines(output)) == 5 + 1
+    with open(str(report), newline='', encoding='utf-8') as stream:
+        entries = list(csv.DictReader(stream))
+    assert [(entry['row'], entry['code']) for entry in entries] == [
+        (f"{tmpdir / 'payments.csv'}:3", 'INVALID_ROW'),
+        ('', 'NEGATIVE_AMOUNT')
+    ]
+    assert entries[1]['reference'] == '00000000003'
+
+
+@pytest.mark.parametrize('workers', (1, 2))
+def test_split(workers, tmpdir, monkeypatch):
+    """Verify that the payments are split in multiple files of at most ``MAX_RECORDS`` records."""
+    monkeypatch.setattr(DTAFile, 'MAX_RECORDS', 2)
+    _write_csv(tmpdir / 'payments.csv', [_row(f'{i:011}') for i in range(5)])
+    output = tmpdir / 'payments.dta'
+
+    assert cli.main([str(tmpdir / 'payments.csv'), '-o', str(output), '--split', '--chunk-size', '1',
+                     '--workers', f'{workers}'] + FILE_ARGUMENTS) == 0
+    assert [len(_read_lines(tmpdir / f'payments.00{i}.dta')) for i in range(1, 4)] == [11, 11, 6]
+    assert not output.exists()
+
+
+def test_too_many_records(tmpdir, monkeypatch):
+    """Verify that no file is written if there are too many payments without splitting."""
+    monkeypatch.setattr(DTAFile, 'MAX_RECORDS', 2)
+    _write_csv(tmpdir / 'payments.csv', [_row(f'{i:011}') for i in range(3)])
+
+    (tmpdir / 'payments.txt').write('')  # never read, its format is unknown
+
+    assert cli.main([str(tmpdir / 'payments.csv'), str(tmpdir / 'payments.txt'), '-o', str(tmpdir / 'payments.dta'),
+                     '--chunk-size', '1'] + FILE_ARGUMENTS) == 1
+    assert not (tmpdir / 'payments.dta').exists()
+
+
+def test_no_valid_records(tmpdir):
+    """Verify that no file is created without valid payments."""
+    _write_csv(tmpdir / 'payments.csv', [_row('00000000001', 'abc'), _row('00000000002', '-1')])
+    output = tmpdir / 'payments.dta'
+
+    assert cli.main([str(tmpdir / 'payments.csv'), '-o', str(output)] + FILE_ARGUMENTS) == 1
+    assert not output.exists()
+
+
+def test_unknown_format(tmpdir):
+    (tmpdir / 'payments.txt').write('')
+    assert cli.main([str(tmpdir / 'payments.txt'), '-o', str(tmpdir / 'payments.dta')] + FILE_ARGUMENTS) == 2
@@ -0,0 +1,77 @@
+"""Tests for the differences between DTA files."""
+
+import io
+from decimal import Decimal
+
+import pytest
+
+from swissdta import diff as diff_module
+from swissdta.diff import FieldChange, diff
+
+
+# The fields of the payments of make_dta_file depending on their index are the same in both files
+SAME_FIELDS = {'recipient_iban': 'CH9300762011623852957', 'bank_address': ('', ''), 'purpose': ('Diff Test', '', '')}
+
+
+@pytest.fixture(name='old_content')
+def fixture_old_content(make_dta_file):
+    """The content of the old DTA file, of payments 1 to 3."""
+    return make_dta_file(3, [
+        dict(SAME_FIELDS, reference='00000000001', amount=Decimal(10), recipient_name='Peter Haller'),
+        dict(SAME_FIELDS, reference='00000000002', amount=Decimal(20), recipient_name='Anna Muster'),
+        dict(SAME_FIELDS, reference='00000000003', amount=Decimal(30), recipient_name='Hans Meier'),
+    ]).generate()
+
+
+@pytest.fixture(name='new_content')
+def fixture_new_content(make_dta_file):
+    """The content of the new DTA file: payment 1 is removed, 4 is added and 3 is changed.
+
+    Payment 2 is unchanged but gets a different sequence number.
+    """
+    return make_dta_file(3, [
+        dict(SAME_FIELDS, reference='00000000002', amount=Decimal(20), recipient_name='Anna Muster'),
+        dict(SAME_FIELDS, reference='00000000003', amount=Decimal(35), recipient_name='Hans Meyer'),
+        dict(SAME_FIELDS, reference='00000000004', amount=Decimal(40), recipient_name='Eva Keller'),
+    ]).generate()
+
+
+@pytest.mark.parametrize('seekable', (True, False))
+def test_diff(seekable, old_content, new_content):
+    old = io.BytesIO(old_content)
+    if not seekable:
+        old.seekable = lambda: False
+    file_diff = diff(old, io.BytesIO(new_content))
+
+    assert file_diff
+    assert file_diff.removed == ['ABC1200000000001']
+    assert file_diff.added == ['ABC1200000000004']
+    assert len(file_diff.changed) == 1
+    assert file_diff.changed[0].reference == 'ABC1200000000003'
+    assert file_diff.changed[0].changes == [
+        FieldChange('amount', '30,'.ljust(15), '35,'.ljust(15)),
+        FieldChange('recipient_name', 'Hans Meier'.ljust(35), 'Hans Meyer'.ljust(35)),
+    ]
+
+
+def test_identical(old_content):
+    assert not diff(io.BytesIO(old_content), io.BytesIO(old_content))
+
+
+def test_main(tmpdir, capsys, old_content, new_content):
+    (tmpdir / 'old.dta').write_binary(old_content)
+    (tmpdir / 'new.dta').write_binary(new_content)
+    assert diff_module.main([str(tmpdir / 'old.dta'), str(tmpdir / 'new.dta')]) == 1
+    assert capsys.readouterr().out.splitlines() == [
+        '- ABC1200000000001',
+        '+ ABC1200000000004',
+        '~ ABC1200000000003',
+        "    amount: '30,' -> '35,'",
+        "    recipient_name: 'Hans Meier' -> 'Hans Meyer'",
+    ]
+    assert diff_module.main([str(tmpdir / 'old.dta'), str(tmpdir / 'old.dta')]) == 0
+
+
+def test_invalid_file(old_content, new_content):
+    with pytest.raises(ValueError):
+        diff(io.BytesIO(old_content[130:]), io.BytesIO(new_content))
@@ -0,0 +1,61 @@
+"""Tests for the persistent index of sent payments."""
+
+from datetime import date, timedelta
+from decimal import Decimal
+
+from swissdta.constants import ErrorCode
+from swissdta.duplicates import DuplicateIndex, SentPayment
+
+
+def test_duplicate_payment(tmpdir, make_dta_file):
+    """Verify that a payment sent in a previous file is not sent again."""
+    today = date.today()
+    yesterday = today - timedelta(days=1)
+    with DuplicateIndex(str(tmpdir / 'payments.db')) as index:
+        first_file = make_dta_file(2, creation_date=yesterday, duplicate_index=index)
+        assert first_file.generate()
+        assert len(index) == 2
+
+        # Generating the same file again neither flags nor records its payments again
+        assert first_file.generate()
+        assert not first_file.report.errors
+        assert len(index) == 2
+
+        # The payment 00000000003 is the payment 00000000001 of the first file
+        second_file = make_dta_file(2, [{'reference': '00000000002', 'amount': Decimal(30)},
+                                        {'reference': '00000000003'}], duplicate_index=index)
+        second_file.generate()
+        assert [entry.code for entry in second_file.report.errors] == [ErrorCode.DUPLICATE_PAYMENT]
+        assert second_file.report.errors[0].params == {'reference': 'ABC1200000000001', 'sent_on': yesterday}
+        assert index.find(second_file.records[1], today) == SentPayment('ABC1200000000001', yesterday)
+        assert len(index) == 3
+
+    # The index is persistent
+    with DuplicateIndex(str(tmpdir / 'payments.db')) as index:
+        assert len(index) == 3
+
+
+def test_window(tmpdir, make_dta_file):
+    """Verify that only the payments sent within the window are duplicates."""
+    today = date.today()
+    with DuplicateIndex(str(tmpdir / 'payments.db'), window=timedelta(days=5)) as index:
+        dta_file = make_dta_file(1, duplicate_index=index)
+        index.add(dta_file.records, today - timedelta(days=6))
+        assert index.find(dta_file.records[0], today) is None
+        index.add(dta_file.records, today - timedelta(days=5))
+        assert index.find(dta_file.records[0], today) == SentPayment('ABC1200000000000', today - timedelta(days=5))
+        assert index.find(dta_file.records[0], today - timedelta(days=10)) is None
+
+
+def test_append_to(tmpdir, make_dta_file):
+    """Verify that the references of the file appended to are looked up in the index."""
+    path = tmpdir / 'payments.dta'
+    with DuplicateIndex(str(tmpdir / 'payments.db')) as index:
+        path.write_binary(make_dta_file(1, duplicate_index=index).generate())
+        assert index.has_reference('ABC1200000000000', date.today())
+        assert not index.has_reference('ABC1200000000000', date.today() - timedelta(days=1))
+
+        late_file = make_dta_file(2, duplicate_index=index)
+        assert late_file.append_to(str(path)) == 1
+        assert [entry.code for entry in late_file.report.errors] == [ErrorCode.DUPLICATE_REFERENCE]
+        assert index.has_reference('ABC1200000000001', date.today())
@@ -2,8 +2,9 @@
 
 import pytest
 
-from swissdta.constants import FillSide
+from swissdta.constants import ErrorCode, FillSide
 from swissdta.fields import Field, Iban
+from swissdta.records.common import ValidationIssue
 from swissdta.records.record import DTARecord
 
 
@@ -46,6 +47,23 @@ def test_validate(value, expected_errors, field_params):
     assert record.validation_errors == expected_errors
 
 
+def test_validation_issues():
+    """Verify that validation issues hold a code and the parameters of their message."""
+    class TestRecord(DTARecord):
+        """Simple Record class for testing"""
+        field = Field(length=5)
+
+    record = TestRecord()
+    record.field = '012345'
+    issue, = record.error_issues()
+    assert issue == ValidationIssue(ErrorCode.TOO_LONG, 'field', {'value': '012345', 'length': 5})
+    assert issue.message == "TOO LONG: '012345' can be at most 5 characters"
+
+    record.add_error('field', 'free text error')
+    assert record.validation_errors[-1] == '[field] free text error'
+    assert [issue.code for issue in record.error_issues()] == [ErrorCode.TOO_LONG, ErrorCode.OTHER]
+
+
 class FRecord(DTARecord):
     """Simple Record class for testing"""
     main_value = Field(length=5)
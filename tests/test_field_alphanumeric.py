@@ -2,6 +2,7 @@
 
 import pytest
 
+from swissdta.constants import UnencodablePolicy
 from swissdta.fields import AlphaNumeric
 from swissdta.records.record import DTARecord
 
@@ -52,3 +53,34 @@ def test_truncate(input_value, expected_value, expected_warnings, expected_error
     assert record.field == expected_value
     assert record.validation_warnings == expected_warnings
     assert record.validation_errors == expected_errors
+
+
+@pytest.mark.parametrize(('policy', 'expected_value', 'expected_warnings', 'expected_errors'), (
+    (UnencodablePolicy.ERROR, 'Hallerč   ', tuple(),
+     ("[field] INVALID CHARACTER: 'č' cannot be encoded in ISO 8859-1 (latin-1).",)),
+    (UnencodablePolicy.REPLACE, 'Haller.   ',
+     ("[field] WARNING: 'č' cannot be encoded in ISO 8859-1 (latin-1), replaced by '.'",), tuple()),
+    (UnencodablePolicy.DECOMPOSE, 'Hallerc   ',
+     ("[field] WARNING: 'č' cannot be encoded in ISO 8859-1 (latin-1), replaced by 'c'",), tuple()),
+))
+def test_unencodable_policy(policy, expected_value, expected_warnings, expected_errors):
+    """Verify that characters which cannot be encoded in latin-1 are handled when the value is set"""
+    class TestRecord(DTARecord):
+        """Simple Record class for testing"""
+        field = AlphaNumeric(length=FIELD_LENGTH, unencodable_policy=policy)
+
+    record = TestRecord()
+    record.field = 'Hallerč'
+    assert record.field == expected_value
+    assert record.validation_warnings == expected_warnings
+    assert record.validation_errors == expected_errors
+
+
+def test_unencodable_policy_default(monkeypatch):
+    """Verify that the default policy applies to the fields without a policy"""
+    monkeypatch.setattr(AlphaNumeric, 'unencodable_policy', UnencodablePolicy.DECOMPOSE)
+    record = ANRecord()
+    record.field = 'Łódź €'
+    assert record.field == '.odz .    '
+    assert not record.validation_errors
+    assert len(record.validation_warnings) == 3
@@ -1,12 +1,16 @@
 """Tests for the DTA file"""
 
-from datetime import date
+import asyncio
+import random
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
 from decimal import Decimal
 
 import pytest
 from swissdta.records import DTARecord890, DTARecord836
-from swissdta.constants import IdentificationPurpose, ChargesRule
+from swissdta.constants import ErrorCode, IdentificationPurpose, ChargesRule
 from swissdta.file import DTAFile
+from swissdta.pool import RecordPool
 
 
 @pytest.mark.parametrize(('record_data', 'duplicate_record_indexes'), (
@@ -187,3 +191,270 @@ def test_invalid_record_sequence_nr():
     assert not dta_file.validate(), "The file shouldn't be valid"
     assert ("[sequence_nr] SEQUENCE ERROR: Must be consecutive commencing with 1 in ascending order. "
             "(expected 2, got 8)") in dta_file.records[1].header.validation_errors
+
+
+def test_merge(caplog, make_payment):
+    """Verify that merged files generate the same file as a single file with all the records."""
+    single_file = DTAFile(sender_id='ABC12', client_clearing='8888', creation_date=date.today())
+    shards = [DTAFile(sender_id='ABC12', client_clearing='8888', creation_date=date.today()),
+              DTAFile(sender_id='XYZ98', client_clearing='8888', creation_date=date.today())]
+    for i, reference in enumerate(('00000000001', '00000000002', '00000000003', '00000000002', '00000000004')):
+        single_file.add_836_record(**make_payment(i, reference=reference))
+        shards[i % 2].add_836_record(**make_payment(i, reference=reference))
+
+    merged_file = DTAFile.merge(*shards)
+    assert merged_file.sender_id == 'ABC12'
+    assert len(merged_file.records) == 5
+    assert all(record.header.sender_id == 'ABC12' for record in merged_file.records)
+    assert "duplicate reference(s): 00000000002" in caplog.text
+    assert [record.reference for record in merged_file.records if record.has_errors()] == ['00000000002'] * 2
+    generated = merged_file.generate()
+    assert generated.count(b'\r\n') == 3 * 5 + 1  # 3 valid TA 836 records and the TA 890 record
+    assert generated == single_file.generate()
+    assert [entry.code for entry in merged_file.report.errors] == [ErrorCode.DUPLICATE_REFERENCE] * 2
+
+
+def test_merge_settings():
+    """Verify that the merged file has the settings of the files, which must be identical."""
+    pool = RecordPool()
+    shards = [DTAFile(sender_id='ABC12', client_clearing='8888', record_pool=pool, disabled_rules=('bic',))
+              for _ in range(2)]
+    merged_file = DTAFile.merge(*shards)
+    assert merged_file.record_pool is pool
+    assert merged_file.validation_profile == shards[0].validation_profile
+
+    with pytest.raises(ValueError):
+        DTAFile.merge(shards[0], DTAFile(sender_id='ABC12', client_clearing='8888', record_pool=pool))
+    with pytest.raises(ValueError):
+        DTAFile.merge(shards[0], DTAFile(sender_id='ABC12', client_clearing='8888', disabled_rules=('bic',)))
+
+
+def test_merge_no_files():
+    with pytest.raises(ValueError):
+        DTAFile.merge()
+
+
+def test_append_to(tmpdir, make_dta_file, make_payment):
+    """Verify that appending records gives the same file as generating all the records at once."""
+    path = tmpdir / 'payments.dta'
+    creation_date = date.today()
+    path.write_binary(make_dta_file(3, creation_date=creation_date).generate())
+
+    late_file = DTAFile(sender_id='ABC12', client_clearing='8888', creation_date=creation_date)
+    late_file.add_836_record(**make_payment(3, amount=Decimal('4.5')))
+    late_file.add_836_record(**make_payment(4, amount=Decimal(-1)))  # invalid, not appended
+    assert late_file.append_to(str(path)) == 1
+    assert late_file.report.invalid_record_count == 1
+
+    full_file = make_dta_file(4, [{}, {}, {}, {'amount': Decimal('4.5')}], creation_date=creation_date)
+    assert path.read_binary() == full_file.generate()
+
+
+def test_append_to_invalid(tmpdir, make_dta_file):
+    path = tmpdir / 'payments.dta'
+    dta_file = make_dta_file(1)
+    content = dta_file.generate()
+
+    other_sender = make_dta_file(1, [{'reference': '00000000001'}], sender_id='XYZ99')
+    path.write_binary(content)
+    with pytest.raises(ValueError):
+        other_sender.append_to(str(path))
+
+    path.write_binary(content[:-130])
+    with pytest.raises(ValueError):
+        dta_file.append_to(str(path))
+
+    # Nothing appended without valid records
+    path.write_binary(content)
+    invalid_file = make_dta_file(1, [{'reference': '00000000001', 'amount': Decimal(0)}])
+    assert invalid_file.append_to(str(path)) == 0
+    assert path.read_binary() == content
+
+
+def test_append_to_duplicate(tmpdir, make_dta_file):
+    """Verify that records with a reference of the existing file are not appended."""
+    path = tmpdir / 'payments.dta'
+    content = make_dta_file(1).generate()
+    path.write_binary(content)
+
+    late_file = make_dta_file(1)
+    assert late_file.append_to(str(path)) == 0
+    assert [entry.code for entry in late_file.report.errors] == [ErrorCode.DUPLICATE_REFERENCE]
+    assert path.read_binary() == content
+
+
+def test_append_to_interrupted(tmpdir, monkeypatch, make_dta_file, make_payment):
+    """Verify that an interrupted append is completed from its journal."""
+    path = tmpdir / 'payments.dta'
+    dta_file = make_dta_file(1)
+    path.write_binary(dta_file.generate())
+    dta_file.add_836_record(**make_payment(1))
+    expected_content = dta_file.generate()
+
+    def crash(*_):
+        raise OSError('Interrupted')
+
+    late_file = DTAFile(sender_id='ABC12', client_clearing='8888')
+    late_file.add_836_record(**make_payment(1))
+    with monkeypatch.context() as patch:
+        patch.setattr(DTAFile, '_write_at', staticmethod(crash))
+        with pytest.raises(OSError):
+            late_file.append_to(str(path))
+    assert (tmpdir / 'payments.dta.append').exists()
+
+    assert DTAFile.recover_append(str(path))
+    assert path.read_binary() == expected_content
+    assert not (tmpdir / 'payments.dta.append').exists()
+    assert not DTAFile.recover_append(str(path))
+
+
+def test_concurrent_producers(make_payment):
+    """Verify that records added by several threads are all generated."""
+    dta_file = DTAFile(sender_id='ABC12', client_clearing='8888')
+
+    def produce(thread_nr):
+        for i in range(100):
+            dta_file.add_836_record(**make_payment(i, reference=f'{thread_nr:03}{i:08}'))
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(produce, range(8)))
+
+    generated = dta_file.generate()
+    assert len(dta_file.records) == 800
+    assert dta_file.report.invalid_record_count == 0
+    assert sorted(int(record.header.sequence_nr) for record in dta_file.records) == list(range(1, 801))
+    assert generated.count(b'\r\n') == 5 * 800 + 1  # and the TA 890 record
+
+    # Records added after the generation are kept for the next one
+    dta_file.add_836_record(**make_payment(0, reference='99900000000'))
+    assert len(dta_file.records) == 801
+
+
+def _run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+def test_agenerate(make_dta_file, make_payment):
+    """Verify that generating a file asynchronously gives the same file."""
+    dta_file = make_dta_file(25)
+    dta_file.add_836_record(**make_payment(99, amount=Decimal(0)))  # invalid, skipped
+
+    steps = []
+    generated = _run(dta_file.agenerate(chunk_size=10, progress=lambda done, total: steps.append((done, total))))
+    assert generated == dta_file.generate()
+    assert dta_file.report.invalid_record_count == 1
+    assert steps == [(10, 53), (20, 53), (30, 53), (40, 53), (50, 53), (53, 53)]
+
+
+def test_awrite_to(make_dta_file):
+    dta_file = make_dta_file(5)
+
+    async def write_and_read():
+        received = asyncio.get_event_loop().create_future()
+
+        async def receive(reader, writer):
+            received.set_result(await reader.read())
+            writer.close()
+
+        server = await asyncio.start_server(receive, '127.0.0.1', 0)
+        _, writer = await asyncio.open_connection(*server.sockets[0].getsockname())
+        written = await dta_file.awrite_to(writer, chunk_size=2)
+        writer.close()
+        content = await received
+        server.close()
+        await server.wait_closed()
+        return written, content
+
+    written, received = _run(write_and_read())
+    assert written == len(received) == 5 * 650 + 130
+    assert received == dta_file.generate()
+
+
+def test_agenerate_cancel(make_dta_file):
+    """Verify that a cancelled generation stops and releases the file."""
+    dta_file = make_dta_file(50)
+
+    async def cancel():
+        def progress(done, _):
+            if done == 3:
+                task.cancel()
+
+        task = asyncio.ensure_future(dta_file.agenerate(chunk_size=1, progress=progress))
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    _run(cancel())
+    assert dta_file.report.record_count < 50
+    assert dta_file.generate()
+    assert dta_file.report.record_count == 50
+
+
+def test_agenerate_concurrent(make_dta_file, make_payment):
+    """Verify that the file can be used by the event loop while it is generated asynchronously."""
+    dta_file = make_dta_file(300)
+
+    async def access():
+        started = asyncio.Event()
+        task = asyncio.ensure_future(dta_file.agenerate(chunk_size=10, progress=lambda *_: started.set()))
+        await started.wait()
+        dta_file.add_836_record(**make_payment(0, reference='99900000000'))
+        assert len(dta_file.records) == 300  # the added record is kept for the next generation
+        with pytest.raises(RuntimeError):
+            dta_file.generate()
+        with pytest.raises(RuntimeError):
+            dta_file.validate()
+        with pytest.raises(RuntimeError):
+            await dta_file.agenerate()
+        return await asyncio.wait_for(task, timeout=30)
+
+    generated = _run(access())
+    assert generated.count(b'\r\n') == 5 * 300 + 1
+    assert len(dta_file.records) == 301
+    assert dta_file.generate().count(b'\r\n') == 5 * 301 + 1
+
+
+def test_generate_sample(caplog, make_dta_file):
+    """Verify that only a sample of the records is fully validated, unless the sample is invalid."""
+    sampled_index, = random.Random(0).sample(range(20), 1)
+    expired = date.today() - timedelta(days=20)  # only detected by the full validation
+    for invalid_indexes in ({(sampled_index + 1) % 20}, {sampled_index, (sampled_index + 1) % 20}):
+        dta_file = make_dta_file(20, [{'processing_date': expired} if i in invalid_indexes else {} for i in range(20)])
+        dta_file.generate(verify='sample', rate=0.05)
+        if sampled_index in invalid_indexes:
+            assert dta_file.report.invalid_record_count == 2
+            assert 'all the records are fully validated' in caplog.text
+        else:
+            assert dta_file.report.invalid_record_count == 0
+
+    with pytest.raises(ValueError):
+        dta_file.generate(verify='none')
+    with pytest.raises(ValueError):
+        dta_file.generate(verify='sample', rate=0)
+
+
+def test_agenerate_sample(make_dta_file):
+    """Verify that a sample of the records can be validated when generating asynchronously."""
+    sampled_index, = random.Random(0).sample(range(20), 1)
+    expired = date.today() - timedelta(days=20)  # only detected by the full validation
+    dta_file = make_dta_file(20, [{'processing_date': expired} if i == (sampled_index + 1) % 20 else {}
+                                  for i in range(20)])
+
+    generated = _run(dta_file.agenerate(chunk_size=3, verify='sample', rate=0.05))
+    assert dta_file.report.invalid_record_count == 0
+    assert generated == dta_file.generate(verify='sample', rate=0.05)
+    assert _run(dta_file.agenerate(chunk_size=3)) != generated
+
+    with pytest.raises(ValueError):
+        _run(dta_file.agenerate(verify='none'))
+    with pytest.raises(ValueError):
+        _run(dta_file.agenerate(verify='sample', rate=0))
+
+
+def test_generate_invalid_character(make_dta_file):
+    dta_file = make_dta_file(2, [{'recipient_name': 'Peter Hallerč'}])
+    assert dta_file.generate(verify='sample', rate=0.5)
+    assert [entry.code for entry in dta_file.report.errors] == [ErrorCode.INVALID_CHARACTER]
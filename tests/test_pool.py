@@ -0,0 +1,52 @@
+"""Tests for the record pool and the reset of records."""
+
+from decimal import Decimal
+
+from swissdta.pool import RecordPool
+from swissdta.records import DTARecord836, DTARecord890
+
+
+def test_reset():
+    """Verify that a reset record is identical to a new record."""
+    record = DTARecord836()
+    new_record = record.generate()
+    record.reference = '00000000001'
+    record.currency = 'XXXX'
+    record.header.sender_id = 'ABC12'
+    record.header.add_warning('sender_id', 'Warning')
+    assert record.has_errors() and record.has_warnings()
+
+    record.reset()
+    assert not record.has_errors() and not record.has_warnings()
+    assert record.header.transaction_type == '836'
+    assert record.generate() == new_record
+
+    total_record = DTARecord890()
+    total_record.amount = Decimal(10)
+    total_record.reset()
+    assert total_record.header.transaction_type == '890'
+    assert total_record.amount == DTARecord890().amount
+
+
+def test_pool(make_dta_file):
+    """Verify that records are reused across files and generate the same files."""
+    pool = RecordPool()
+    dta_file = make_dta_file(3, record_pool=pool)
+    first_records = list(dta_file.records)
+    expected = dta_file.generate()
+    dta_file.release_records()
+    assert not dta_file.records
+    assert len(pool) == 3
+
+    next_file = make_dta_file(4, record_pool=pool)
+    assert len(pool) == 0
+    assert sum(record in first_records for record in next_file.records) == 3
+    assert next_file.generate()[:3 * 650] == expected[:3 * 650]
+
+
+def test_pool_max_size():
+    pool = RecordPool(max_size=2)
+    pool.release([DTARecord836() for _ in range(3)] + [DTARecord890()])
+    assert len(pool) == 3
+    assert isinstance(pool.acquire(DTARecord890), DTARecord890)
+    assert isinstance(pool.acquire(DTARecord890), DTARecord890)  # a new record
@@ -0,0 +1,42 @@
+"""Tests for the parallel reader of DTA files."""
+
+from decimal import Decimal
+from operator import attrgetter
+
+import pytest
+
+from swissdta.reader import read_parallel, record_ranges
+
+
+def test_record_ranges():
+    assert record_ranges(5, 2) == [(0, 1300), (1300, 2600), (2600, 3250)]
+    assert record_ranges(0, 2) == []
+
+
+@pytest.mark.parametrize(('workers', 'chunk_size'), ((1, 3), (2, 3), (2, 100)))
+def test_read_parallel(dta_path, workers, chunk_size):
+    result = read_parallel(dta_path, workers=workers, chunk_size=chunk_size)
+    assert result.record_count == 7
+    assert [values['reference'] for values in result.results] == [f'{i:011}' for i in range(7)]
+    assert result.results[1]['recipient_iban'] == 'DE89370400440532013000'
+    assert result.total_amount == result.control_total == Decimal(28)
+    assert result.matches_control_total
+
+
+def test_read_parallel_parser(dta_path):
+    result = read_parallel(dta_path, parser=attrgetter('header.sequence_nr'), workers=2, chunk_size=2)
+    assert result.results == [f'{i:05}' for i in range(1, 8)]
+
+
+def test_control_total_mismatch(dta_path):
+    with open(dta_path, 'r+b') as file:
+        file.seek(7 * 650 + 53)
+        file.write(b'29,')
+    result = read_parallel(dta_path, workers=1)
+    assert result.control_total == Decimal(29)
+    assert not result.matches_control_total
+
+
+def test_invalid_chunk_size(dta_path):
+    with pytest.raises(ValueError):
+        read_parallel(dta_path, chunk_size=0)
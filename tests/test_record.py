@@ -2,7 +2,9 @@
 
 from unittest.mock import patch
 
+from swissdta.records import DTARecord836, DTARecord890
 from swissdta.records.record import DTARecord
+from swissdta.records.rules import PROFILES
 
 
 @patch('swissdta.records.header.DTAHeader.validate')
@@ -12,3 +14,9 @@ def test_validate_header(mocker):
     assert not mocker.called, "header validation should not be called before record validation is triggered"
     record.validate()
     assert mocker.call, "header validation should be called when record validation is triggered"
+
+
+def test_validate_profile():
+    """Verifies that any record can be validated with a profile."""
+    for record in (DTARecord(), DTARecord836(), DTARecord890()):
+        record.validate(PROFILES['structural'])
@@ -0,0 +1,168 @@
+"""Tests for the TA 836 record."""
+
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+
+from swissdta import OrderingParty, validate_836
+from swissdta.constants import ChargesRule, ErrorCode, IdentificationBankAddress, IdentificationPurpose, PaymentType
+from swissdta.file import DTAFile
+from swissdta.records import rules
+
+PAYMENT = {
+    'reference': '01234567890',
+    'client_account': 'CH38 0888 8123 4567 8901 2',
+    'processing_date': date.today(),
+    'currency': 'CHF',
+    'amount': Decimal(10),
+    'client_address': ('Alphabet Inc', 'Brandschenkestrasse 110', '8002 Zürich'),
+    'recipient_iban': 'CH9300762011623852957',
+    'recipient_name': 'Herr Peter Haller',
+    'recipient_address': ('Marktplaz 4', '9400 Rorschach'),
+    'identification_purpose': IdentificationPurpose.UNSTRUCTURED,
+    'purpose': ('Validation Test', '', ''),
+    'charges_rules': ChargesRule.OUR
+}
+
+
+@pytest.mark.parametrize(('changes', 'expected_codes'), (
+    ({}, []),
+    ({'amount': Decimal('-10.5')}, [ErrorCode.NEGATIVE_AMOUNT]),
+    ({'amount': Decimal('10.555')}, [ErrorCode.TOO_MANY_DECIMAL_PLACES]),
+    ({'amount': Decimal('10.555'), 'currency': 'EUR'}, []),
+    ({'amount': Decimal('10.5555'), 'currency': 'EUR'}, [ErrorCode.TOO_MANY_DECIMAL_PLACES]),
+    ({'currency': 'XXY'}, [ErrorCode.INVALID_CURRENCY]),
+    ({'reference': '012345678901'}, [ErrorCode.TOO_LONG]),
+    ({'recipient_iban': 'CH9400762011623852957'}, [ErrorCode.INVALID_IBAN]),
+    ({'client_account': 'DE89 3704 0044 0532 0130 00'}, [ErrorCode.IID_MISMATCH, ErrorCode.INVALID_CLIENT_ACCOUNT]),
+    ({'processing_date': date.today() - timedelta(days=20)}, [ErrorCode.VALUE_DATE_EXPIRED]),
+    ({'client_address': ('Alphabet Inc', '', '')}, [ErrorCode.INCOMPLETE_CLIENT_ADDRESS]),
+    ({'client_address': ('Alphabet Inc', '/C/', '')}, [ErrorCode.CLIENT_ADDRESS_CONTAINS_C]),
+    ({'recipient_iban': 'DE89 3704 0044 0532 0130 00',
+      'bank_address_type': IdentificationBankAddress.BENEFICIARY_ADDRESS,
+      'bank_address': ('Commerzbank', 'Berlin')}, []),
+))
+def test_validate_836(changes, expected_codes):
+    """Verify that a single payment is validated like a TA 836 record of a file."""
+    payment = dict(PAYMENT, **changes)
+    errors = validate_836(payment, client_clearing='8888')
+    assert [error.code for error in errors] == expected_codes
+
+    dta_file = DTAFile(sender_id='ABC12', client_clearing='8888')
+    dta_file.add_836_record(**payment)
+    record, = dta_file.records
+    record.validate()
+    assert [str(error) for error in errors] == list(record.validation_errors)
+
+
+def test_validate_no_clearing():
+    """Verify that the client account's IID is only validated with a client clearing."""
+    assert not validate_836(PAYMENT)
+    assert [error.code for error in validate_836(PAYMENT, client_clearing='1234')] == [ErrorCode.IID_MISMATCH]
+
+
+def test_payment_type():
+    """Verify that the regular and the salary payment types are valid."""
+    dta_file = DTAFile(sender_id='ABC12', client_clearing='8888')
+    dta_file.add_836_record(**PAYMENT)
+    record, = dta_file.records
+    for payment_type in PaymentType:
+        record.header.payment_type = payment_type
+        record.validate()
+        assert not record.has_errors(), payment_type
+
+
+def test_validate_836_missing_value():
+    payment = dict(PAYMENT)
+    del payment['amount']
+    with pytest.raises(KeyError):
+        validate_836(payment)
+
+
+def test_ordering_party():
+    """Verify that records sharing an ordering party generate the same file."""
+    ordering_party = OrderingParty(PAYMENT['client_account'], PAYMENT['client_address'], '8888')
+    assert not ordering_party.errors
+    dta_file = DTAFile(sender_id='ABC12', client_clearing='8888')
+    shared_file = DTAFile(sender_id='ABC12', client_clearing='8888', ordering_party=ordering_party)
+    for reference in ('00000000001', '00000000002'):
+        dta_file.add_836_record(**dict(PAYMENT, reference=reference))
+        shared_file.add_836_record(**dict(PAYMENT, reference=reference, client_account=None, client_address=None))
+    shared_file.add_836_record(**dict(PAYMENT, reference='00000000003'))  # same values as the ordering party
+    dta_file.add_836_record(**dict(PAYMENT, reference='00000000003'))
+
+    assert all(record.ordering_party is ordering_party for record in shared_file.records)
+    assert shared_file.generate() == dta_file.generate()
+
+    record = shared_file.records[0]
+    record.client_address = ('Alphabet Inc', '', '')
+    assert record.ordering_party is None
+    record.validate()
+    assert [error.code for error in record.error_issues()] == [ErrorCode.INCOMPLETE_CLIENT_ADDRESS]
+
+
+def test_ordering_party_partial():
+    """Verify that a client account or address which is not given is the one of the ordering party."""
+    ordering_party = OrderingParty(PAYMENT['client_account'], PAYMENT['client_address'], '8888')
+    dta_file = DTAFile(sender_id='ABC12', client_clearing='8888', ordering_party=ordering_party)
+    dta_file.add_836_record(**dict(PAYMENT, reference='00000000001', client_account=None))
+    dta_file.add_836_record(**dict(PAYMENT, reference='00000000002', client_address=None))
+    dta_file.add_836_record(**dict(PAYMENT, reference='00000000003', client_account=None,
+                                   client_address=('Alphabet Inc', 'Marktplaz 4', '8000 Zürich')))
+    dta_file.add_836_record(**dict(PAYMENT, reference='00000000004', client_address=None,
+                                   client_account='CH93 0076 2011 6238 5295 7'))
+
+    first, second, third, fourth = dta_file.records
+    assert first.ordering_party is ordering_party
+    assert second.ordering_party is ordering_party
+    assert third.ordering_party is None
+    assert third.client_account == first.client_account
+    assert third.client_address != first.client_address
+    assert fourth.ordering_party is None
+    assert fourth.client_account != first.client_account
+    assert fourth.client_address == first.client_address
+
+
+def test_invalid_ordering_party():
+    ordering_party = OrderingParty('DE89 3704 0044 0532 0130 00', ('Alphabet Inc', '/C/', ''), '8888')
+    assert [error.code for error in ordering_party.errors] == [
+        ErrorCode.IID_MISMATCH, ErrorCode.INVALID_CLIENT_ACCOUNT, ErrorCode.CLIENT_ADDRESS_CONTAINS_C
+    ]
+
+    dta_file = DTAFile(sender_id='ABC12', client_clearing='8888', ordering_party=ordering_party)
+    dta_file.add_836_record(**dict(PAYMENT, client_account=None, client_address=None))
+    record, = dta_file.records
+    record.validate()
+    assert [error.code for error in record.error_issues()] == [error.code for error in ordering_party.errors]
+
+    # The IID is validated again for a different client clearing
+    ordering_party = OrderingParty(PAYMENT['client_account'], PAYMENT['client_address'], '1234')
+    assert [error.code for error in ordering_party.errors] == [ErrorCode.IID_MISMATCH]
+    dta_file = DTAFile(sender_id='ABC12', client_clearing='8888', ordering_party=ordering_party)
+    dta_file.add_836_record(**PAYMENT)
+    record, = dta_file.records
+    assert record.ordering_party is ordering_party
+    record.validate()
+    assert not record.has_errors()
+
+
+def test_ordering_party_iid(monkeypatch):
+    """Verify that the IID of a shared ordering party is only validated again for a different client clearing."""
+    ordering_party = OrderingParty(PAYMENT['client_account'], PAYMENT['client_address'], '8888')
+    dta_file = DTAFile(sender_id='ABC12', client_clearing='8888', ordering_party=ordering_party)
+    dta_file.add_836_record(**PAYMENT)
+    record, = dta_file.records
+
+    validated_clearings = []
+
+    def iid_errors(_, client_clearing):
+        validated_clearings.append(client_clearing)
+        return ()
+
+    monkeypatch.setattr(rules, 'iid_errors', iid_errors)
+    record.validate()
+    assert not validated_clearings
+    record.header.client_clearing = '1234'
+    record.validate()
+    assert [clearing.strip() for clearing in validated_clearings] == ['1234']
@@ -0,0 +1,48 @@
+"""Tests for the validation report."""
+
+import logging
+from decimal import Decimal
+
+from swissdta.constants import ErrorCode
+from swissdta.file import DTAFile
+
+
+def test_report(make_dta_file):
+    """Verify the content of the report of a generated file."""
+    recipient_name = 'Herr Peter Haller mit einem sehr langen Namen'
+    dta_file = make_dta_file(5, [{'amount': Decimal(amount), 'recipient_name': recipient_name}
+                                 for amount in ('10', '-1', '-2', '0', '5')])
+    assert dta_file.generate()
+
+    report = dta_file.report
+    assert report
+    assert report.record_count == 5
+    assert report.invalid_record_count == 3
+    assert report.error_counts() == {ErrorCode.NEGATIVE_AMOUNT: 2, ErrorCode.ZERO_AMOUNT: 1}
+    assert report.warning_counts() == {ErrorCode.TRUNCATED: 5}
+    assert sorted(entry.message for entry in report.errors) == [
+        'INVALID: May not be negative', 'INVALID: May not be negative', 'INVALID: May not be zero'
+    ]
+    assert {entry.field for entry in report.errors} == {'amount'}
+    assert {entry.reference for entry in report.errors} == {'00000000001', '00000000002', '00000000003'}
+
+
+def test_invalid_file_report():
+    """Verify that the report of an empty file is falsy."""
+    dta_file = DTAFile(sender_id='ABC12', client_clearing='8888')
+    assert dta_file.generate() == b''
+    assert not dta_file.report
+    assert not dta_file.validate()
+
+
+def test_aggregated_log(caplog, make_dta_file):
+    """Verify that errors are logged in a single (truncated) entry."""
+    dta_file = make_dta_file(21, [{'amount': Decimal(-1)}] * 20)
+    with caplog.at_level(logging.ERROR):
+        dta_file.generate()
+
+    assert len(caplog.records) == 1
+    assert '20 TA record(s) not processed' in caplog.text
+    assert 'NEGATIVE_AMOUNT: 20 occurrence(s)' in caplog.text
+    assert '... and 15 more' in caplog.text
+    assert caplog.text.count('May not be negative') == 5
@@ -0,0 +1,83 @@
+"""Tests for the TA 836 rules and the validation profiles."""
+
+from datetime import date, timedelta
+
+import pytest
+
+from swissdta import validate_836
+from swissdta.constants import ErrorCode, IdentificationBankAddress
+from swissdta.file import DTAFile
+from swissdta.records.rules import PROFILES, RULES, get_profile
+
+from tests.test_record836 import PAYMENT
+
+INVALID_CLIENT = {'client_account': 'DE89 3704 0044 0532 0130 00', 'client_address': ('Alphabet Inc', '/C/', '')}
+
+
+def test_rules_order():
+    """Verify that the rules of the profiles are applied from the cheapest to the most expensive."""
+    for profile in PROFILES.values():
+        costs = [rule.cost for rule in profile.rules]
+        assert costs == sorted(costs)
+    assert len(PROFILES['full'].rules) == len(RULES)
+
+
+@pytest.mark.parametrize(('profile', 'expected_codes'), (
+    ('full', [ErrorCode.IID_MISMATCH, ErrorCode.CLIENT_ADDRESS_CONTAINS_C, ErrorCode.INVALID_CLIENT_ACCOUNT]),
+    ('trusted-upstream', [ErrorCode.IID_MISMATCH]),
+    ('structural', [ErrorCode.IID_MISMATCH]),
+    (PROFILES['full'].without('iid'), [ErrorCode.CLIENT_ADDRESS_CONTAINS_C, ErrorCode.INVALID_CLIENT_ACCOUNT]),
+    (PROFILES['trusted-upstream'].without('iid'), [ErrorCode.CLIENT_ADDRESS_CONTAINS_C]),
+))
+def test_profiles(profile, expected_codes):
+    payment = dict(PAYMENT, **INVALID_CLIENT)
+    errors = validate_836(payment, client_clearing='8888', profile=profile)
+    assert [error.code for error in errors] == expected_codes
+
+
+def test_unknown_profile_or_rule():
+    with pytest.raises(ValueError):
+        get_profile('fast')
+    with pytest.raises(ValueError):
+        DTAFile(sender_id='ABC12', client_clearing='8888', disabled_rules=('bic', 'iban'))
+
+
+def test_bic():
+    payment = dict(PAYMENT, recipient_iban='DE89 3704 0044 0532 0130 00',
+                   bank_address_type=IdentificationBankAddress.SWIFT_ADDRESS)
+    assert not validate_836(dict(payment, bank_address=('COBADEFFXXX', '')))
+    assert [error.code for error in validate_836(dict(payment, bank_address=('COBADEF', '')))] == [
+        ErrorCode.INVALID_BIC
+    ]
+    assert not validate_836(dict(payment, bank_address=('COBADEF', '')), profile='trusted-upstream')
+
+
+def test_missing_client_address():
+    errors = validate_836(dict(PAYMENT, client_address=('', '', '')), profile='structural')
+    assert [error.code for error in errors] == [ErrorCode.MISSING_CLIENT_ADDRESS]
+
+
+def test_value_date():
+    """Verify that the structural profile reports malformed value dates but not expired ones."""
+    expired = date.today() - timedelta(days=20)
+    for profile in ('full', 'structural'):
+        errors = validate_836(dict(PAYMENT, processing_date=None), profile=profile)
+        assert [error.code for error in errors] == [ErrorCode.INVALID_VALUE_DATE]
+    assert [error.code for error in validate_836(dict(PAYMENT, processing_date=expired))] == [
+        ErrorCode.VALUE_DATE_EXPIRED
+    ]
+    assert not validate_836(dict(PAYMENT, processing_date=expired), profile='structural')
+
+
+def test_file_profile():
+    """Verify that the records of a file are validated with the rules of its profile."""
+    dta_file = DTAFile(sender_id='ABC12', client_clearing='8888', validation_profile='trusted-upstream',
+                       disabled_rules=('client_address',))
+    dta_file.add_836_record(**dict(PAYMENT, **INVALID_CLIENT, reference='00000000001'))
+    dta_file.add_836_record(**dict(PAYMENT, client_account=INVALID_CLIENT['client_account'],
+                                   reference='00000000002'))
+    dta_file.generate()
+    assert [entry.code for entry in dta_file.report.errors] == [ErrorCode.IID_MISMATCH, ErrorCode.IID_MISMATCH]
+
+    merged_file = DTAFile.merge(dta_file)
+    assert merged_file.validation_profile == dta_file.validation_profile
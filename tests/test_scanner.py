@@ -0,0 +1,48 @@
+"""Tests for the DTA file scanner."""
+
+import io
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+
+from swissdta.scanner import scan
+
+
+@pytest.mark.parametrize('buffer_records', (1, 3, 1024))
+def test_scan(dta_content, buffer_records):
+    today = date.today()
+    tomorrow = today + timedelta(days=1)
+    summary = scan(io.BytesIO(dta_content), buffer_records=buffer_records)
+
+    assert summary.record_count == 4
+    assert summary.total_amount == summary.control_total == Decimal('32.30')
+    assert summary.matches_control_total
+    assert summary.totals == {
+        ('CHF', today): Decimal('11.05'),
+        ('EUR', today): Decimal('20'),
+        ('CHF', tomorrow): Decimal('1.25'),
+    }
+    assert summary.counts == {('CHF', today): 2, ('EUR', today): 1, ('CHF', tomorrow): 1}
+    assert summary.totals_per_currency == {'CHF': Decimal('12.30'), 'EUR': Decimal('20')}
+    assert summary.totals_per_value_date == {
+        today: {'CHF': Decimal('11.05'), 'EUR': Decimal('20')},
+        tomorrow: {'CHF': Decimal('1.25')}
+    }
+
+
+def test_scan_path(dta_content, tmpdir):
+    (tmpdir / 'payments.dta').write_binary(dta_content[:-2])  # without the final line separator
+    summary = scan(str(tmpdir / 'payments.dta'))
+    assert summary.record_count == 4
+    assert summary.matches_control_total
+
+
+@pytest.mark.parametrize('corrupt', (
+    lambda content: b'',
+    lambda content: content[:-200],
+    lambda content: content[130:],
+))
+def test_scan_invalid(dta_content, corrupt):
+    with pytest.raises(ValueError):
+        scan(io.BytesIO(corrupt(dta_content)))
@@ -0,0 +1,127 @@
+"""Tests for the record stores."""
+
+import os
+import pickle
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+
+from swissdta.pool import RecordPool
+from swissdta.records import DTARecord836
+from swissdta.store import SpillingRecordStore
+
+
+def test_pickle_record():
+    """Verify that the field values, warnings and errors of a record survive pickling."""
+    record = DTARecord836()
+    record.reference = '01234567890'
+    record.amount = Decimal('-10.5')
+    record.recipient_name = 'x' * 40
+    record.header.sequence_nr = 3
+
+    restored = pickle.loads(pickle.dumps(record))
+    assert restored.generate() == record.generate()
+    assert restored.validation_errors == record.validation_errors
+    assert restored.validation_warnings == record.validation_warnings
+    assert restored.header.sequence_nr == '00003'
+
+
+@pytest.mark.parametrize('spill_threshold', (0, 2, 5, 100))
+def test_spill(spill_threshold, tmpdir):
+    """Verify that the store behaves like a list before and after spilling."""
+    store = SpillingRecordStore(spill_threshold=spill_threshold, directory=str(tmpdir))
+    records = []
+    for i in range(5):
+        record = DTARecord836()
+        record.reference = f'{i:011}'
+        records.append(record)
+        store.append(record)
+
+    assert len(store) == 5
+    assert store.spilled == (spill_threshold < 5)
+    assert bool(os.listdir(str(tmpdir))) == store.spilled
+    assert [record.reference for record in store] == [record.reference for record in records]
+    assert store[-1].reference == '00000000004'
+    assert [record.reference for record in store[1:3]] == ['00000000001', '00000000002']
+
+    store.sort(key=lambda record: record.reference, reverse=True)
+    assert [record.reference for record in store] == [f'{i:011}' for i in reversed(range(5))]
+
+    store.close()
+    assert not store
+    assert not os.listdir(str(tmpdir))
+
+
+def test_spilled_write_back():
+    """Verify that changes made while iterating over a spilled store are persisted."""
+    store = SpillingRecordStore(spill_threshold=0)
+    store.append(DTARecord836())
+    store.append(DTARecord836())
+
+    for i, record in enumerate(store):
+        record.header.sequence_nr = i + 1
+        record.add_error('reference', 'INVALID: test error')
+
+    assert [record.header.sequence_nr for record in store] == ['00001', '00002']
+    assert all(record.has_errors() for record in store)
+
+    record = store[0]
+    record.header.sequence_nr = 8
+    assert store[0].header.sequence_nr == '00001'
+    store[0] = record
+    assert store[0].header.sequence_nr == '00008'
+
+
+def test_invalid_threshold():
+    with pytest.raises(ValueError):
+        SpillingRecordStore(spill_threshold=-1)
+
+
+def test_generate(make_dta_file):
+    """Verify that a file with a spilled store is identical to a file with an in-memory list."""
+    changes = [{'amount': Decimal(amount)} for amount in ('10', '5.25', '-3', '100', '0.5')]
+    dta_file = make_dta_file(5, changes)
+    spilled_file = make_dta_file(5, changes, record_store=SpillingRecordStore(spill_threshold=2))
+
+    assert spilled_file.records.spilled
+    assert spilled_file.generate() == dta_file.generate()
+    assert sum(record.has_errors() for record in spilled_file.records) == 1
+
+
+def test_generate_sample(make_dta_file):
+    """Verify that the records of a spilled sample keep their validation."""
+    dta_file = make_dta_file(5)
+    spilled_file = make_dta_file(5, record_store=SpillingRecordStore(spill_threshold=2))
+    for a_file in (dta_file, spilled_file):
+        for record in a_file.records:  # written back to the spilled store
+            if record.reference == '00000000002':
+                record.value_date = date.today() - timedelta(days=20)  # only detected by the full validation
+
+    # The whole file is the sample
+    assert spilled_file.generate(verify='sample', rate=1) == dta_file.generate()
+    assert spilled_file.report.invalid_record_count == 1
+    assert sum(record.has_errors() for record in spilled_file.records) == 1
+
+
+@pytest.mark.parametrize('spill_threshold', (2, 10))
+def test_release_records(spill_threshold, tmpdir, make_dta_file, make_payment):
+    """Verify that releasing the records clears the store of the file, which can be reused."""
+    pool = RecordPool()
+    store = SpillingRecordStore(spill_threshold=spill_threshold, directory=str(tmpdir))
+    dta_file = make_dta_file(3, record_store=store, record_pool=pool)
+    assert len(dta_file.records) == 3
+    assert store.spilled == (spill_threshold < 3)
+
+    dta_file.release_records()
+    assert dta_file.records is store
+    assert not store and not store.spilled
+    assert not os.listdir(str(tmpdir))
+    # The records of a spilled store are not loaded back into the pool
+    assert len(pool) == (0 if spill_threshold < 3 else 3)
+
+    for i in range(3):
+        dta_file.add_836_record(**make_payment(i))
+    assert len(dta_file.records) == 3
+    assert store.spilled == (spill_threshold < 3)
+    store.close()
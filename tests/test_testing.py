@@ -0,0 +1,51 @@
+"""Tests for the synthetic payments."""
+
+from collections import Counter
+from datetime import date
+
+import pytest
+from schwifty import BIC, IBAN
+
+from swissdta import DTAFile, verify
+from swissdta.constants import ErrorCode, IdentificationPurpose
+from swissdta.testing import generate_payments
+
+
+def test_generate_payments():
+    payments = list(generate_payments(500, seed=1, processing_date=date.today()))
+    assert len(payments) == 500
+    assert payments == list(generate_payments(500, seed=1, processing_date=date.today()))
+    assert payments != list(generate_payments(500, seed=2, processing_date=date.today()))
+    assert [payment['reference'] for payment in payments] == [f'{number:011}' for number in range(1, 501)]
+
+    for payment in payments:
+        IBAN(payment['recipient_iban']).validate()
+        if payment['currency'] == 'EUR':
+            BIC(payment['bank_address'][0]).validate()
+    assert {payment['currency'] for payment in payments} == {'CHF', 'EUR'}
+    assert {payment['identification_purpose'] for payment in payments} == set(IdentificationPurpose)
+    assert any(character in payment['recipient_name'] for payment in payments for character in 'äöüéß')
+
+    dta_file = DTAFile(sender_id='ABC12', client_clearing='8888')
+    for payment in payments:
+        dta_file.add_836_record(**payment)
+    assert verify(dta_file.generate()) == 500
+    assert not dta_file.report.errors
+
+
+def test_generate_invalid_payments():
+    dta_file = DTAFile(sender_id='ABC12', client_clearing='8888')
+    for payment in generate_payments(600, seed=1, invalid_rate=0.25):
+        dta_file.add_836_record(**payment)
+    record_count = verify(dta_file.generate())
+    codes = Counter(error.code for error in dta_file.report.errors)
+    assert record_count + sum(codes.values()) == 600  # one error per invalid payment
+    assert 100 < sum(codes.values()) < 200
+    assert set(codes) == {ErrorCode.INVALID_IBAN, ErrorCode.NEGATIVE_AMOUNT, ErrorCode.VALUE_DATE_EXPIRED,
+                          ErrorCode.TOO_MANY_DECIMAL_PLACES, ErrorCode.INVALID_CHARACTER,
+                          ErrorCode.MISSING_CLIENT_ADDRESS}
+
+
+def test_generate_invalid_rate():
+    with pytest.raises(ValueError):
+        generate_payments(10, invalid_rate=1.5)
@@ -1,8 +1,11 @@
 """Tests for the util methods."""
 
+import subprocess
+import sys
+
 import pytest
 
-from swissdta.util import remove_whitespace, is_swiss_iban
+from swissdta.util import CurrencyInfo, currency_table, is_swiss_iban, remove_whitespace
 
 
 @pytest.mark.parametrize(('input_text', 'expected_text'), (
@@ -29,3 +32,31 @@ def test_remove_whitespace(input_text, expected_text):
 def test_is_swiss_iban(input_value, expected_value):
     """Verify that CH and LI IBANs are marked True."""
     assert is_swiss_iban(input_value) == expected_value
+
+
+def test_lazy_dependencies():
+    """Verify that the heavy dependencies are only imported on first use or warm up."""
+    script = ("import sys, swissdta; "
+              "print('schwifty' in sys.modules, 'iso4217' in sys.modules); "
+              "swissdta.warmup(); "
+              "print('schwifty' in sys.modules, 'iso4217' in sys.modules)")
+    output = subprocess.run([sys.executable, '-c', script], stdout=subprocess.PIPE, check=True).stdout
+    assert output.decode().split() == ['False', 'False', 'True', 'True']
+
+
+@pytest.mark.parametrize(('code', 'expected_info'), (
+    ('CHF', CurrencyInfo(exponent=2, max_decimal_places=2)),
+    ('EUR', CurrencyInfo(exponent=2, max_decimal_places=3)),
+    ('JPY', CurrencyInfo(exponent=0, max_decimal_places=3)),
+    ('XAU', CurrencyInfo(exponent=None, max_decimal_places=3)),
+))
+def test_currency_table(code, expected_info):
+    """Verify the details of the precomputed currencies."""
+    assert currency_table()[code] == expected_info
+
+
+def test_currency_table_read_only():
+    """Verify that the shared currency table cannot be modified."""
+    with pytest.raises(TypeError):
+        currency_table()['CHH'] = CurrencyInfo(exponent=2, max_decimal_places=2)
+    assert 'CHH' not in currency_table()
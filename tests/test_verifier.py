@@ -0,0 +1,40 @@
+"""Tests for the verification of generated DTA files."""
+
+import io
+import re
+
+import pytest
+
+from swissdta import verify
+
+
+@pytest.mark.parametrize('buffer_records', (1, 3, 1024))
+def test_verify(dta_content, buffer_records):
+    assert verify(dta_content) == 4
+    assert verify(memoryview(dta_content)) == 4
+    assert verify(io.BytesIO(dta_content), buffer_records=buffer_records) == 4
+    assert verify(io.BytesIO(dta_content[:-2]), buffer_records=buffer_records) == 4
+
+
+def test_verify_path(dta_content, tmpdir):
+    (tmpdir / 'payments.dta').write_binary(dta_content)
+    assert verify(str(tmpdir / 'payments.dta')) == 4
+
+
+@pytest.mark.parametrize(('corrupt', 'message'), (
+    (lambda content: b'', 'the file does not end with a TA 890 record'),
+    (lambda content: content[:100] + content[101:], 'line 1 is not 128 characters long'),
+    (lambda content: content.replace(b'Marktplaz 4', b'Marktplaz\r\n', 1), 'line 4 is not a valid segment 04'),
+    (lambda content: content.replace(b'05U', b'05X', 1), 'line 5 is not a valid segment 05'),
+    (lambda content: content.replace(b'EUR20,', b'EUR20.'),
+     'line 6 is not a valid segment 01 of a TA 836 record (record 2)'),
+    (lambda content: content.replace(b'000028360', b'000038360'), 'records are not numbered consecutively (record 2)'),
+    (lambda content: content.replace(b'000058900', b'000068900'), 'records are not numbered consecutively (record 5)'),
+    (lambda content: content[:-130], 'the file does not end with a TA 890 record'),
+    (lambda content: content + b'\r\n', 'the file does not end with a TA 890 record'),
+    (lambda content: content.replace(b'CHF10,50 ', b'CHF10,51 '),
+     'the total amount of the TA 890 record (32.30) does not match the sum of the amounts (32.31)'),
+))
+def test_verify_invalid(dta_content, corrupt, message):
+    with pytest.raises(ValueError, match=re.escape(message)):
+        verify(corrupt(dta_content))
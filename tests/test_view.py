@@ -0,0 +1,108 @@
+"""Tests for the memory-mapped views over DTA files."""
+
+import pytest
+
+from swissdta.layout import SPANS_836, SPANS_890
+from swissdta.records import DTARecord836
+from swissdta.view import DTAFileView, RecordView836, RecordView890
+
+
+def test_layout(make_dta_file):
+    """Verify that the field spans match the generated records."""
+    dta_file = make_dta_file(2)
+    content = dta_file.generate()
+    record = dta_file.records[1]
+    raw_record = content[650:1300].decode('latin-1')
+    for name, span in SPANS_836.items():
+        if name == 'sender_reference':
+            expected = record.header.sender_id
+        elif hasattr(record.header, name):
+            expected = getattr(record.header, name)
+        else:
+            expected = getattr(record, name)
+        assert raw_record[span] == expected, name
+
+    raw_total = content[1300:].decode('latin-1')
+    assert raw_total[SPANS_890['transaction_type']] == '890'
+    assert raw_total[SPANS_890['amount']].strip() == '3,'
+
+
+def test_access(dta_path):
+    with open(dta_path, 'rb') as file:
+        content = file.read()
+    with DTAFileView(dta_path) as view:
+        assert len(view) == 7
+        assert bytes(view[0]) == content[:650]
+        assert view[-1] == view.record(7)
+        assert bytes(view[-1]) == content[3900:4550]
+        assert [bytes(record) for record in view[1:3]] == [content[650:1300], content[1300:1950]]
+        assert list(view) == view[:]
+        assert bytes(view.total_record) == content[4550:]
+        with pytest.raises(IndexError):
+            view[7]  # pylint: disable=pointless-statement
+        with pytest.raises(KeyError):
+            view.record(0)
+
+
+def test_record_view(make_dta_file):
+    """Verify that the record views return the same values as the records."""
+    dta_file = make_dta_file(2)
+    content = dta_file.generate()
+    record = dta_file.records[1]
+    view = RecordView836(memoryview(content)[650:1300])
+
+    for name, _ in DTARecord836._fields():  # pylint: disable=protected-access
+        assert getattr(view, name) == getattr(record, name), name
+    for name, _ in record.header._fields():  # pylint: disable=protected-access
+        assert getattr(view.header, name) == getattr(record.header, name), name
+    assert view.purpose == record.purpose
+    assert view.client_address == record.client_address
+    assert view.header.sequence_nr == '00002'
+    assert repr(view) == '<RecordView836(sequence_nr=00002)>'
+
+    total_view = RecordView890(content[1300:])
+    assert total_view.amount.strip() == '3,'
+    assert total_view.header.transaction_type == '890'
+
+
+def test_close(dta_path):
+    """Verify that record views remain usable after the file view is closed."""
+    with DTAFileView(dta_path) as view:
+        record = view[2]
+    assert record.reference == '00000000002'
+
+
+def test_indexes(dta_path):
+    with DTAFileView(dta_path, index_references=True, index_recipient_ibans=True) as view:
+        assert view.find_reference('00000000003') == view.find_reference('ABC1200000000003') == view[3]
+        assert view.find_reference('3') == view[3]
+        with pytest.raises(KeyError):
+            view.find_reference('00000000009')
+        assert view.find_recipient_iban('DE89 3704 0044 0532 0130 00') == [view[1], view[3], view[5]]
+        assert view.find_recipient_iban('CH3808888123456789012') == []
+
+    with DTAFileView(dta_path) as view, pytest.raises(RuntimeError):
+        view.find_reference('00000000003')
+
+
+@pytest.mark.parametrize(('offset', 'replacement'), (
+    (128, b' '),  # missing separator
+    (650, b'02'),  # wrong segment
+    (4550 + 48, b'836'),  # no total record
+    (650 + 43, b'00003'),  # sequence number
+))
+def test_invalid_structure(dta_path, offset, replacement):
+    with open(dta_path, 'r+b') as file:
+        file.seek(offset)
+        file.write(replacement)
+    with pytest.raises(ValueError):
+        DTAFileView(dta_path)
+
+
+def test_invalid_size(make_dta_file, tmpdir):
+    (tmpdir / 'empty.dta').write_binary(b'')
+    with pytest.raises(ValueError):
+        DTAFileView(str(tmpdir / 'empty.dta'))
+    (tmpdir / 'truncated.dta').write_binary(make_dta_file(1).generate()[:-10])
+    with pytest.raises(ValueError):
+        DTAFileView(str(tmpdir / 'truncated.dta'))